@@ -0,0 +1,50 @@
+"""Add background_job table for async refresh jobs
+
+Revision ID: 0a1b2c3d4e5f
+Revises: f1a2b3c4d5e6
+Create Date: 2026-01-19 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0a1b2c3d4e5f'
+down_revision: Union[str, Sequence[str], None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create background_job table."""
+    op.create_table(
+        'background_job',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_background_job_kind'), 'background_job', ['kind'], unique=False)
+    op.create_index(op.f('ix_background_job_status'), 'background_job', ['status'], unique=False)
+    op.create_index(op.f('ix_background_job_created_at'), 'background_job', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop background_job table."""
+    op.drop_index(op.f('ix_background_job_created_at'), table_name='background_job')
+    op.drop_index(op.f('ix_background_job_status'), table_name='background_job')
+    op.drop_index(op.f('ix_background_job_kind'), table_name='background_job')
+    op.drop_table('background_job')
@@ -0,0 +1,48 @@
+"""Add job_run table for refresh run history
+
+Revision ID: 1b2c3d4e5f6a
+Revises: 0a1b2c3d4e5f
+Create Date: 2026-01-21 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '1b2c3d4e5f6a'
+down_revision: Union[str, Sequence[str], None] = '0a1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create job_run table."""
+    op.create_table(
+        'job_run',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job', sa.String(), nullable=False),
+        sa.Column('trigger', sa.String(), nullable=False),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('elapsed_sec', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('symbols_per_sec', sa.Float(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_job_run_job'), 'job_run', ['job'], unique=False)
+    op.create_index(op.f('ix_job_run_started_at'), 'job_run', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop job_run table."""
+    op.drop_index(op.f('ix_job_run_started_at'), table_name='job_run')
+    op.drop_index(op.f('ix_job_run_job'), table_name='job_run')
+    op.drop_table('job_run')
@@ -0,0 +1,39 @@
+"""Add market_holiday table for exchange-aware price refresh
+
+Revision ID: 2c3d4e5f6a7b
+Revises: 1b2c3d4e5f6a
+Create Date: 2026-01-23 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2c3d4e5f6a7b'
+down_revision: Union[str, Sequence[str], None] = '1b2c3d4e5f6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create market_holiday table."""
+    op.create_table(
+        'market_holiday',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exchange', sa.String(), nullable=False),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exchange', 'holiday_date', name='uq_market_holiday_exchange_date'),
+    )
+    op.create_index(op.f('ix_market_holiday_exchange'), 'market_holiday', ['exchange'], unique=False)
+    op.create_index(op.f('ix_market_holiday_holiday_date'), 'market_holiday', ['holiday_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop market_holiday table."""
+    op.drop_index(op.f('ix_market_holiday_holiday_date'), table_name='market_holiday')
+    op.drop_index(op.f('ix_market_holiday_exchange'), table_name='market_holiday')
+    op.drop_table('market_holiday')
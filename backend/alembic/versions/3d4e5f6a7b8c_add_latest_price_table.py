@@ -0,0 +1,52 @@
+"""Add latest_price table and newest-first price_history index
+
+Revision ID: 3d4e5f6a7b8c
+Revises: 2c3d4e5f6a7b
+Create Date: 2026-01-27 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3d4e5f6a7b8c'
+down_revision: Union[str, Sequence[str], None] = '2c3d4e5f6a7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create latest_price, backfill it from price_history, add the composite index."""
+    op.create_table(
+        'latest_price',
+        sa.Column('instrument_id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('price_date', sa.Date(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('source', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['instrument_id'], ['instrument.id'], ),
+        sa.PrimaryKeyConstraint('instrument_id', 'org_id'),
+    )
+    op.create_index(
+        'ix_price_history_inst_org_date',
+        'price_history',
+        ['instrument_id', 'org_id', sa.text('price_date DESC')],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO latest_price (instrument_id, org_id, price_date, close, source, updated_at) "
+        "SELECT p.instrument_id, COALESCE(p.org_id, 0), p.price_date, p.close, p.source, CURRENT_TIMESTAMP "
+        "FROM price_history p WHERE p.id = ("
+        " SELECT p2.id FROM price_history p2"
+        " WHERE p2.instrument_id = p.instrument_id AND COALESCE(p2.org_id, 0) = COALESCE(p.org_id, 0)"
+        " ORDER BY p2.price_date DESC, p2.id DESC LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    """Drop latest_price and the composite index."""
+    op.drop_index('ix_price_history_inst_org_date', table_name='price_history')
+    op.drop_table('latest_price')
@@ -0,0 +1,201 @@
+"""Add realized_entry table (realized gains and income ledger)
+
+Revision ID: 4e5f6a7b8c9d
+Revises: 3d4e5f6a7b8c
+Create Date: 2026-02-03 10:20:00.000000
+
+"""
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4e5f6a7b8c9d'
+down_revision: Union[str, Sequence[str], None] = '3d4e5f6a7b8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create realized_entry and fill it by replaying the existing activities."""
+    op.create_table(
+        'realized_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=True),
+        sa.Column('owner_user_id', sa.Integer(), nullable=True),
+        sa.Column('activity_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column('instrument_id', sa.Integer(), nullable=True),
+        sa.Column('broker_id', sa.Integer(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('currency_code', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        sa.Column('proceeds_ccy', sa.Float(), nullable=False),
+        sa.Column('cost_ccy', sa.Float(), nullable=False),
+        sa.Column('amount_ccy', sa.Float(), nullable=False),
+        sa.Column('tax_ccy', sa.Float(), nullable=False),
+        sa.Column('base_currency', sa.String(), nullable=False),
+        sa.Column('fx_rate', sa.Float(), nullable=True),
+        sa.Column('cost_base', sa.Float(), nullable=True),
+        sa.Column('amount_base', sa.Float(), nullable=True),
+        sa.Column('tax_base', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_user_id'], ['user.id'], ),
+        sa.ForeignKeyConstraint(['account_id'], ['account.id'], ),
+        sa.ForeignKeyConstraint(['instrument_id'], ['instrument.id'], ),
+        sa.ForeignKeyConstraint(['broker_id'], ['broker.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_realized_entry_org_id'), 'realized_entry', ['org_id'], unique=False)
+    op.create_index(op.f('ix_realized_entry_owner_user_id'), 'realized_entry', ['owner_user_id'], unique=False)
+    op.create_index(op.f('ix_realized_entry_activity_id'), 'realized_entry', ['activity_id'], unique=False)
+    op.create_index('ix_realized_entry_owner_date', 'realized_entry', ['owner_user_id', 'date'], unique=False)
+    op.create_index('ix_realized_entry_lot', 'realized_entry', ['account_id', 'instrument_id', 'broker_id'], unique=False)
+
+    _backfill(op.get_bind())
+
+
+# ---- backfill ----------------------------------------------------------------
+# A frozen copy of the replay as it was at this revision (moving-average cost,
+# base currency from app_setting, FX as of each date). It only touches the
+# columns that exist here, so later changes to app.models.realized cannot
+# break upgrading an existing database.
+
+_activity = sa.table(
+    'activity',
+    *(sa.column(c) for c in (
+        'id', 'owner_user_id', 'org_id', 'type', 'account_id', 'instrument_id', 'broker_id', 'date',
+        'quantity', 'unit_price', 'currency_code', 'fee', 'withholding_tax', 'capital_gains_tax',
+    )),
+)
+_setting = sa.table('app_setting', sa.column('owner_user_id'), sa.column('base_currency_code'))
+_fx = sa.table('fx_rates', sa.column('base'), sa.column('quote'), sa.column('as_of_date'), sa.column('rate'))
+_entry = sa.table(
+    'realized_entry',
+    *(sa.column(c) for c in (
+        'activity_id', 'owner_user_id', 'org_id', 'kind', 'account_id', 'instrument_id', 'broker_id', 'date',
+        'currency_code', 'quantity', 'proceeds_ccy', 'cost_ccy', 'amount_ccy', 'tax_ccy',
+        'base_currency', 'fx_rate', 'cost_base', 'amount_base', 'tax_base',
+    )),
+)
+_INCOME = {'Dividend': 'dividend', 'Interest': 'interest'}
+
+
+def _norm(code: Optional[str]) -> str:
+    s = (code or '').strip()
+    return 'GBp' if s == 'GBp' else s.upper()
+
+
+def _rate(conn, base: str, quote: str, on, cache: Dict) -> Optional[float]:
+    """base->quote as of `on`, with the GBp (pence) rules of fx_rate_on."""
+    if base == quote:
+        return 1.0
+    if (base, quote) == ('GBP', 'GBp'):
+        return 100.0
+    if (base, quote) == ('GBp', 'GBP'):
+        return 0.01
+    if base == 'GBp':
+        r = _rate(conn, 'GBP', quote, on, cache)
+        return None if r is None else r / 100.0
+    if quote == 'GBp':
+        r = _rate(conn, base, 'GBP', on, cache)
+        return None if r is None else r * 100.0
+    key = (base, quote, on)
+    if key not in cache:
+        cache[key] = conn.execute(
+            sa.select(_fx.c.rate)
+            .where(_fx.c.base == base, _fx.c.quote == quote, _fx.c.as_of_date <= on)
+            .order_by(_fx.c.as_of_date.desc()).limit(1)
+        ).scalar()
+    return cache[key]
+
+
+def _lot_rows(conn, acts, base: str, cache: Dict) -> List[Dict]:
+    rows: List[Dict] = []
+    qty = cost_ccy = cost_base = 0.0
+    base_known = True
+    for a in acts:
+        q = float(a.quantity or 0.0)
+        p = float(a.unit_price or 0.0)
+        fee = float(a.fee or 0.0)
+        rate = _rate(conn, _norm(a.currency_code), base, a.date, cache)
+        if a.type == 'Buy':
+            total = q * p + fee
+            qty += q
+            cost_ccy += total
+            cost_base += total * (rate or 0.0)
+            base_known = base_known and rate is not None
+            continue
+
+        entry = {
+            'activity_id': a.id, 'owner_user_id': a.owner_user_id, 'org_id': a.org_id,
+            'account_id': a.account_id, 'instrument_id': a.instrument_id, 'broker_id': a.broker_id,
+            'date': a.date, 'currency_code': a.currency_code, 'base_currency': base, 'fx_rate': rate,
+        }
+        if a.type == 'Sell':
+            proceeds = q * p - fee
+            tax = float(a.capital_gains_tax or 0.0)
+            sold_ccy = sold_base = 0.0
+            if qty <= 0:
+                qty -= q
+            else:
+                matched = min(q, qty)
+                sold_ccy = cost_ccy / qty * matched
+                sold_base = cost_base / qty * matched
+                cost_ccy -= cost_ccy / qty * q
+                cost_base -= cost_base / qty * q
+                qty -= q
+            known = base_known and rate is not None
+            entry.update(
+                kind='sell', quantity=q, proceeds_ccy=proceeds, cost_ccy=sold_ccy,
+                amount_ccy=proceeds - sold_ccy, tax_ccy=tax,
+                cost_base=sold_base if known else None,
+                amount_base=proceeds * rate - sold_base if known else None,
+                tax_base=tax * rate if rate is not None else None,
+            )
+            if qty < 1e-10:
+                qty = cost_ccy = cost_base = 0.0
+                base_known = True
+        else:
+            amount = abs(p)
+            tax = float(a.withholding_tax or 0.0)
+            entry.update(
+                kind=_INCOME[a.type], quantity=q, proceeds_ccy=0.0, cost_ccy=0.0,
+                amount_ccy=amount, tax_ccy=tax, cost_base=None,
+                amount_base=amount * rate if rate is not None else None,
+                tax_base=tax * rate if rate is not None else None,
+            )
+        rows.append(entry)
+    return rows
+
+
+def _backfill(conn) -> None:
+    bases = {
+        owner: _norm(code or 'USD')
+        for owner, code in conn.execute(sa.select(_setting.c.owner_user_id, _setting.c.base_currency_code))
+    }
+    acts = conn.execute(
+        sa.select(_activity)
+        .where(_activity.c.type.in_(['Buy', 'Sell', *_INCOME]))
+        .order_by(_activity.c.account_id, _activity.c.instrument_id, _activity.c.broker_id,
+                  _activity.c.date, _activity.c.id)
+    ).all()
+    cache: Dict = {}
+    rows: List[Dict] = []
+    for _key, lot in groupby(acts, key=lambda a: (a.account_id, a.instrument_id, a.broker_id)):
+        lot = list(lot)
+        rows += _lot_rows(conn, lot, bases.get(lot[0].owner_user_id, 'USD'), cache)
+    if rows:
+        conn.execute(sa.insert(_entry), rows)
+
+
+def downgrade() -> None:
+    """Drop realized_entry."""
+    op.drop_index('ix_realized_entry_lot', table_name='realized_entry')
+    op.drop_index('ix_realized_entry_owner_date', table_name='realized_entry')
+    op.drop_index(op.f('ix_realized_entry_activity_id'), table_name='realized_entry')
+    op.drop_index(op.f('ix_realized_entry_owner_user_id'), table_name='realized_entry')
+    op.drop_index(op.f('ix_realized_entry_org_id'), table_name='realized_entry')
+    op.drop_table('realized_entry')
@@ -0,0 +1,27 @@
+"""Add app_setting.data_version (cache key for per-user reports)
+
+Revision ID: 5f6a7b8c9d0e
+Revises: 4e5f6a7b8c9d
+Create Date: 2026-02-06 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5f6a7b8c9d0e'
+down_revision: Union[str, Sequence[str], None] = '4e5f6a7b8c9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add data_version to app_setting."""
+    op.add_column('app_setting', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Drop app_setting.data_version."""
+    op.drop_column('app_setting', 'data_version')
@@ -0,0 +1,30 @@
+"""Add app_setting.cost_basis_method
+
+Revision ID: 6a7b8c9d0e1f
+Revises: 5f6a7b8c9d0e
+Create Date: 2026-02-10 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6a7b8c9d0e1f'
+down_revision: Union[str, Sequence[str], None] = '5f6a7b8c9d0e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add cost_basis_method (average | fifo | lifo) to app_setting."""
+    op.add_column(
+        'app_setting',
+        sa.Column('cost_basis_method', sa.String(), nullable=False, server_default='average'),
+    )
+
+
+def downgrade() -> None:
+    """Drop app_setting.cost_basis_method."""
+    op.drop_column('app_setting', 'cost_basis_method')
@@ -0,0 +1,47 @@
+"""Add position_snapshot table (month-end lot books for as-of positions)
+
+Revision ID: 7b8c9d0e1f2a
+Revises: 6a7b8c9d0e1f
+Create Date: 2026-02-10 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7b8c9d0e1f2a'
+down_revision: Union[str, Sequence[str], None] = '6a7b8c9d0e1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create position_snapshot; it is filled by the snapshot job, not here."""
+    op.create_table(
+        'position_snapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=True),
+        sa.Column('owner_user_id', sa.Integer(), nullable=True),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('method', sa.String(), nullable=False),
+        sa.Column('base_currency', sa.String(), nullable=False),
+        sa.Column('activity_count', sa.Integer(), nullable=False),
+        sa.Column('books', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['owner_user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('owner_user_id', 'method', 'base_currency', 'as_of', name='uq_position_snapshot'),
+    )
+    op.create_index(op.f('ix_position_snapshot_org_id'), 'position_snapshot', ['org_id'], unique=False)
+    op.create_index(op.f('ix_position_snapshot_owner_user_id'), 'position_snapshot', ['owner_user_id'], unique=False)
+    op.create_index(op.f('ix_position_snapshot_as_of'), 'position_snapshot', ['as_of'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop position_snapshot."""
+    op.drop_index(op.f('ix_position_snapshot_as_of'), table_name='position_snapshot')
+    op.drop_index(op.f('ix_position_snapshot_owner_user_id'), table_name='position_snapshot')
+    op.drop_index(op.f('ix_position_snapshot_org_id'), table_name='position_snapshot')
+    op.drop_table('position_snapshot')
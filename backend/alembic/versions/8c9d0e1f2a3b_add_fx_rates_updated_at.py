@@ -0,0 +1,27 @@
+"""Add fx_rates.updated_at (change marker for cached reports)
+
+Revision ID: 8c9d0e1f2a3b
+Revises: 7b8c9d0e1f2a
+Create Date: 2026-02-12 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8c9d0e1f2a3b'
+down_revision: Union[str, Sequence[str], None] = '7b8c9d0e1f2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add updated_at to fx_rates (NULL for rows written before)."""
+    op.add_column('fx_rates', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop fx_rates.updated_at."""
+    op.drop_column('fx_rates', 'updated_at')
@@ -0,0 +1,40 @@
+"""Add job_lock table for scheduler leases
+
+Revision ID: f1a2b3c4d5e6
+Revises: e5f6a7b8c9d0
+Create Date: 2026-01-12 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a2b3c4d5e6'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create job_lock table."""
+    op.create_table(
+        'job_lock',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('owner', sa.String(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('note', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index(op.f('ix_job_lock_owner'), 'job_lock', ['owner'], unique=False)
+    op.create_index(op.f('ix_job_lock_expires_at'), 'job_lock', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop job_lock table."""
+    op.drop_index(op.f('ix_job_lock_expires_at'), table_name='job_lock')
+    op.drop_index(op.f('ix_job_lock_owner'), table_name='job_lock')
+    op.drop_table('job_lock')
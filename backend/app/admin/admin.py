@@ -17,6 +17,7 @@ from app.models.asset_subclass import AssetSubclass
 from app.models.sector import Sector
 from app.models.account import Account
 from app.models.settings import AppSetting
+from app.models.market_holiday import MarketHoliday
 
 
 # --- Auth (same as before) ----------------------------------------------------
@@ -152,6 +153,12 @@ def mount_admin(app):
         column_list  = [Broker.id, Broker.name]
         form_columns = [Broker.name]
 
+    # 5) Exchange holidays (used by the market-aware price refresh)
+    class MarketHolidayAdmin(ModelView, model=MarketHoliday):
+        column_list  = [MarketHoliday.exchange, MarketHoliday.holiday_date, MarketHoliday.name]
+        form_columns = [MarketHoliday.exchange, MarketHoliday.holiday_date, MarketHoliday.name]
+        column_default_sort = [(MarketHoliday.holiday_date, True)]
+
     # Register views in sidebar
     admin.add_view(BrokerAdmin)
     admin.add_view(CurrencyAdmin)
@@ -159,4 +166,5 @@ def mount_admin(app):
     admin.add_view(AssetSubclassAdmin)
     admin.add_view(SectorAdmin)
     admin.add_view(AccountAdmin)
-    admin.add_view(AppSettingAdmin)
\ No newline at end of file
+    admin.add_view(AppSettingAdmin)
+    admin.add_view(MarketHolidayAdmin)
\ No newline at end of file
@@ -47,4 +47,10 @@ def get_current_user_2fa(
     user = session.get(User, payload["uid"])
     if not user or not user.is_active:
         raise HTTPException(401, "Invalid user")
-    return user
\ No newline at end of file
+    return user
+
+def get_current_admin(user: User = Depends(get_current_user)) -> User:
+    """Require a logged-in admin user."""
+    if not user.is_admin:
+        raise HTTPException(403, "Admin only")
+    return user
@@ -1,12 +1,13 @@
 # app/api/routes/accounts_ops.py
 from __future__ import annotations
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 from sqlmodel import Session, select
 
+from app.api.streaming import ndjson_response, wants_ndjson
 from app.core.db import get_session
 from app.models.account import Account
 from app.models.account_movement import AccountMovement
@@ -163,10 +164,31 @@ def transfer_between_accounts(
     }
 
 
+def _movement_dict(m: AccountMovement) -> dict:
+    return {
+        "id": m.id,
+        "created_at": m.created_at.isoformat() + "Z",
+        "as_of_date": m.as_of_date.isoformat(),
+        "type": m.type,
+        "note": m.note,
+        "from_account_id": m.from_account_id,
+        "to_account_id": m.to_account_id,
+        "amount_input": m.amount_input,
+        "delta_from": m.delta_from,
+        "delta_to": m.delta_to,
+        "from_currency": m.from_currency,
+        "to_currency": m.to_currency,
+        "fx_rate_used": m.fx_rate_used,
+        "fx_source": m.fx_source,
+    }
+
+
 @router.get("/movements")
 def list_movements(
+    request: Request,
     account_id: Optional[int] = Query(None, description="Filter by account (either leg)"),
     limit: int = 100,
+    stream: Annotated[bool, Query(description="Stream NDJSON (same as Accept: application/x-ndjson)")] = False,
     session: Session = Depends(get_session),
 ) -> List[dict]:
     q = select(AccountMovement).order_by(AccountMovement.created_at.desc()).limit(limit)
@@ -175,23 +197,7 @@ def list_movements(
             (AccountMovement.from_account_id == account_id) |
             (AccountMovement.to_account_id == account_id)
         )
+    if wants_ndjson(request, stream):
+        return ndjson_response(_movement_dict(m) for m in session.exec(q.execution_options(yield_per=1000)))
     rows = session.exec(q).all()
-    out = []
-    for m in rows:
-        out.append({
-            "id": m.id,
-            "created_at": m.created_at.isoformat() + "Z",
-            "as_of_date": m.as_of_date.isoformat(),
-            "type": m.type,
-            "note": m.note,
-            "from_account_id": m.from_account_id,
-            "to_account_id": m.to_account_id,
-            "amount_input": m.amount_input,
-            "delta_from": m.delta_from,
-            "delta_to": m.delta_to,
-            "from_currency": m.from_currency,
-            "to_currency": m.to_currency,
-            "fx_rate_used": m.fx_rate_used,
-            "fx_source": m.fx_source,
-        })
-    return out
\ No newline at end of file
+    return [_movement_dict(m) for m in rows]
@@ -1,12 +1,12 @@
 # app/api/routes/activities.py
-from typing import List, Tuple, Optional
+from typing import Annotated, Dict, List, Tuple, Optional
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy import func, case
 from sqlmodel import Session, select
 
-from app.core.db import get_session
+from app.core.db import get_read_session, get_session
 from app.models.activities import Activity
 from app.models.broker import Broker
 from app.models.account import Account
@@ -16,6 +16,8 @@ from app.schemas.activities import ActivityCreate, ActivityReadWithCalc, Activit
 from app.core.base_currency import get_base_currency_code
 from app.services.fx_resolver import fx_rate_on
 from app.api.deps import get_current_user
+from app.api.streaming import ndjson_response, wants_ndjson
+from app.core.config import settings
 from app.core.audit_logger import log_activity_created, log_activity_updated, log_activity_deleted
 
 router = APIRouter(prefix="/activities", tags=["activities"])
@@ -35,16 +37,31 @@ def _calc_amounts(act: Activity) -> Tuple[float, float]:
     return gross, net
 
 
-def _as_read_with_calc(act: Activity, session: Session, user: User) -> ActivityReadWithCalc:
-    base_ccy = get_base_currency_code(session, user=user)
+def _as_read_with_calc(
+    act: Activity,
+    session: Session,
+    user: User,
+    *,
+    base_ccy: Optional[str] = None,
+    fx_cache: Optional[Dict] = None,
+    broker_names: Optional[Dict[int, str]] = None,
+) -> ActivityReadWithCalc:
+    """
+    List callers pass the per-request lookups (base currency, FX cache, broker
+    names) so a page of N activities doesn't cost ~3N queries.
+    """
+    base_ccy = base_ccy or get_base_currency_code(session, user=user)
 
     gross, net = _calc_amounts(act)
-    rate: Optional[float] = fx_rate_on(session, act.currency_code, base_ccy, act.date)
+    rate: Optional[float] = fx_rate_on(session, act.currency_code, base_ccy, act.date, fx_cache)
 
     broker_name: Optional[str] = None
     if act.broker_id:
-        b = session.get(Broker, act.broker_id)
-        broker_name = b.name if b else None
+        if broker_names is not None:
+            broker_name = broker_names.get(act.broker_id)
+        else:
+            b = session.get(Broker, act.broker_id)
+            broker_name = b.name if b else None
 
     return ActivityReadWithCalc(
         id=act.id,
@@ -118,16 +135,46 @@ def _available_qty(
 
 @router.get("", response_model=List[ActivityReadWithCalc])
 def list_activities(
-    session: Session = Depends(get_session),
+    request: Request,
+    stream: Annotated[bool, Query(description="Stream NDJSON (same as Accept: application/x-ndjson)")] = False,
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user),
 ):
+    # Resolve before loading rows: creating default settings commits, which
+    # would expire every loaded activity and reload them one by one.
+    base_ccy = get_base_currency_code(session, user=user)
+
     stmt = (
         select(Activity)
         .where(Activity.owner_user_id == user.id)
         .order_by(Activity.date.desc(), Activity.id.desc())
     )
+
+    if wants_ndjson(request, stream):
+        # broker names up front (one query), then rows as the cursor yields them
+        broker_names = dict(session.exec(
+            select(Broker.id, Broker.name)
+            .where(Broker.id.in_(select(Activity.broker_id).where(Activity.owner_user_id == user.id)))
+        ).all())
+        fx_cache: Dict = {}
+        rows = session.exec(stmt.execution_options(yield_per=settings.ACTIVITY_YIELD_PER or 1000))
+        return ndjson_response(
+            _as_read_with_calc(a, session, user, base_ccy=base_ccy, fx_cache=fx_cache, broker_names=broker_names)
+            for a in rows
+        )
+
     rows = session.exec(stmt).all()
-    return [_as_read_with_calc(a, session, user) for a in rows]
+
+    broker_ids = {a.broker_id for a in rows if a.broker_id}
+    broker_names = {
+        b.id: b.name
+        for b in session.exec(select(Broker).where(Broker.id.in_(broker_ids))).all()
+    } if broker_ids else {}
+    fx_cache: Dict = {}
+    return [
+        _as_read_with_calc(a, session, user, base_ccy=base_ccy, fx_cache=fx_cache, broker_names=broker_names)
+        for a in rows
+    ]
 
 
 @router.post("", response_model=ActivityReadWithCalc, status_code=status.HTTP_201_CREATED)
@@ -245,7 +292,7 @@ def positions_available(
     instrument_id: int = Query(...),
     broker_id: Optional[int] = Query(None),
     on: Optional[date] = Query(None, description="If provided, availability up to (and including) this date"),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user),
 ):
     qty = _available_qty(
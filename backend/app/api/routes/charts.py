@@ -1,12 +1,14 @@
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from dateutil.relativedelta import relativedelta
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlmodel import Session
 
-from app.core.db import get_session
+from app.core.db import get_read_session
+from app.core.responses import FastJSONResponse
 from app.models.user import User
 from app.api.deps import get_current_user
+from app.api.streaming import ndjson_response, wants_ndjson
 from app.services.analytics import get_portfolio_history
 
 try:
@@ -19,9 +21,11 @@ router = APIRouter(prefix="/charts", tags=["charts"])
 
 @router.get("/portfolio_history")
 def portfolio_history(
+    request: Request,
     period: str = Query("1M", description="Period: 1M, 3M, 6M, YTD, 1Y, ALL"),
     base: Optional[str] = Query(None),
-    session: Session = Depends(get_session),
+    stream: Annotated[bool, Query(description="Stream NDJSON (same as Accept: application/x-ndjson)")] = False,
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user)
 ):
     today = date.today()
@@ -42,4 +46,8 @@ def portfolio_history(
         start_date = date(1900, 1, 1) # Service handles min activity date
     
     history = get_portfolio_history(session, user, start_date, today, base)
-    return history
+    if wants_ndjson(request, stream):
+        # points are reconciled against the end of the period, so the series
+        # is complete before the first one can be sent
+        return ndjson_response(history)
+    return FastJSONResponse(history)
@@ -17,6 +17,7 @@ from app.core.config import settings
 router = APIRouter(prefix="/fx", tags=["fx"])
 
 OXR_APP_ID = settings.oxr_app_id
+OXR_BASE_URL = settings.OXR_BASE_URL.rstrip("/")
 
 
 # ----------------- helpers -----------------
@@ -51,7 +52,7 @@ def _gbp_pence_from_gbp(rate_gbp: float | None) -> float | None:
 def _fetch_oxr_latest() -> tuple[dict[str, float], date]:
     if not OXR_APP_ID:
         raise HTTPException(status_code=500, detail="OXR_APP_ID not configured")
-    url = f"https://openexchangerates.org/api/latest.json?app_id={OXR_APP_ID}"
+    url = f"{OXR_BASE_URL}/latest.json?app_id={OXR_APP_ID}"
     r = requests.get(url, timeout=15)
     if r.status_code != 200:
         raise HTTPException(status_code=502, detail=f"OXR error {r.status_code}: {r.text[:200]}")
@@ -87,7 +88,7 @@ def _fetch_oxr_historical(on: date) -> tuple[dict[str, float], date]:
     if not OXR_APP_ID:
         raise HTTPException(status_code=500, detail="OXR_APP_ID not configured")
 
-    url = f"https://openexchangerates.org/api/historical/{on.isoformat()}.json"
+    url = f"{OXR_BASE_URL}/historical/{on.isoformat()}.json"
     r = requests.get(url, params={"app_id": OXR_APP_ID}, timeout=15)
     if r.status_code != 200:
         raise HTTPException(status_code=502, detail=f"OXR error {r.status_code}: {r.text[:200]}")
@@ -19,8 +19,7 @@ from ...schemas.instrument import (
 from ...services.instruments import fetch_from_yahoo
 from ...services.yf_client import fetch_profile_and_price
 from ...services.price_refresher import refresh_all_yahoo_prices
-from yahooquery import search as yq_search
-from app.services.price_refresher import refresh_all_prices
+from app.tasks.jobs import accepted_payload, enqueue_price_refresh
 
 
 logger = logging.getLogger(__name__)
@@ -59,6 +58,7 @@ def instruments_ping():
 
 @router.get("/suggest")
 def suggest(q: str, limit: int = 10):
+    from yahooquery import search as yq_search  # heavy (pandas); load on first use
     res = yq_search(q)
     items = []
     for it in (res.get("quotes") or [])[: limit * 3]:
@@ -358,8 +358,8 @@ def add_manual_price(
     return ph
 
 
-# ---------- hardened refresh endpoint ----------
-@router.post("/refresh_all_prices")
+# ---------- async refresh endpoint ----------
+@router.post("/refresh_all_prices", status_code=status.HTTP_202_ACCEPTED)
 def refresh_all_prices_endpoint(
     limit: int = Query(0, ge=0, description="Max instruments to refresh (0 = all)"),
     timeout_sec: int = Query(90, ge=1, le=180, description="Soft time budget in seconds"),
@@ -371,19 +371,18 @@ def refresh_all_prices_endpoint(
     session: Session = Depends(get_session),
 ):
     """
-    Refresh instrument prices via selected provider.
+    Enqueue a price refresh via the selected provider and return immediately.
     - provider: auto (AlphaVantage if key set, else Stooq), alphavantage, or stooq
-    - Stops early if time budget is exceeded.
+    - Poll GET /jobs/{job_id} (or stream /jobs/{job_id}/events) for progress.
     """
     try:
-        return refresh_all_prices(
+        job = enqueue_price_refresh(
             session,
             limit=limit,
             time_budget_sec=timeout_sec,
-            provider=provider,              
-            logger=logger,
+            provider=provider,
         )
     except Exception as e:
-        logger.exception("refresh_all_prices failed")
+        logger.exception("refresh_all_prices enqueue failed")
         raise HTTPException(status_code=500, detail=f"refresh_all_prices failed: {e}")
-    
+    return accepted_payload(job)
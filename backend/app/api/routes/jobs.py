@@ -0,0 +1,78 @@
+# app/api/routes/jobs.py
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.core.db import SessionLocal, get_session
+from app.tasks.jobs import TERMINAL_STATUSES, get_job, job_to_dict
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# SSE polling cadence and keep-alive interval (seconds)
+_POLL_SEC = 1.0
+_KEEPALIVE_SEC = 15.0
+
+
+def _load(job_id: str):
+    with SessionLocal() as s:
+        job = get_job(s, job_id)
+        return job_to_dict(job) if job else None
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str, session: Session = Depends(get_session)):
+    """Status and progress counters (processed/updated/skipped) for a background job."""
+    job = get_job(session, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job_to_dict(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events stream of job progress.
+    Emits `progress` whenever counters change and a final `done` event.
+    """
+    first = await run_in_threadpool(_load, job_id)
+    if first is None:
+        raise HTTPException(404, "Job not found")
+
+    async def _stream():
+        last = None
+        idle = 0.0
+        snap = first
+        while True:
+            if snap is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found\"}\n\n"
+                return
+
+            payload = json.dumps(snap)
+            if payload != last:
+                last = payload
+                idle = 0.0
+                event = "done" if snap["status"] in TERMINAL_STATUSES else "progress"
+                yield f"event: {event}\ndata: {payload}\n\n"
+                if event == "done":
+                    return
+            elif idle >= _KEEPALIVE_SEC:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(_POLL_SEC)
+            idle += _POLL_SEC
+            snap = await run_in_threadpool(_load, job_id)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,21 @@
+# app/api/routes/metrics.py
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus scrape endpoint (text format 0.0.4)."""
+    token = settings.METRICS_TOKEN
+    if token:
+        auth = request.headers.get("authorization", "")
+        if not secrets.compare_digest(auth, f"Bearer {token}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,14 +1,18 @@
 # app/api/routes/portfolio.py
 from __future__ import annotations
+from datetime import date
 from typing import List, Optional, Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
 
 
-from app.core.db import get_session
+from app.core.db import get_read_session
+from app.core.responses import FastJSONResponse
 from app.services.positions import compute_positions
-from app.services.price_history import latest_price_for
+from app.services.realized import GROUPS, realized_summary
+from app.services.tax_report import tax_report, tax_year_bounds
+from app.services.price_history import latest_price_for, latest_prices_for
 from app.models.user import User
 from app.api.deps import get_current_user  # 👈 add this
 
@@ -23,32 +27,106 @@ except Exception:
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
+MAX_BASES = 10
+MAX_BATCH_IDS = 1000
+
+
 @router.get("/closing")
 def portfolio_closing(
     base: Optional[str] = Query(None, description="Optional base currency override; falls back to settings"),
-    session: Session = Depends(get_session),
+    bases: Optional[List[str]] = Query(None, description="Extra base currencies to value in the same pass (repeat or comma-separate)"),
+    as_of: Optional[date] = Query(None, description="Positions at the end of this day, valued at its closes and FX; default now"),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user),          # 👈 current user
     ctx: TenantContext = Depends(get_tenant_ctx),    # 👈 optional tenant context
-) -> List[dict]:
-    return compute_positions(
+) -> Response:
+    extra = [c.strip() for v in bases or () for c in v.split(",") if c.strip()]
+    if len(extra) > MAX_BASES:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BASES} base currencies per request")
+    if as_of is not None and as_of > date.today():
+        raise HTTPException(status_code=422, detail="as_of cannot be in the future")
+    return FastJSONResponse(compute_positions(
         session,
         base_ccy_override=base,
         user=user,
         ctx=ctx,
-    )
+        bases=extra or None,
+        as_of=as_of,
+    ))
+
+
+@router.get("/realized")
+def portfolio_realized(
+    group_by: Optional[List[str]] = Query(None, description="year, account and/or instrument (repeat or comma-separate); default year"),
+    start: Optional[date] = Query(None, description="First day included"),
+    end: Optional[date] = Query(None, description="Last day included"),
+    session: Session = Depends(get_read_session),
+    user: User = Depends(get_current_user),
+) -> List[dict]:
+    """Realized gains and income in the base currency, summed from the realized ledger."""
+    groups = [g.strip().lower() for v in group_by or ("year",) for g in v.split(",") if g.strip()]
+    unknown = [g for g in groups if g not in GROUPS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown group_by {unknown}; use {', '.join(GROUPS)}")
+    return realized_summary(session, user.id, groups, start=start, end=end)
+
+
+@router.get("/tax_report")
+def portfolio_tax_report(
+    year: int = Query(..., ge=1900, le=2100, description="Tax year, named by the calendar year it starts in"),
+    base: Optional[str] = Query(None, description="Optional base currency override; falls back to settings"),
+    year_start: Optional[str] = Query(None, pattern=r"^\d{2}-\d{2}$", description="MM-DD; default TAX_YEAR_START"),
+    session: Session = Depends(get_read_session),
+    user: User = Depends(get_current_user),
+) -> Response:
+    """Gains (average cost and FIFO), income, taxes and fees per jurisdiction for one tax year."""
+    try:
+        tax_year_bounds(year, year_start)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="year_start must be a valid MM-DD day")
+    return FastJSONResponse(tax_report(session, user, year, base_ccy_override=base, year_start=year_start))
+
+
+def _org_id(ctx) -> Optional[int]:
+    org = getattr(ctx, "org", None)
+    return getattr(org, "id", None)
+
+
+@router.get("/latest_prices")
+def get_latest_prices(
+    ids: str = Query(..., description="Comma-separated instrument ids"),
+    db: Session = Depends(get_read_session),
+    ctx: TenantContext = Depends(get_tenant_ctx),
+) -> Response:
+    """Latest close for many instruments in one query (missing ids get price=None)."""
+    try:
+        wanted = list(dict.fromkeys(int(x) for x in ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if len(wanted) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    prices = latest_prices_for(db, wanted, _org_id(ctx))
+    out = []
+    for iid in wanted:
+        p = prices.get(iid)
+        out.append({"instrument_id": iid, "price": p[0] if p else None, "date": p[1] if p else None})
+    return FastJSONResponse(out)
+
 
 # NOTE: path is correct; don't repeat "/portfolio" because of the prefix above
 @router.get("/{instrument_id}/latest_price")
 def get_latest_price(
     instrument_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     ctx: TenantContext = Depends(get_tenant_ctx),
 ):
     """
     Returns latest price for instrument, filtered by tenant if ctx is provided.
     If you haven't wired multi-tenant yet, ctx will be None and return global/latest.
     """
-    price = latest_price_for(db, instrument_id, ctx)
+    price = latest_price_for(db, instrument_id, _org_id(ctx))
     if not price:
         return {"instrument_id": instrument_id, "price": None}
-    return {"instrument_id": instrument_id, "price": price.close, "date": price.price_date}
\ No newline at end of file
+    close, price_date = price
+    return {"instrument_id": instrument_id, "price": close, "date": price_date}
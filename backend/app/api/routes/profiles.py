@@ -0,0 +1,34 @@
+# app/api/routes/profiles.py
+"""Admin access to request profiles recorded by app.core.profiling."""
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import get_current_admin
+from app.core.profiling import artifact_path, profile_dir
+
+router = APIRouter(prefix="/_profiles", tags=["admin"], dependencies=[Depends(get_current_admin)])
+
+
+@router.get("")
+def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    files = sorted(profile_dir().glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    out = []
+    for p in files[:limit]:
+        try:
+            data = json.loads(p.read_text())
+        except Exception:
+            continue
+        out.append({k: data.get(k) for k in ("id", "method", "path", "elapsed_ms", "samples", "created_at")})
+    return out
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, format: str = Query("json", pattern="^(json|collapsed)$")):
+    path = artifact_path(profile_id, format)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(path.read_text())
+    return json.loads(path.read_text())
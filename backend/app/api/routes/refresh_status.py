@@ -1,15 +1,27 @@
 from __future__ import annotations
 import os
-from fastapi import APIRouter
-from app.tasks.scheduler import LAST_RUN  # uses the same module memory
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.core.db import get_session
+from app.services.job_runs import STATS_WINDOW, last_run_at, run_stats
 
 router = APIRouter()
 
 @router.get("/_refresh_status")
-def get_refresh_status():
+def get_refresh_status(window: int = STATS_WINDOW, session: Session = Depends(get_session)):
+    window = max(1, min(window, 1000))
     return {
-        "prices": {"last_run": LAST_RUN.get("prices"), "next_run": None},
-        "fx": {"last_run": LAST_RUN.get("fx"), "next_run": None},
+        "prices": {
+            "last_run": last_run_at(session, "prices"),
+            "next_run": None,
+            "stats": run_stats(session, "prices", window=window),
+        },
+        "fx": {
+            "last_run": last_run_at(session, "fx"),
+            "next_run": None,
+            "stats": run_stats(session, "fx", window=window),
+        },
         "provider": os.getenv("PRICE_REFRESH_PROVIDER", os.getenv("PRICE_PROVIDER", "auto")),
         "scheduler_enabled": True,
-    }
\ No newline at end of file
+    }
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import os
-from datetime import timezone, datetime
+from datetime import timezone
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, HTTPException, Request, Depends
@@ -12,10 +12,31 @@ from sqlmodel import Session
 from app.core.db import get_session
 from app.core.settings_svc import get_or_create_settings
 from app.models.settings import AppSetting
+from app.services.provider_health import provider_health
+from app.services.job_runs import JOBS as RUN_JOBS, STATS_WINDOW, last_run_at, run_stats
 
 router = APIRouter()
 
 
+def _last_runs(session: Session) -> Dict[str, Any]:
+    """
+    Last-run timestamps per job, from the job_run history.
+    Deployments that predate the table fall back to the AppSetting stamps.
+    """
+    last_runs = {job: last_run_at(session, job) for job in RUN_JOBS}
+    if all(last_runs.values()):
+        return last_runs
+    try:
+        settings_row = get_or_create_settings(session)
+        if not last_runs["prices"] and settings_row.last_prices_refresh:
+            last_runs["prices"] = settings_row.last_prices_refresh.replace(tzinfo=timezone.utc).isoformat()
+        if not last_runs["fx"] and settings_row.last_fx_refresh:
+            last_runs["fx"] = settings_row.last_fx_refresh.replace(tzinfo=timezone.utc).isoformat()
+    except Exception:
+        pass  # DB read failed, report what the history had
+    return last_runs
+
+
 def _job_to_dict(job: Job) -> Dict[str, Any]:
     """Serialize an APScheduler job to a JSON-friendly dict."""
     return {
@@ -30,10 +51,16 @@ def _job_to_dict(job: Job) -> Dict[str, Any]:
 
 
 @router.get("/_scheduler_status")
-def scheduler_status(request: Request, session: Session = Depends(get_session)):
+def scheduler_status(
+    request: Request,
+    window: int = STATS_WINDOW,
+    session: Session = Depends(get_session),
+):
     """
     Report scheduler status (enabled flag), configured provider, last-run timestamps,
-    and upcoming jobs (with UTC next_run_time).
+    upcoming jobs (with UTC next_run_time) and run-duration stats over the
+    last `window` runs of each job (from the job_run history table).
+    `providers` holds this process's price-provider health and breaker state.
     """
     sched = getattr(request.app.state, "scheduler", None)
 
@@ -42,65 +69,41 @@ def scheduler_status(request: Request, session: Session = Depends(get_session)):
         for j in sched.get_jobs():
             jobs.append(_job_to_dict(j))
 
-            jobs.append(_job_to_dict(j))
-
-    # Read last-run timestamps from DB (preferred) or scheduler module
-    try:
-        from app.tasks.scheduler import LAST_RUN  # fallback
-        
-        # Default to in-memory fallback
-        last_runs = {
-            "prices": LAST_RUN.get("prices"),
-            "fx": LAST_RUN.get("fx"),
-        }
-        
-        # Override with DB persistence if available
-        try:
-            settings_row = get_or_create_settings(session)
-            if settings_row.last_prices_refresh:
-                last_runs["prices"] = settings_row.last_prices_refresh.replace(tzinfo=timezone.utc).isoformat()
-            if settings_row.last_fx_refresh:
-                last_runs["fx"] = settings_row.last_fx_refresh.replace(tzinfo=timezone.utc).isoformat()
-        except Exception:
-            pass # DB read failed, stick to memory
-
-    except Exception:
-        last_runs = {"prices": None, "fx": None}
-
     provider = (
         os.getenv("PRICE_REFRESH_PROVIDER")
         or os.getenv("PRICE_PROVIDER")
         or "auto"
     )
 
+    window = max(1, min(window, 1000))
     return {
         "enabled": bool(sched),
         "provider": provider,
-        "last_runs": last_runs,
+        "last_runs": _last_runs(session),
+        "stats": {job: run_stats(session, job, window=window) for job in RUN_JOBS},
+        "providers": provider_health.stats(),
         "jobs": jobs,
     }
 
 
-@router.post("/_refresh_prices_now")
+@router.post("/_refresh_prices_now", status_code=202)
 def refresh_prices_now(
     request: Request,
     timeout_sec: int = 55,
     limit: int = 0,
+    only_due: bool = False,
+    session: Session = Depends(get_session),
 ):
     """
     Manually trigger a price refresh. Respects your configured provider.
+    The refresh runs in the background; the response carries a job id to poll
+    at GET /jobs/{job_id} (or stream at /jobs/{job_id}/events).
     Query params:
       - timeout_sec: soft time budget (seconds)
       - limit: max instruments to process (0 = all)
+      - only_due: skip instruments whose market hasn't closed since their last price
     """
-    try:
-        from sqlalchemy.orm import sessionmaker
-        from sqlmodel import Session
-        from app.core.db import engine
-        from app.services.price_refresher import refresh_all_prices
-        from app.tasks.scheduler import LAST_RUN
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Import error: {e}")
+    from app.tasks.jobs import accepted_payload, enqueue_price_refresh
 
     provider = (
         os.getenv("PRICE_REFRESH_PROVIDER")
@@ -108,28 +111,15 @@ def refresh_prices_now(
         or "auto"
     )
 
-    SessionLocal = sessionmaker(
-        bind=engine, class_=Session, autoflush=False, autocommit=False
-    )
-
     try:
-        with SessionLocal() as s:
-            result = refresh_all_prices(
-                s,
-                limit=limit,
-                time_budget_sec=timeout_sec,
-                provider=provider,
-                logger=None,
-            )
-            
-            # Persist last run time
-            settings_row = get_or_create_settings(s)
-            settings_row.last_prices_refresh = datetime.now(timezone.utc)
-            s.add(settings_row)
-            s.commit()
-            
-        LAST_RUN["prices"] = datetime.now(timezone.utc).isoformat()
+        job = enqueue_price_refresh(
+            session,
+            limit=limit,
+            time_budget_sec=timeout_sec,
+            provider=provider,
+            only_due=only_due,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"refresh failed: {e}")
 
-    return {"ok": True, "provider": provider, "result": result}
\ No newline at end of file
+    return {**accepted_payload(job), "provider": provider}
@@ -6,6 +6,7 @@ from ..deps import get_session, get_current_user
 from ...models.settings import AppSetting
 from ...models.currency import Currency
 from ...models.user import User
+from ...services.lots import normalize_method
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -24,7 +25,7 @@ def _get_or_create_user_settings(session: Session, user: User) -> AppSetting:
 @router.get("", response_model=dict)
 def get_settings(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
     s = _get_or_create_user_settings(session, user)
-    return {"base_currency_code": s.base_currency_code}
+    return {"base_currency_code": s.base_currency_code, "cost_basis_method": s.cost_basis_method}
 
 @router.put("", response_model=dict, status_code=status.HTTP_200_OK)
 def update_settings(payload: dict, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
@@ -33,9 +34,18 @@ def update_settings(payload: dict, session: Session = Depends(get_session), user
     if base_code and not session.get(Currency, base_code):
         raise HTTPException(status_code=400, detail="Unknown currency_code")
 
+    method = None
+    if "cost_basis_method" in payload:
+        try:
+            method = normalize_method(payload["cost_basis_method"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     s = _get_or_create_user_settings(session, user)
     s.base_currency_code = base_code
+    if method:
+        s.cost_basis_method = method
     session.add(s)
     session.commit()
     session.refresh(s)
-    return {"base_currency_code": s.base_currency_code}
\ No newline at end of file
+    return {"base_currency_code": s.base_currency_code, "cost_basis_method": s.cost_basis_method}
\ No newline at end of file
@@ -0,0 +1,70 @@
+# app/api/streaming.py
+"""
+Opt-in NDJSON streaming for large list endpoints.
+
+A route streams when the client sends `Accept: application/x-ndjson` or
+`?stream=true`: one JSON document per line, written as rows come out of
+the route's generator instead of after the whole list is built.
+
+Lines are grouped into chunks of about CHUNK_BYTES. Starlette pulls the
+next chunk only after the server has accepted the previous one (uvicorn
+waits for the socket to drain), so a slow client slows the producer rather
+than letting rows pile up in memory. Request-scoped dependencies such as
+the DB session stay open until the last chunk is sent.
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.responses import orjson
+
+NDJSON = "application/x-ndjson"
+CHUNK_BYTES = 32 * 1024
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+def _default(o: Any):
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, BaseModel):
+        return o.model_dump(mode="json")
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+
+def encode_line(row: Any) -> bytes:
+    if isinstance(row, BaseModel):
+        return row.model_dump_json().encode() + b"\n"
+    if orjson is not None:
+        return orjson.dumps(row, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(row, default=_default, separators=(",", ":")).encode() + b"\n"
+
+
+def ndjson_chunks(rows: Iterable[Any], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    buf = bytearray()
+    for row in rows:
+        buf += encode_line(row)
+        if len(buf) >= chunk_bytes:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+def ndjson_response(rows: Iterable[Any], **kwargs) -> StreamingResponse:
+    """Stream `rows` (dicts or pydantic models) as NDJSON, lazily."""
+    return StreamingResponse(ndjson_chunks(rows), media_type=NDJSON, **kwargs)
@@ -3,18 +3,26 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 import asyncio
 import logging
 from contextlib import asynccontextmanager
 
+# Startup-time breakdown (logged once the lifespan has finished booting)
+_t_import = time.perf_counter()
+_startup: dict = {}
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.core.config import settings
-from app.core.db import init_db
+from app.core.db import ReadYourWritesMiddleware, engine, init_db, read_engine
 from app.tasks.scheduler import build_scheduler  # returns an APScheduler instance
 from app.core.slowapi_config import limiter, rate_limit_exceeded_handler
+from app.core import metrics, profiling, query_stats
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
 from slowapi.errors import RateLimitExceeded
 
 logger = logging.getLogger(__name__)
@@ -41,6 +49,9 @@ from app.api.routes.scheduler_status import router as scheduler_status_router
 from app.api.routes.refresh_status import router as refresh_status_router
 from app.api.routes.auth_email import router as auth_email_router
 from app.api.routes.charts import router as charts_router
+from app.api.routes.jobs import router as jobs_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.profiles import router as profiles_router
 
 
 from app.admin.admin import mount_admin
@@ -58,16 +69,25 @@ logging.basicConfig(
 
 log = logging.getLogger(__name__)
 
+_startup["imports_ms"] = round((time.perf_counter() - _t_import) * 1000, 1)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup/shutdown lifecycle."""
-    # 1) Ensure tables exist + seed reference data (idempotent)
+    t0 = time.perf_counter()
+
+    # 1) Ensure tables exist + seed reference data (idempotent;
+    #    create_all is skipped when Alembic says the schema is at head)
     maybe_coro = init_db()
     if asyncio.iscoroutine(maybe_coro):
-        await maybe_coro
+        maybe_coro = await maybe_coro
+    init_timings = maybe_coro if isinstance(maybe_coro, dict) else {}
+    t_db = time.perf_counter()
 
-    # 2) Start background scheduler (guarded + idempotent per-process)
+    # 2) Start background scheduler (guarded + idempotent per-process).
+    #    Jobs take a DB lease, so enabling this in several workers is safe; the
+    #    preferred deployment is a dedicated `python -m app.tasks.worker` process.
     app.state.scheduler = None
     if os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes", "on"):
         try:
@@ -78,6 +98,13 @@ async def lifespan(app: FastAPI):
         except Exception:
             log.exception("Failed to start background scheduler")
 
+    t_end = time.perf_counter()
+    log.info(
+        "Startup: imports=%sms create_app=%sms init_db=%sms %s scheduler=%sms",
+        _startup.get("imports_ms"), _startup.get("create_app_ms"),
+        round((t_db - t0) * 1000, 1), init_timings, round((t_end - t_db) * 1000, 1),
+    )
+
     # Hand over control to the app
     yield
 
@@ -92,7 +119,8 @@ async def lifespan(app: FastAPI):
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+    t0 = time.perf_counter()
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=FastJSONResponse)
     app.router.redirect_slashes = False
 
     # Rate limiting
@@ -117,6 +145,37 @@ def create_app() -> FastAPI:
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
+    # gzip / Brotli for bodies above COMPRESSION_MIN_SIZE
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            gzip_level=settings.GZIP_LEVEL,
+            brotli_quality=settings.BROTLI_QUALITY,
+        )
+
+    # Read-your-writes: pin a client's reads to the primary right after it writes
+    if read_engine is not None:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # SQL statement counts per request (Server-Timing header + N+1 warnings)
+    if query_stats.ENABLED:
+        app.add_middleware(query_stats.QueryStatsMiddleware)
+
+    # Prometheus metrics (latency histograms, in-flight, DB pool, jobs)
+    if settings.METRICS_ENABLED:
+        pools = {"primary": engine}
+        if read_engine is not None:
+            pools["replica"] = read_engine
+        metrics.register_engine_pools(pools)
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.include_router(metrics_router)
+
+    # Admin-only request profiling; nothing is installed unless enabled
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(profiling.ProfilingMiddleware)
+        app.include_router(profiles_router)
+
     # Routers
     app.include_router(health_router)
     app.include_router(lookups_router)
@@ -138,6 +197,7 @@ def create_app() -> FastAPI:
     app.include_router(refresh_status_router)
     app.include_router(auth_email_router)
     app.include_router(charts_router)
+    app.include_router(jobs_router)
 
 
     # Auth
@@ -154,6 +214,7 @@ def create_app() -> FastAPI:
     except Exception as e:  # noqa: BLE001
         log.warning("Admin UI failed to mount: %s", e)
 
+    _startup["create_app_ms"] = round((time.perf_counter() - t0) * 1000, 1)
     log.info("FastAPI app created and routes mounted.")
     return app
 
@@ -5,6 +5,15 @@ from app.core.settings_svc import get_or_create_settings
 from app.models.currency import Currency
 from app.models.user import User
 
+
+def norm_ccy(code: Optional[str]) -> str:
+    """
+    Preserve 'GBp' exactly; otherwise uppercase 3-letter codes.
+    """
+    s = (code or "").strip()
+    return "GBp" if s == "GBp" else s.upper()
+
+
 def get_base_currency_code(session: Session, *, user: Optional[User] = None) -> str:
     """
     Returns the user's base currency (falls back to global if user is None).
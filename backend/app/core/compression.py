@@ -0,0 +1,86 @@
+# app/core/compression.py
+"""
+Response compression: Brotli when the client accepts it and the `brotli`
+package is installed, gzip otherwise.
+
+Bodies smaller than COMPRESSION_MIN_SIZE bytes are sent as-is. Streaming
+responses (NDJSON) are compressed chunk by chunk, and both encoders are
+flushed after every chunk so lines still reach the client as they are
+produced. The responders build on Starlette's IdentityResponder, so Vary,
+Content-Length and pre-encoded bodies are handled as in its GZipMiddleware.
+"""
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without the package
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self.compressor.process(body)
+        return out + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class GzipResponder(IdentityResponder):
+    """Like Starlette's GZipResponder, but sync-flushed after every streamed chunk."""
+
+    content_encoding = "gzip"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 6) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)  # wbits=31: gzip container
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self.compressor.compress(body)
+        return out + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+def _accepts(header: str, coding: str) -> bool:
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and _accepts(accept, "br"):
+            responder: ASGIApp = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif _accepts(accept, "gzip"):
+            responder = GzipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -15,6 +15,25 @@ class Settings(BaseSettings):
     # --- Database (required) ---
     database_url: str = Field(..., alias="DATABASE_URL")
 
+    # --- Read replica (optional; see app/core/db.py: get_read_session) ---
+    DATABASE_READ_URL: Optional[str] = Field(None, alias="DATABASE_READ_URL")
+    READ_AFTER_WRITE_SEC: float = Field(5.0, alias="READ_AFTER_WRITE_SEC")
+    REPLICA_RETRY_SEC: float = Field(30.0, alias="REPLICA_RETRY_SEC")
+
+    # --- Engine tuning (see app/core/db.py: engine_options) ---
+    DB_POOL_SIZE: int = Field(10, alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(20, alias="DB_MAX_OVERFLOW")
+    DB_POOL_RECYCLE: int = Field(3600, alias="DB_POOL_RECYCLE")
+    DB_QUERY_CACHE_SIZE: int = Field(1200, alias="DB_QUERY_CACHE_SIZE")
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = Field(30000, alias="DB_STATEMENT_TIMEOUT_MS")
+    DB_APPLICATION_NAME: str = Field("portivue", alias="DB_APPLICATION_NAME")
+    # psycopg 3: prepare after N executions; -1 disables (PgBouncer transaction mode)
+    DB_PREPARE_THRESHOLD: Optional[int] = Field(5, alias="DB_PREPARE_THRESHOLD")
+    SQLITE_POOL_SIZE: int = Field(5, alias="SQLITE_POOL_SIZE")
+    SQLITE_MMAP_SIZE: int = Field(256 * 1024 * 1024, alias="SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE_KB: int = Field(64 * 1024, alias="SQLITE_CACHE_SIZE_KB")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+
     # --- Frontend URL (auth redirects, CORS, etc.) ---
     FRONTEND_URL: str = Field(..., alias="FRONTEND_URL")
 
@@ -52,6 +71,54 @@ class Settings(BaseSettings):
     # --- FX API ---
     oxr_app_id: Optional[str] = Field(default=None, alias="OXR_APP_ID")
 
+    # --- Market data / FX provider endpoints ---
+    # Override to point at a local stand-in (see benchmarks/fake_providers.py)
+    STOOQ_BASE_URL: str = Field("https://stooq.com", alias="STOOQ_BASE_URL")
+    ALPHA_VANTAGE_BASE_URL: str = Field("https://www.alphavantage.co", alias="ALPHA_VANTAGE_BASE_URL")
+    YAHOO_QUERY_BASE_URL: str = Field("https://query2.finance.yahoo.com", alias="YAHOO_QUERY_BASE_URL")
+    YAHOO_AUTOC_BASE_URL: str = Field("https://autoc.finance.yahoo.com", alias="YAHOO_AUTOC_BASE_URL")
+    FRANKFURTER_BASE_URL: str = Field("https://api.frankfurter.app", alias="FRANKFURTER_BASE_URL")
+    OXR_BASE_URL: str = Field("https://openexchangerates.org/api", alias="OXR_BASE_URL")
+
+    # --- Metrics ---
+    # /metrics is off when METRICS_ENABLED is false; with a token set, scrapers
+    # must send "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = Field(True, alias="METRICS_ENABLED")
+    METRICS_TOKEN: Optional[str] = Field(None, alias="METRICS_TOKEN")
+
+    # --- Request profiling (admin opt-in, see app/core/profiling.py) ---
+    PROFILING_ENABLED: bool = Field(False, alias="PROFILING_ENABLED")
+    PROFILE_SAMPLE_INTERVAL_MS: float = Field(5.0, alias="PROFILE_SAMPLE_INTERVAL_MS")
+    PROFILE_DIR: Optional[str] = Field(None, alias="PROFILE_DIR")
+
+    # --- Valuation reads: column rows instead of ORM objects (app/repositories/projection.py) ---
+    VALUATION_ROW_PROJECTION: bool = Field(True, alias="VALUATION_ROW_PROJECTION")
+    # activities are streamed this many rows at a time into the reducers (0 = load all at once)
+    ACTIVITY_YIELD_PER: int = Field(2000, alias="ACTIVITY_YIELD_PER")
+
+    # --- In-process price-history cache (see app/services/price_cache.py) ---
+    PRICE_CACHE_MAX_MB: float = Field(64.0, alias="PRICE_CACHE_MAX_MB")
+    PRICE_CACHE_TTL_SEC: float = Field(300.0, alias="PRICE_CACHE_TTL_SEC")
+
+    # --- On-disk price archive (see app/services/price_archive.py); off when unset ---
+    PRICE_ARCHIVE_DIR: Optional[str] = Field(None, alias="PRICE_ARCHIVE_DIR")
+    # compaction keeps this many recent days of public rows in price_history
+    PRICE_ARCHIVE_KEEP_DAYS: int = Field(365, alias="PRICE_ARCHIVE_KEEP_DAYS")
+
+    # --- Tax-year reports (see app/services/tax_report.py) ---
+    TAX_YEAR_START: str = Field("01-01", alias="TAX_YEAR_START")  # MM-DD, e.g. 04-06 for the UK
+    TAX_REPORT_CACHE_SIZE: int = Field(256, alias="TAX_REPORT_CACHE_SIZE")  # reports kept in memory
+
+    # --- Month-end position snapshots (see app/services/position_snapshots.py) ---
+    # a snapshot is kept once this many trades were replayed since the previous one
+    POSITION_SNAPSHOT_MIN_ACTIVITIES: int = Field(100, alias="POSITION_SNAPSHOT_MIN_ACTIVITIES")
+
+    # --- Response compression (see app/core/compression.py) ---
+    COMPRESSION_ENABLED: bool = Field(True, alias="COMPRESSION_ENABLED")
+    COMPRESSION_MIN_SIZE: int = Field(1024, alias="COMPRESSION_MIN_SIZE")  # bytes
+    GZIP_LEVEL: int = Field(6, alias="GZIP_LEVEL")
+    BROTLI_QUALITY: int = Field(4, alias="BROTLI_QUALITY")
+
     # --- Redis (for rate limiting and caching) ---
     REDIS_URL: Optional[str] = Field(default=None, alias="REDIS_URL")
 
@@ -1,20 +1,98 @@
 # app/core/db.py
 from __future__ import annotations
 
+import configparser
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel, Session, create_engine, text
 
 from app.core.config import settings
 
+log = logging.getLogger(__name__)
+
+# --- Engine tuning per dialect ---
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    create_engine kwargs for a database URL.
+
+    - SQLite in-memory: one shared connection (StaticPool); pool sizing kwargs
+      don't apply to it.
+    - SQLite file: a small QueuePool; pragmas are set per connection in
+      `_sqlite_on_connect` (WAL etc.).
+    - Postgres: the pooled settings, plus statement_timeout and
+      application_name sent at connect time, and psycopg 3's server-side
+      prepared statements after DB_PREPARE_THRESHOLD executions (set it to
+      -1 behind PgBouncer in transaction mode).
+    """
+    u = make_url(url)
+    opts: Dict[str, Any] = {"future": True, "query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+
+    if u.get_backend_name() == "sqlite":
+        opts["connect_args"] = {"check_same_thread": False}
+        if u.database in (None, "", ":memory:"):
+            opts["poolclass"] = StaticPool
+        else:
+            opts.update(pool_size=settings.SQLITE_POOL_SIZE, max_overflow=settings.SQLITE_POOL_SIZE * 2)
+        return opts
+
+    opts.update(
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,          # Connection pool size
+        max_overflow=settings.DB_MAX_OVERFLOW,    # Allow burst connections
+        pool_recycle=settings.DB_POOL_RECYCLE,    # Recycle connections (seconds)
+    )
+    if u.get_backend_name() == "postgresql":
+        connect_args: Dict[str, Any] = {"application_name": settings.DB_APPLICATION_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"
+        if u.get_driver_name() == "psycopg":
+            threshold = settings.DB_PREPARE_THRESHOLD
+            connect_args["prepare_threshold"] = None if threshold is not None and threshold < 0 else threshold
+        opts["connect_args"] = connect_args
+    return opts
+
+
+def _sqlite_on_connect(dbapi_conn, _record) -> None:
+    in_memory = False
+    cur = dbapi_conn.cursor()
+    try:
+        for _, name, file in cur.execute("PRAGMA database_list").fetchall():
+            if name == "main":
+                in_memory = not file
+        if not in_memory:
+            # WAL: readers don't block the writer; NORMAL is durable at checkpoints
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cur.close()
+
+
+def make_engine(url: str) -> Engine:
+    """Engine with the dialect's tuning profile (see `engine_options`)."""
+    eng = create_engine(url, **engine_options(url))
+    if eng.dialect.name == "sqlite":
+        event.listen(eng, "connect", _sqlite_on_connect)
+    return eng
+
+
 # --- Engine (sync) ---
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=10,          # Connection pool size
-    max_overflow=20,       # Allow burst connections
-    pool_recycle=3600,     # Recycle connections after 1 hour
-    future=True,
-)
+engine = make_engine(settings.database_url)
 
 # --- Session factory ---
 SessionLocal = sessionmaker(
@@ -31,49 +109,229 @@ def get_session():
         yield session
 
 
-def init_db() -> None:
+# --- Read replica (optional) ---
+# Read-only routes depend on `get_read_session`. With DATABASE_READ_URL set
+# those sessions go to the replica, except:
+#   - for READ_AFTER_WRITE_SEC after the caller's own write (a short-lived
+#     cookie set by ReadYourWritesMiddleware, so it holds across workers), and
+#   - while the replica is unreachable (retried after REPLICA_RETRY_SEC).
+# Read sessions are flagged read-only; flushing one raises.
+
+read_engine = make_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=Session,
+    autoflush=False,
+    autocommit=False,
+) if read_engine is not None else None
+
+STICKY_COOKIE = "pv_primary_until"
+_replica_down_until = 0.0
+
+
+def is_read_only(session) -> bool:
+    return bool(session.info.get("read_only"))
+
+
+@event.listens_for(Session, "before_flush")
+def _block_read_only_flush(session, _ctx, _instances) -> None:
+    if is_read_only(session) and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("write attempted on a read-only session")
+
+
+def wants_primary(request: Optional[Request]) -> bool:
+    """True while the caller's read-your-writes window is open."""
+    if request is None:
+        return False
+    try:
+        return float(request.cookies.get(STICKY_COOKIE) or 0) > time.time()
+    except ValueError:
+        return False
+
+
+def _open_read_session(request: Optional[Request]) -> Session:
+    global _replica_down_until
+    if ReadSessionLocal is not None and not wants_primary(request) and time.monotonic() >= _replica_down_until:
+        session = ReadSessionLocal()
+        try:
+            session.connection()  # check out now so an outage falls back instead of failing the request
+            session.info["replica"] = True
+            return session
+        except OperationalError as e:
+            session.close()
+            _replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SEC
+            log.warning("read replica unavailable, using primary for %ss: %s", settings.REPLICA_RETRY_SEC, e)
+    return SessionLocal()
+
+
+def get_read_session(request: Request):
+    """FastAPI dependency: a read-only session on the replica (or the primary)."""
+    session = _open_read_session(request)
+    session.info["read_only"] = True
+    with session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """After a successful unsafe request, pin this client's reads to the primary for a few seconds."""
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                ttl = settings.READ_AFTER_WRITE_SEC
+                cookie = f"{STICKY_COOKIE}={time.time() + ttl:.3f}; Max-Age={int(ttl) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                if settings.SESSION_COOKIE_SECURE:
+                    cookie += "; Secure"
+                headers = list(message.get("headers") or [])
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+ALEMBIC_INI = os.getenv("ALEMBIC_CONFIG") or str(Path(__file__).resolve().parents[2] / "alembic.ini")
+
+SEED_CURRENCIES = [
+    ("USD", "US Dollar"),
+    ("EUR", "Euro"),
+    ("GBP", "Pound Sterling"),
+    ("GBp", "Sterling Pence"),
+    ("AED", "UAE Dirham"),
+    ("PKR", "Pak Rupee"),
+    ("INR", "Indian Rupee"),
+    ("JPY", "Japanese Yen"),
+    ("CNY", "Chinese Yuan"),
+    ("AUD", "Australian Dollar"),
+]
+
+
+_REV_RE = re.compile(r"^(down_revision|revision)\b[^=]*=\s*(.+)$", re.M)
+_QUOTED_RE = re.compile(r"""['"]([^'"]+)['"]""")
+
+
+def _script_heads() -> Set[str]:
+    """
+    Head revisions of the migration scripts, read straight from the files:
+    importing alembic (mako, script loading) costs more than create_all.
+    """
+    cfg = configparser.ConfigParser(defaults={"here": os.path.dirname(ALEMBIC_INI)})
+    cfg.read(ALEMBIC_INI)
+    versions = Path(cfg.get("alembic", "script_location")) / "versions"
+
+    revisions: Set[str] = set()
+    referenced: Set[str] = set()
+    for path in versions.glob("*.py"):
+        for key, value in _REV_RE.findall(path.read_text(encoding="utf-8")):
+            ids = set(_QUOTED_RE.findall(value))
+            (revisions if key == "revision" else referenced).update(ids)
+    return revisions - referenced
+
+
+def alembic_at_head(bind=None) -> bool:
+    """
+    True when the database's alembic_version matches the migration script heads.
+    Anything unexpected (no version table, no alembic.ini) means "not at head".
+    """
+    try:
+        if not os.path.exists(ALEMBIC_INI):
+            return False
+        with (bind or engine).connect() as conn:
+            current = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        heads = _script_heads()
+        return bool(heads) and current == heads
+    except Exception as e:  # noqa: BLE001
+        log.debug("alembic head check failed: %s", e)
+        return False
+
+
+def init_db() -> Dict[str, float]:
     """
     Create tables if they don’t exist (idempotent),
     then seed reference data like currencies.
+
+    When Alembic reports the schema is at head, create_all is skipped, and
+    seeding only runs if a reference currency is missing. Returns per-phase
+    timings in ms for the startup log.
     """
+    timings: Dict[str, float] = {}
+    t = time.perf_counter()
+
+    def lap(name: str) -> None:
+        nonlocal t
+        now = time.perf_counter()
+        timings[name] = round((now - t) * 1000, 1)
+        t = now
+
     # Import every module that defines SQLModel tables:
     import app.models.user          # noqa: F401
     import app.models.broker        # noqa: F401
     import app.models.account       # noqa: F401
     import app.models.instrument    # noqa: F401
     import app.models.activities    # noqa: F401
+    import app.models.realized      # noqa: F401
+    import app.models.position_snapshot  # noqa: F401
     import app.models.price_history # noqa: F401
+    import app.models.latest_price  # noqa: F401
     import app.models.currency      # noqa: F401
+    import app.models.job_lock      # noqa: F401
+    import app.models.background_job  # noqa: F401
+    import app.models.job_run       # noqa: F401
+    import app.models.market_holiday  # noqa: F401
+    lap("models")
 
-    # Creates missing tables only; safe to call every boot.
-    # Note: On some databases like Postgres, pre-existing ENUM types can cause IntegrityErrors
-    # during create_all if they were created by a previous run.
-    try:
-        SQLModel.metadata.create_all(engine)
-    except Exception as e:
-        import sqlalchemy
-        if isinstance(e, sqlalchemy.exc.IntegrityError) and "duplicate" in str(e).lower():
-            # If it's just a duplicate type error, we can likely ignore it as tables 
-            # will still be created or already exist.
-            print(f"INFO: Database already initialized or has existing types: {e}")
-        else:
-            print(f"WARNING: Database initialization encountered an error: {e}")
-            # We don't re-raise here to allow the app to attempt starting if tables are already there
+    at_head = alembic_at_head()
+    lap("alembic_check")
 
-    # --- Seed reference currencies ---
-    currencies = [
-        ("USD", "US Dollar"),
-        ("EUR", "Euro"),
-        ("GBP", "Pound Sterling"),
-        ("GBp", "Sterling Pence"),
-        ("AED", "UAE Dirham"),
-        ("PKR", "Pak Rupee"),
-        ("INR", "Indian Rupee"),
-        ("JPY", "Japanese Yen"),
-        ("CNY", "Chinese Yuan"),
-        ("AUD", "Australian Dollar"),
-    ]
+    if not at_head:
+        # Creates missing tables only; safe to call every boot.
+        # Note: On some databases like Postgres, pre-existing ENUM types can cause IntegrityErrors
+        # during create_all if they were created by a previous run.
+        try:
+            SQLModel.metadata.create_all(engine)
+        except Exception as e:
+            import sqlalchemy
+            if isinstance(e, sqlalchemy.exc.IntegrityError) and "duplicate" in str(e).lower():
+                # If it's just a duplicate type error, we can likely ignore it as tables 
+                # will still be created or already exist.
+                print(f"INFO: Database already initialized or has existing types: {e}")
+            else:
+                print(f"WARNING: Database initialization encountered an error: {e}")
+                # We don't re-raise here to allow the app to attempt starting if tables are already there
+        lap("create_all")
 
+        # A latest_price table created just now next to existing prices needs a backfill
+        from app.models.latest_price import rebuild_latest_prices
+        try:
+            with engine.begin() as conn:
+                empty = conn.execute(text("SELECT 1 FROM latest_price LIMIT 1")).first() is None
+                if empty and conn.execute(text("SELECT 1 FROM price_history LIMIT 1")).first() is not None:
+                    rebuild_latest_prices(conn)
+        except Exception as e:  # noqa: BLE001
+            log.warning("latest_price backfill failed: %s", e)
+        lap("latest_price_backfill")
+
+        # Same for the realized gains / income ledger
+        from app.models.realized import rebuild_realized
+        try:
+            with engine.begin() as conn:
+                empty = conn.execute(text("SELECT 1 FROM realized_entry LIMIT 1")).first() is None
+                if empty and conn.execute(text("SELECT 1 FROM activity LIMIT 1")).first() is not None:
+                    rebuild_realized(conn)
+        except Exception as e:  # noqa: BLE001
+            log.warning("realized_entry backfill failed: %s", e)
+        lap("realized_backfill")
+
+    # --- Seed reference currencies ---
     insert_sql = """
     INSERT INTO currency (code, name)
     VALUES (:code, :name)
@@ -81,5 +339,12 @@ def init_db() -> None:
     """
 
     with engine.begin() as conn:
-        for code, name in currencies:
-            conn.execute(text(insert_sql), {"code": code, "name": name})
\ No newline at end of file
+        missing = SEED_CURRENCIES
+        if at_head:
+            have = set(conn.execute(text("SELECT code FROM currency")).scalars())
+            missing = [(c, n) for c, n in SEED_CURRENCIES if c not in have]
+        for code, name in missing:
+            conn.execute(text(insert_sql), {"code": code, "name": name})
+    lap("seed")
+
+    return timings
@@ -0,0 +1,352 @@
+# app/core/metrics.py
+"""
+Minimal Prometheus-compatible metrics (text exposition format 0.0.4).
+
+A tiny in-process registry instead of prometheus_client: counters, gauges
+and histograms with fixed label names, plus callback gauges that are read at
+scrape time (DB pool). Recording is a lock + a few float adds; label children
+can be bound once (`CACHE_LOOKUPS.labels("fx", "hit")`) to skip the dict
+lookup on hot paths.
+
+Metrics are per process: with several uvicorn workers each one reports its
+own series, so scrape the workers individually or run a single worker.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers sub-ms DB-only routes up to slow chart builds / refresh jobs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if v == -math.inf:
+        return "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[LabelValues, object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    @property
+    def family(self) -> str:
+        """The name HELP/TYPE are written for (must match the sample names)."""
+        return self.name
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.family} {self.doc}", f"# TYPE {self.family} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    @property
+    def family(self) -> str:
+        # 0.0.4 has no suffix handling: the family is named like its samples
+        return f"{self.name}_total"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self):
+        for key, child in sorted(self._children.items()):
+            yield f"{self.family}{_labels(self.labelnames, key)} {_fmt(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def samples(self):
+        for key, child in sorted(self._children.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(child.value)}"
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples come from `fn()` -> {label values: value} at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str], fn: Callable[[], Dict[LabelValues, float]]):
+        super().__init__(name, doc, labelnames)
+        self._fn = fn
+
+    def samples(self):
+        try:
+            values = self._fn() or {}
+        except Exception:
+            return
+        for key, v in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}"
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if i < len(self.counts):
+                self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_target", "_t0")
+
+    def __init__(self, target):
+        self._target = target
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._target.observe(time.perf_counter() - self._t0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def samples(self):
+        for key, child in sorted(self._children.items()):
+            with child._lock:
+                counts, total, n = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = 'le="%s"' % _fmt(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            inf = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, inf)} {n}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {n}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, doc, labelnames))
+
+
+def gauge(name: str, doc: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, doc, labelnames))
+
+
+def histogram(name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, doc, labelnames, buckets))
+
+
+def callback_gauge(name: str, doc: str, labelnames: Sequence[str], fn) -> CallbackGauge:
+    return REGISTRY.register(CallbackGauge(name, doc, labelnames, fn))
+
+
+# ---- application metrics -----------------------------------------------------
+
+HTTP_REQUESTS = counter(
+    "portivue_http_requests", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = histogram(
+    "portivue_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+HTTP_IN_FLIGHT = gauge("portivue_http_requests_in_flight", "HTTP requests currently being served.")
+
+PROVIDER_LATENCY = histogram(
+    "portivue_provider_request_duration_seconds", "Latest-price provider call latency.", ("provider",))
+PROVIDER_ERRORS = counter(
+    "portivue_provider_errors", "Latest-price provider calls that failed.", ("provider",))
+
+CACHE_LOOKUPS = counter(
+    "portivue_cache_lookups", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+
+JOB_DURATION = histogram(
+    "portivue_job_duration_seconds", "Background job run time.", ("job", "status"), buckets=JOB_BUCKETS)
+JOB_LAST_SUCCESS = gauge(
+    "portivue_job_last_success_timestamp_seconds", "Unix time of the last successful run.", ("job",))
+
+
+def _pool_stats(engines: Dict[str, object]) -> Dict[LabelValues, float]:
+    out: Dict[LabelValues, float] = {}
+    for name, engine in engines.items():
+        pool = getattr(engine, "pool", None)
+        for stat in ("size", "checkedout", "overflow", "checkedin"):
+            fn = getattr(pool, stat, None)
+            if callable(fn):
+                out[(name, stat)] = float(fn())
+    return out
+
+
+def register_engine_pools(engines: Dict[str, object]) -> None:
+    """Expose QueuePool size / checked-out / overflow / idle per named engine."""
+    fn = lambda: _pool_stats(engines)  # noqa: E731
+    g = callback_gauge(
+        "portivue_db_pool_connections",
+        "DB connection pool state (size, checkedout, overflow, checkedin).",
+        ("engine", "state"),
+        fn,
+    )
+    g._fn = fn  # re-registration (another create_app) points at the new engines
+
+
+# ---- ASGI middleware ---------------------------------------------------------
+
+class MetricsMiddleware:
+    """Per-route latency histogram, request counter and in-flight gauge."""
+
+    def __init__(self, app, *, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - t0
+            HTTP_IN_FLIGHT.dec()
+            # Route templates (not raw paths) keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, str(status["code"])).inc()
@@ -0,0 +1,276 @@
+# app/core/profiling.py
+"""
+Opt-in sampling profiler for single requests (admin only).
+
+Off by default: unless PROFILING_ENABLED is set, the middleware is not even
+installed. When it is, an admin can profile one request by sending the
+header `X-Profile: 1` (or the query flag `?__profile=1`). While that request
+runs, a background thread samples the stacks of threads executing the
+matched endpoint for that request every PROFILE_SAMPLE_INTERVAL_MS and
+writes, keyed by a request id returned in `X-Profile-Id`:
+
+  <id>.json       per-function self/total time, an `app.services.*` summary
+  <id>.collapsed  folded stacks ("a;b;c 12") for flamegraph.pl / speedscope
+
+Sampling (not cProfile) because sync endpoints run on threadpool workers
+the middleware doesn't own, and because it keeps the profiled request's own
+overhead low. Concurrent requests to the same endpoint are told apart by the
+context they run in: the middleware sets a context variable, which the
+threadpool item (or the event loop handle, for async endpoints) carries. Artifacts are served by /_profiles (see routes/profiles.py).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+HEADER = "x-profile"
+QUERY_FLAG = "__profile"
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+Frame = Tuple[str, str]  # (module, function)
+
+# The sampler of the request being profiled, visible to the threads serving it
+_PROFILED: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar(
+    "profiled_request", default=None
+)
+
+
+def profile_dir() -> Path:
+    d = Path(settings.PROFILE_DIR or os.path.join(tempfile.gettempdir(), "portivue-profiles"))
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def artifact_path(profile_id: str, ext: str) -> Optional[Path]:
+    if not _ID_RE.match(profile_id or ""):
+        return None
+    return profile_dir() / f"{profile_id}.{ext}"
+
+
+def _context_of(frame) -> Optional[contextvars.Context]:
+    """
+    The context a thread's current work item runs in: the anyio worker's
+    `context` local for threadpool calls, the asyncio handle's for the loop.
+    """
+    while frame is not None:
+        for value in frame.f_locals.values():
+            if isinstance(value, contextvars.Context):
+                return value
+            if isinstance(value, asyncio.Handle):
+                return value._context
+        frame = frame.f_back
+    return None
+
+
+class StackSampler:
+    """
+    Samples stacks of threads currently running `target_code` (an endpoint's
+    code object). With `only_own=True` only threads serving a context where
+    this sampler is `_PROFILED` count, i.e. the profiled request.
+    """
+
+    def __init__(self, interval_sec: float, target_code=None, *, only_own: bool = False):
+        self.interval = interval_sec
+        self.target_code = target_code
+        self.only_own = only_own
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            target = self.target_code
+            if target is None:
+                continue
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = self._stack(frame, target)
+                if stack and self.only_own and not self._serves_me(frame, len(stack)):
+                    continue
+                if stack:
+                    self.stacks[stack] += 1
+                    self.samples += 1
+
+    def _serves_me(self, frame, depth: int) -> bool:
+        for _ in range(depth):  # climb to the frame above the endpoint's
+            frame = frame.f_back
+        ctx = _context_of(frame)
+        return ctx is not None and ctx.get(_PROFILED) is self
+
+    @staticmethod
+    def _stack(frame, target) -> Optional[Tuple[Frame, ...]]:
+        """Root-first stack starting at the endpoint frame, or None if it isn't on it."""
+        out: List[Frame] = []
+        while frame is not None:
+            code = frame.f_code
+            out.append((frame.f_globals.get("__name__", "?"), code.co_name))
+            if code is target:
+                return tuple(reversed(out))
+            frame = frame.f_back
+        return None
+
+
+def summarize(stacks: Counter, interval_sec: float, top: int = 40) -> Dict:
+    """Per-function self/total sample counts (and ms) from collapsed stacks."""
+    self_n: Counter = Counter()
+    total_n: Counter = Counter()
+    for stack, n in stacks.items():
+        self_n[stack[-1]] += n
+        for fr in set(stack):
+            total_n[fr] += n
+
+    def row(fr: Frame) -> Dict:
+        return {
+            "function": f"{fr[0]}:{fr[1]}",
+            "self_ms": round(self_n[fr] * interval_sec * 1000, 1),
+            "total_ms": round(total_n[fr] * interval_sec * 1000, 1),
+            "samples": total_n[fr],
+        }
+
+    by_total = [fr for fr, _ in total_n.most_common()]
+    return {
+        "samples": sum(stacks.values()),
+        "interval_ms": interval_sec * 1000,
+        "functions": [row(fr) for fr in by_total[:top]],
+        "services": [row(fr) for fr in by_total if fr[0].startswith("app.services.")],
+    }
+
+
+def collapsed(stacks: Counter) -> str:
+    return "\n".join(
+        ";".join(f"{m}:{f}" for m, f in stack) + f" {n}" for stack, n in stacks.most_common()
+    ) + "\n"
+
+
+def _requested(scope) -> bool:
+    for k, v in scope.get("headers") or ():
+        if k == HEADER.encode() and v.strip() not in (b"", b"0", b"false"):
+            return True
+    qs = parse_qs((scope.get("query_string") or b"").decode("latin-1"))
+    return qs.get(QUERY_FLAG, ["0"])[-1] not in ("", "0", "false")
+
+
+def _is_admin(request: Request) -> bool:
+    """Resolve the session user through the app's (possibly overridden) DB dependency."""
+    from app.api.deps import get_session
+    from app.core.session import get_current_session
+    from app.models.user import User
+
+    payload = get_current_session(request)
+    if not payload:
+        return False
+    factory = request.app.dependency_overrides.get(get_session, get_session)
+    gen = factory()
+    try:
+        session = next(gen)
+        user = session.get(User, payload.get("uid"))
+        return bool(user and user.is_active and user.is_admin)
+    finally:
+        gen.close()
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it, when the caller is an admin."""
+
+    def __init__(self, app, *, interval_ms: Optional[float] = None):
+        self.app = app
+        self.interval = (interval_ms or settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            allowed = await run_in_threadpool(_is_admin, request)
+        except Exception:
+            log.exception("profiling: admin check failed")
+            allowed = False
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        sampler = _EndpointSampler(scope, self.interval).start()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _PROFILED.set(sampler)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _PROFILED.reset(token)
+            sampler.stop()
+            self._store(profile_id, scope, sampler, time.perf_counter() - t0)
+
+    def _store(self, profile_id: str, scope, sampler: StackSampler, elapsed: float) -> None:
+        try:
+            summary = summarize(sampler.stacks, self.interval)
+            summary.update({
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "query": (scope.get("query_string") or b"").decode("latin-1"),
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "created_at": time.time(),
+            })
+            artifact_path(profile_id, "json").write_text(json.dumps(summary, indent=2))
+            artifact_path(profile_id, "collapsed").write_text(collapsed(sampler.stacks))
+            log.info("profiled %s %s -> %s (%d samples)",
+                     scope.get("method"), scope.get("path"), profile_id, summary["samples"])
+        except Exception:
+            log.exception("profiling: failed to store %s", profile_id)
+
+
+class _EndpointSampler(StackSampler):
+    """Picks up the endpoint's code object once routing has put it in the scope."""
+
+    def __init__(self, scope, interval_sec: float):
+        super().__init__(interval_sec, only_own=True)
+        self._scope = scope
+
+    def _run(self) -> None:
+        while self.target_code is None and not self._stop.wait(self.interval / 2):
+            endpoint = self._scope.get("endpoint")
+            code = getattr(endpoint, "__code__", None)
+            if code is not None:
+                self.target_code = code
+        super()._run()
@@ -0,0 +1,190 @@
+# app/core/query_stats.py
+"""
+SQL statement counting for N+1 detection.
+
+Listeners on every SQLAlchemy Engine record, for the currently active
+`QueryStats` (a contextvar, set per request by `QueryStatsMiddleware`):
+
+  count        statements executed
+  db_ms        total time spent inside cursor.execute
+  fingerprints statement text with literals / IN-lists collapsed -> count
+
+Statements outside an active context cost one contextvar lookup.
+
+The middleware adds a `Server-Timing: db;dur=..;desc="N queries", app;dur=..`
+header and logs a debug line per request (`app.sql` logger). Statements
+repeated at least QUERY_STATS_REPEAT_THRESHOLD times in one request are
+logged as a likely N+1. It is installed when QUERY_STATS_ENABLED is set, by
+default only with ENV=dev/development/local/test: the header exposes DB
+timings to clients.
+
+`count_queries(engine)` collects every statement on one engine regardless of
+context; tests use it (via the `max_queries` fixture) to pin query budgets.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger("app.sql")
+
+_DEV = os.getenv("ENV", "").lower() in ("dev", "development", "local", "test")
+ENABLED = os.getenv("QUERY_STATS_ENABLED", "1" if _DEV else "0").lower() in ("1", "true", "yes", "on")
+REPEAT_THRESHOLD = int(os.getenv("QUERY_STATS_REPEAT_THRESHOLD", "10"))
+
+_current: contextvars.ContextVar[Optional["QueryStats"]] = contextvars.ContextVar("query_stats", default=None)
+_engine_counters: dict = {}
+_installed = False
+
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so per-row variants of the same query compare equal."""
+    s = _WS.sub(" ", statement).strip()
+    s = _STRING.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    return _IN_LIST.sub("(...)", s)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    db_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def add(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.db_ms += elapsed_ms
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least `threshold` times, most frequent first."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+    def report(self, limit: int = 5) -> str:
+        lines = [f"{self.count} queries, {self.db_ms:.1f}ms in DB"]
+        for fp, n in self.fingerprints.most_common(limit):
+            lines.append(f"  {n:>5} x {fp[:200]}")
+        return "\n".join(lines)
+
+
+# ---- engine listeners --------------------------------------------------------
+
+# The start time lives on the statement's execution context, so a statement
+# that raises leaves nothing behind on the pooled connection.
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_t0 = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    t0 = getattr(context, "_query_stats_t0", None)
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0 if t0 is not None else 0.0
+
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, elapsed_ms)
+    for counter in _engine_counters.get(id(conn.engine), ()):
+        counter.add(statement, elapsed_ms)
+
+
+def install() -> None:
+    """Attach the listeners to all engines (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before)
+    event.listen(Engine, "after_cursor_execute", _after)
+    _installed = True
+
+
+# ---- scopes ------------------------------------------------------------------
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Collect statements run in this context (and threads/tasks spawned from it)."""
+    install()
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryStats]:
+    """Collect every statement executed on `engine`, from any thread."""
+    install()
+    stats = QueryStats()
+    counters = _engine_counters.setdefault(id(engine), [])
+    counters.append(stats)
+    try:
+        yield stats
+    finally:
+        counters.remove(stats)
+        if not counters:
+            _engine_counters.pop(id(engine), None)
+
+
+# ---- ASGI middleware ---------------------------------------------------------
+
+class QueryStatsMiddleware:
+    """Per-request query stats -> Server-Timing header + debug / N+1 log lines."""
+
+    def __init__(self, app):
+        self.app = app
+        install()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        with track() as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    app_ms = (time.perf_counter() - t0) * 1000.0
+                    value = (
+                        f'db;dur={stats.db_ms:.1f};desc="{stats.count} queries", '
+                        f"app;dur={app_ms:.1f}"
+                    )
+                    headers = list(message.get("headers") or [])
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._log(scope, stats, (time.perf_counter() - t0) * 1000.0)
+
+    @staticmethod
+    def _log(scope, stats: QueryStats, app_ms: float) -> None:
+        path = scope.get("path", "")
+        method = scope.get("method", "")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s %s: %d queries, db %.1fms, total %.1fms",
+                      method, path, stats.count, stats.db_ms, app_ms)
+        for fp, n in stats.repeated():
+            log.warning("possible N+1 on %s %s: %d x %s", method, path, n, fp[:300])
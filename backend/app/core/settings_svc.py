@@ -23,6 +23,8 @@ def get_or_create_settings(session: Session, *, user: Optional[User] = None) ->
             owner_user_id=user.id,
             base_currency_code="USD",  # default, adjust if needed
         )
+        if session.info.get("read_only"):
+            return row  # read session (maybe a replica): defaults, not persisted
         session.add(row)
         session.commit()
         session.refresh(row)
@@ -39,6 +41,8 @@ def get_or_create_settings(session: Session, *, user: Optional[User] = None) ->
         owner_user_id=None,
         base_currency_code="USD",
     )
+    if session.info.get("read_only"):
+        return row
     session.add(row)
     session.commit()
     session.refresh(row)
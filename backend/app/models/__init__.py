@@ -9,8 +9,11 @@ from .recovery_code import RecoveryCode
 # Domain models
 from .instrument import Instrument
 from .price_history import PriceHistory
+from .latest_price import LatestPrice
 from .account import Account
 from .activities import Activity            # <- filename typically "activity.py"
+from .realized import RealizedEntry
+from .position_snapshot import PositionSnapshot
 from .broker import Broker
 from .currency import Currency
 from .fx import FxRate
@@ -18,6 +21,10 @@ from .asset_class import AssetClass
 from .asset_subclass import AssetSubclass
 from .sector import Sector
 from .settings import AppSetting
+from .market_holiday import MarketHoliday
+from .job_lock import JobLock
+from .background_job import BackgroundJob
+from .job_run import JobRun
 
 # Mixins / helpers (don’t register tables)
 from .tenant_mixin import TenantFields
@@ -29,8 +36,11 @@ __all__ = [
     # user/org/auth
     "User", "OAuthAccount", "Organization", "OrganizationMember", "RecoveryCode",
     # domain
-    "Instrument", "PriceHistory", "Account", "Activity", "Broker",
-    "Currency", "FXRate", "AssetClass", "AssetSubclass", "Sector", "AppSetting",
+    "Instrument", "PriceHistory", "LatestPrice", "Account", "Activity", "RealizedEntry", "PositionSnapshot",
+    "Broker", "Currency", "FXRate", "AssetClass", "AssetSubclass", "Sector", "AppSetting",
+    "MarketHoliday",
+    # background jobs
+    "JobLock", "BackgroundJob", "JobRun",
     # mixins
     "TenantFields",
     # "AccountMovement",
@@ -0,0 +1,33 @@
+# app/models/background_job.py
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, JSON
+
+
+class BackgroundJob(SQLModel, table=True):
+    """
+    A unit of work enqueued by an HTTP request (e.g. a manual price refresh)
+    and executed off the request thread. Progress counters are updated while
+    it runs so clients can poll GET /jobs/{id} or follow the SSE stream.
+    """
+    __tablename__ = "background_job"
+
+    id: str = Field(primary_key=True)                # uuid4 hex
+    kind: str = Field(index=True)                    # "prices" | ...
+    status: str = Field(default="queued", index=True)  # queued | running | succeeded | failed
+
+    params: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+
+    total: int = 0
+    processed: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: int = 0
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -16,8 +16,13 @@
 
     # app/models/fx.py
 from sqlmodel import SQLModel, Field
-from sqlalchemy import UniqueConstraint, Index, desc
-from datetime import date as Date
+from sqlalchemy import Column, DateTime, UniqueConstraint, Index, desc
+from datetime import date as Date, datetime, timezone
+from typing import Optional
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 class FxRate(SQLModel, table=True):
     __tablename__ = "fx_rates"
@@ -27,6 +32,12 @@ class FxRate(SQLModel, table=True):
     quote: str = Field(index=True)
     as_of_date: Date = Field(index=True)
     rate: float
+    # set on every insert and rate change; with max(id) and the row count it
+    # tells report caches that the FX table changed (app/services/tax_report.py)
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, nullable=True),
+    )
 
     __table_args__ = (
         UniqueConstraint("base", "quote", "as_of_date", name="uq_fx_rates_day"),
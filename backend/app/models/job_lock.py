@@ -0,0 +1,20 @@
+# app/models/job_lock.py
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class JobLock(SQLModel, table=True):
+    """
+    One row per named background job lease (e.g. "prices", "fx").
+    The holder renews `expires_at` while it runs; an expired row may be taken over.
+    """
+    __tablename__ = "job_lock"
+
+    name: str = Field(primary_key=True)
+    owner: str = Field(index=True)          # "<hostname>:<pid>:<nonce>"
+    acquired_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    heartbeat_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime = Field(index=True)
+    note: Optional[str] = None
@@ -0,0 +1,31 @@
+# app/models/job_run.py
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class JobRun(SQLModel, table=True):
+    """
+    History of price/FX refresh runs (scheduled or manual), one row per run.
+    Used by the status endpoints for last-run times and duration percentiles.
+    """
+    __tablename__ = "job_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job: str = Field(index=True)                 # "prices" | "fx"
+    trigger: str = "scheduled"                   # "scheduled" | "manual"
+    provider: Optional[str] = None
+    status: str = "succeeded"                    # succeeded | failed
+
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+    finished_at: Optional[datetime] = None
+    elapsed_sec: float = 0.0
+
+    total: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: int = 0
+    symbols_per_sec: Optional[float] = None
+
+    error: Optional[str] = None
@@ -0,0 +1,126 @@
+# app/models/latest_price.py
+from __future__ import annotations
+from datetime import date as dt_date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Date, delete, event, insert as insert_, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel, Field
+
+from .price_history import PriceHistory
+
+
+class LatestPrice(SQLModel, table=True):
+    """
+    Newest price_history close per (instrument, tenant), kept in sync by the
+    PriceHistory mapper events below. `org_id` is 0 for public rows
+    (price_history.org_id IS NULL) so the pair can be the primary key.
+
+    Rows written with Core bulk inserts bypass the events; call
+    `rebuild_latest_prices` afterwards.
+    """
+    __tablename__ = "latest_price"
+
+    instrument_id: int = Field(foreign_key="instrument.id", primary_key=True)
+    org_id: int = Field(default=0, primary_key=True)
+    price_date: dt_date
+    close: float
+    source: Optional[str] = None
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+_NEWEST = (
+    "SELECT p.instrument_id, COALESCE(p.org_id, 0) AS org_id, p.price_date, p.close, p.source "
+    "FROM price_history p WHERE p.id = ("
+    " SELECT p2.id FROM price_history p2"
+    " WHERE p2.instrument_id = p.instrument_id AND COALESCE(p2.org_id, 0) = COALESCE(p.org_id, 0)"
+    " ORDER BY p2.price_date DESC, p2.id DESC LIMIT 1)"
+)
+_NEWEST_ONE = text(
+    f"SELECT price_date, close, source FROM ({_NEWEST}) n WHERE n.instrument_id = :i AND n.org_id = :o"
+).columns(price_date=Date)
+_LP = LatestPrice.__table__
+
+
+def _write(conn, row: dict, *, only_newer: bool) -> None:
+    """
+    Insert or update one row in a single statement, so concurrent writers of
+    the same (instrument, tenant) cannot both miss it and collide on insert.
+    With `only_newer` an existing row dated later is kept.
+    """
+    keep = _LP.c.price_date <= row["price_date"] if only_newer else None
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(_LP).values(**row)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[_LP.c.instrument_id, _LP.c.org_id],
+            set_={k: stmt.excluded[k] for k in ("price_date", "close", "source", "updated_at")},
+            where=keep,
+        ))
+        return
+
+    # no native upsert: update, else insert; a lost insert race retries the update
+    upd = (
+        update(_LP)
+        .where(_LP.c.instrument_id == row["instrument_id"], _LP.c.org_id == row["org_id"])
+        .values(price_date=row["price_date"], close=row["close"], source=row["source"],
+                updated_at=row["updated_at"])
+    )
+    if keep is not None:
+        upd = upd.where(keep)
+    if conn.execute(upd).rowcount:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(insert_(_LP).values(**row))
+    except IntegrityError:
+        conn.execute(upd)
+
+
+def _upsert(conn, target: PriceHistory) -> None:
+    _write(conn, {
+        "instrument_id": target.instrument_id, "org_id": target.org_id or 0,
+        "price_date": target.price_date, "close": float(target.close), "source": target.source,
+        "updated_at": datetime.now(timezone.utc),
+    }, only_newer=True)
+
+
+def _recompute(conn, instrument_id: int, org_id: int) -> None:
+    newest = conn.execute(_NEWEST_ONE, {"i": instrument_id, "o": org_id}).first()
+    if newest is None:
+        conn.execute(delete(_LP).where(_LP.c.instrument_id == instrument_id, _LP.c.org_id == org_id))
+        return
+    _write(conn, {
+        "instrument_id": instrument_id, "org_id": org_id, "price_date": newest.price_date,
+        "close": float(newest.close), "source": newest.source, "updated_at": datetime.now(timezone.utc),
+    }, only_newer=False)
+
+
+def rebuild_latest_prices(conn) -> None:
+    """Recompute the whole table from price_history (backfills, bulk loads)."""
+    conn.execute(text("DELETE FROM latest_price"))
+    conn.execute(
+        text("INSERT INTO latest_price (instrument_id, org_id, price_date, close, source, updated_at) "
+             f"SELECT instrument_id, org_id, price_date, close, source, :u FROM ({_NEWEST}) n"),
+        {"u": datetime.now(timezone.utc)},
+    )
+
+
+@event.listens_for(PriceHistory, "after_insert")
+def _on_insert(_mapper, conn, target: PriceHistory) -> None:
+    _upsert(conn, target)
+
+
+@event.listens_for(PriceHistory, "after_update")
+def _on_update(_mapper, conn, target: PriceHistory) -> None:
+    # a corrected close or an earlier date can demote the row
+    _recompute(conn, target.instrument_id, target.org_id or 0)
+
+
+@event.listens_for(PriceHistory, "after_delete")
+def _on_delete(_mapper, conn, target: PriceHistory) -> None:
+    _recompute(conn, target.instrument_id, target.org_id or 0)
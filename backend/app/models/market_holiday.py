@@ -0,0 +1,21 @@
+# app/models/market_holiday.py
+from __future__ import annotations
+from datetime import date as dt_date
+from typing import Optional
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+
+class MarketHoliday(SQLModel, table=True):
+    """
+    A full-day exchange closure. `exchange` uses the Yahoo suffix codes of
+    app.services.market_calendar.EXCHANGES ("US", "L", "DE", "PA", "HK").
+    """
+    __tablename__ = "market_holiday"
+    __table_args__ = (
+        UniqueConstraint("exchange", "holiday_date", name="uq_market_holiday_exchange_date"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    exchange: str = Field(index=True)
+    holiday_date: dt_date = Field(index=True)
+    name: Optional[str] = None
@@ -0,0 +1,63 @@
+# app/models/position_snapshot.py
+from __future__ import annotations
+from datetime import date as dt_date, datetime, timezone
+from typing import Any, List, Mapping, Optional
+
+from sqlalchemy import JSON, Column, DateTime, and_, delete, or_
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+from .tenant_mixin import TenantFields
+
+
+class PositionSnapshot(TenantFields, SQLModel, table=True):
+    """
+    The owner's open lot books at the end of `as_of` (every activity dated
+    on or before it applied), for one cost basis method and base currency.
+    `books` is a list of [account_id, instrument_id, broker_id, state] with
+    the states of app.services.lots (`dump()`); closed books are left out.
+
+    Written periodically by app.tasks.snapshot_positions (month ends), read
+    by compute_positions(as_of=...), which replays only the activities dated
+    after the snapshot. Any activity write dated on or before a snapshot
+    deletes it, through the Activity write-through in app/models/realized.py.
+
+    Base costs use the FX rate known when the snapshot was written, like the
+    realized ledger (app/models/realized.py).
+    """
+    __tablename__ = "position_snapshot"
+    __table_args__ = (
+        UniqueConstraint("owner_user_id", "method", "base_currency", "as_of", name="uq_position_snapshot"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    as_of: dt_date = Field(index=True)
+    method: str
+    base_currency: str
+    activity_count: int = 0  # activities replayed into the books
+    books: List[Any] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+_SNAP = PositionSnapshot.__table__
+
+
+def clear_snapshots(conn, owner_user_id: Optional[int] = None, since: Optional[dt_date] = None) -> int:
+    """Delete snapshots (one owner or everyone) dated on or after `since` (all when None)."""
+    q = delete(_SNAP)
+    if owner_user_id is not None:
+        q = q.where(_SNAP.c.owner_user_id == owner_user_id)
+    if since is not None:
+        q = q.where(_SNAP.c.as_of >= since)
+    return conn.execute(q).rowcount
+
+
+def clear_stale_snapshots(conn, since: Mapping[int, dt_date]) -> int:
+    """Delete each owner's snapshots dated on or after that owner's `since` day, in one statement."""
+    if not since:
+        return 0
+    return conn.execute(delete(_SNAP).where(or_(*(
+        and_(_SNAP.c.owner_user_id == owner, _SNAP.c.as_of >= day) for owner, day in since.items()
+    )))).rowcount
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional
 from datetime import date as dt_date
 from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlalchemy import Index
 
 class PriceHistory(SQLModel, table=True):
     __tablename__ = "price_history"
@@ -17,4 +18,16 @@ class PriceHistory(SQLModel, table=True):
     source: str = Field(default="yahoo", index=True)
 
     # tenant column (NULL => public/global; non-NULL => per-org)
-    org_id: Optional[int] = Field(default=None, index=True)
\ No newline at end of file
+    org_id: Optional[int] = Field(default=None, index=True)
+
+
+# Newest-first lookups per instrument and tenant (latest_price maintenance, charts)
+Index(
+    "ix_price_history_inst_org_date",
+    PriceHistory.instrument_id,
+    PriceHistory.org_id,
+    PriceHistory.price_date.desc(),
+)
+
+# Registers the mapper events that keep latest_price in sync
+from . import latest_price  # noqa: E402,F401
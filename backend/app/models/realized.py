@@ -0,0 +1,301 @@
+# app/models/realized.py
+from __future__ import annotations
+from datetime import date as dt_date
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, insert, inspect, select, true, update
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import SQLModel, Field, Index
+from sqlmodel import Session as ModelSession
+
+from .activities import Activity
+from .instrument import Instrument
+from .position_snapshot import clear_stale_snapshots
+from .settings import AppSetting
+from .tenant_mixin import TenantFields
+
+
+class RealizedEntry(TenantFields, SQLModel, table=True):
+    """
+    Realized gains (one row per Sell, matched against its lot's cost under the
+    owner's cost basis method, see app/services/lots.py) and income (one row per Dividend / Interest), in the activity
+    currency and in the owner's base currency.
+
+    Kept in sync by the Activity / AppSetting mapper events below: every
+    flush that touches an activity replays just its lot key
+    (account, instrument, broker) and rewrites that key's rows, bumps
+    the owner's AppSetting.data_version and drops the owner's position
+    snapshots dated on or after the activity; a base currency or cost basis
+    method change rewrites all of the owner's rows. A change to an
+    instrument's country only bumps the data version of its holders. Activities written with
+    Core bulk inserts bypass the events; call `rebuild_realized` and
+    `clear_snapshots` afterwards and clear the caches keyed on the data
+    version (tax_report.REPORT_CACHE).
+
+    Base amounts use the FX rate on the entry's date; they are NULL when no
+    rate was known when the row was written (a rebuild picks up rates added
+    later).
+    """
+    __tablename__ = "realized_entry"
+    __table_args__ = (
+        Index("ix_realized_entry_owner_date", "owner_user_id", "date"),
+        Index("ix_realized_entry_lot", "account_id", "instrument_id", "broker_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    activity_id: int = Field(index=True)  # no FK: rows are rewritten after the activity changes
+    kind: str  # "sell" | "dividend" | "interest"
+
+    account_id: int = Field(foreign_key="account.id")
+    instrument_id: Optional[int] = Field(default=None, foreign_key="instrument.id")
+    broker_id: Optional[int] = Field(default=None, foreign_key="broker.id")
+    date: dt_date
+
+    currency_code: str
+    quantity: float = 0.0
+    proceeds_ccy: float = 0.0  # sells: qty * price - fee
+    cost_ccy: float = 0.0      # sells: average cost of the quantity sold
+    amount_ccy: float = 0.0    # sells: proceeds - cost; income: gross amount
+    tax_ccy: float = 0.0       # capital gains tax (sells) / withholding tax (income)
+
+    base_currency: str
+    fx_rate: Optional[float] = None
+    cost_base: Optional[float] = None
+    amount_base: Optional[float] = None
+    tax_base: Optional[float] = None
+
+
+LotKey = Tuple[int, Optional[int], Optional[int]]  # (account_id, instrument_id, broker_id)
+
+_PENDING = "realized_pending"
+_INCOME = {"Dividend": "dividend", "Interest": "interest"}
+_ACT = Activity.__table__
+_ENTRY = RealizedEntry.__table__
+
+
+def _eq(col, value):
+    return col.is_(None) if value is None else col == value
+
+
+def _owner_settings(conn, owner_user_id: Optional[int]) -> Tuple[str, str]:
+    """(base currency, cost basis method), with the defaults used before a settings row exists."""
+    from app.core.base_currency import norm_ccy
+
+    s = AppSetting.__table__
+    row = conn.execute(
+        select(s.c.base_currency_code, s.c.cost_basis_method).where(s.c.owner_user_id == owner_user_id)
+    ).first()
+    code, method = row if row else (None, None)
+    return norm_ccy(code or "USD"), (method or "average")
+
+
+def _entries(acts, base_ccy: str, method: str, fx_session, fx_cache: Dict) -> List[Dict]:
+    """Replay one lot's activities (ledger order) into realized rows."""
+    from app.core.base_currency import norm_ccy
+    from app.services.fx_resolver import fx_rate_on
+    from app.services.lots import new_book
+
+    rows: List[Dict] = []
+    # same lot books as app.services.positions.compute_positions
+    book = new_book(method)
+    base_known = True
+    for a in acts:
+        q = float(a.quantity or 0.0)
+        p = float(a.unit_price or 0.0)
+        fee = float(a.fee or 0.0)
+        rate = fx_rate_on(fx_session, norm_ccy(a.currency_code), base_ccy, a.date, cache=fx_cache)
+
+        if a.type == "Buy":
+            total = q * p + fee
+            book.buy(q, total, {base_ccy: total * (rate or 0.0)})
+            base_known = base_known and rate is not None
+            continue
+
+        entry = {
+            "activity_id": a.id, "owner_user_id": a.owner_user_id, "org_id": a.org_id,
+            "account_id": a.account_id, "instrument_id": a.instrument_id, "broker_id": a.broker_id,
+            "date": a.date, "currency_code": a.currency_code, "base_currency": base_ccy, "fx_rate": rate,
+        }
+        if a.type == "Sell":
+            proceeds = q * p - fee
+            tax = float(a.capital_gains_tax or 0.0)
+            sold_ccy, sold = book.sell(q)
+            sold_base = sold.get(base_ccy, 0.0)
+            known = base_known and rate is not None
+            entry.update(
+                kind="sell", quantity=q, proceeds_ccy=proceeds, cost_ccy=sold_ccy,
+                amount_ccy=proceeds - sold_ccy, tax_ccy=tax,
+                cost_base=sold_base if known else None,
+                amount_base=proceeds * rate - sold_base if known else None,
+                tax_base=tax * rate if rate is not None else None,
+            )
+            if book.qty == 0.0:
+                base_known = True
+        else:
+            amount = abs(p)
+            tax = float(a.withholding_tax or 0.0)
+            entry.update(
+                kind=_INCOME[a.type], quantity=q, proceeds_ccy=0.0, cost_ccy=0.0,
+                amount_ccy=amount, tax_ccy=tax, cost_base=None,
+                amount_base=amount * rate if rate is not None else None,
+                tax_base=tax * rate if rate is not None else None,
+            )
+        rows.append(entry)
+    return rows
+
+
+def _ledger(where):
+    return (
+        select(_ACT).where(where, _ACT.c.type.in_(["Buy", "Sell", *_INCOME]))
+        .order_by(_ACT.c.account_id, _ACT.c.instrument_id, _ACT.c.broker_id, _ACT.c.date, _ACT.c.id)
+    )
+
+
+def _write(conn, lots, fx_cache: Optional[Dict] = None) -> int:
+    """Replay (lot key, activities) groups and insert their rows."""
+    fx_cache = {} if fx_cache is None else fx_cache
+    owners: Dict[Optional[int], Tuple[str, str]] = {}
+    rows: List[Dict] = []
+    with ModelSession(bind=conn) as fx_session:
+        for _key, acts in lots:
+            acts = list(acts)
+            owner = acts[0].owner_user_id
+            if owner not in owners:
+                owners[owner] = _owner_settings(conn, owner)
+            rows += _entries(acts, *owners[owner], fx_session, fx_cache)
+    if rows:
+        conn.execute(insert(_ENTRY), rows)
+    return len(rows)
+
+
+def _lot_of(a) -> LotKey:
+    return (a.account_id, a.instrument_id, a.broker_id)
+
+
+def replay_lot(conn, key: LotKey, fx_cache: Optional[Dict] = None) -> int:
+    """Rewrite the realized rows of one lot key from its activities; returns the row count."""
+    account_id, instrument_id, broker_id = key
+    conn.execute(delete(_ENTRY).where(
+        _ENTRY.c.account_id == account_id,
+        _eq(_ENTRY.c.instrument_id, instrument_id),
+        _eq(_ENTRY.c.broker_id, broker_id),
+    ))
+    acts = conn.execute(_ledger(and_(
+        _ACT.c.account_id == account_id,
+        _eq(_ACT.c.instrument_id, instrument_id),
+        _eq(_ACT.c.broker_id, broker_id),
+    ))).all()
+    return _write(conn, [(key, acts)] if acts else [], fx_cache)
+
+
+def rebuild_realized(conn, owner_user_id: Optional[int] = None) -> int:
+    """Recompute the ledger (one owner or everyone) from activities (backfills, bulk loads)."""
+    if owner_user_id is None:
+        conn.execute(delete(_ENTRY))
+        where = true()
+    else:
+        conn.execute(delete(_ENTRY).where(_ENTRY.c.owner_user_id == owner_user_id))
+        where = _ACT.c.owner_user_id == owner_user_id
+    acts = conn.execute(_ledger(where).execution_options(yield_per=2000))
+    return _write(conn, groupby(acts, key=_lot_of))
+
+
+# ---- write-through -----------------------------------------------------------
+# Mapper events only collect the touched lot keys (and owner / date pairs for
+# the position snapshots); each key is replayed once per flush, so a batch of
+# activities for one lot costs one replay.
+
+def _queue(target, item) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).add(item)
+
+
+def _old(target: Activity, name: str):
+    """The attribute's value before the pending update."""
+    hist = inspect(target).attrs[name].history
+    return hist.deleted[0] if hist.deleted else getattr(target, name)
+
+
+@event.listens_for(Activity, "after_insert")
+@event.listens_for(Activity, "after_delete")
+def _on_activity(_mapper, _conn, target: Activity) -> None:
+    _queue(target, ("lot", (target.account_id, target.instrument_id, target.broker_id)))
+    _queue(target, ("version", target.owner_user_id))
+    _queue(target, ("snapshot", (target.owner_user_id, target.date)))
+
+
+@event.listens_for(Activity, "after_update")
+def _on_activity_update(_mapper, _conn, target: Activity) -> None:
+    _queue(target, ("lot", (target.account_id, target.instrument_id, target.broker_id)))
+    # the activity may have moved to another lot, owner or date
+    _queue(target, ("lot", (_old(target, "account_id"), _old(target, "instrument_id"), _old(target, "broker_id"))))
+    _queue(target, ("version", target.owner_user_id))
+    _queue(target, ("snapshot", (target.owner_user_id, target.date)))
+    _queue(target, ("snapshot", (_old(target, "owner_user_id"), _old(target, "date"))))
+
+
+@event.listens_for(AppSetting, "after_insert")
+@event.listens_for(AppSetting, "after_update")
+def _on_setting(_mapper, _conn, target: AppSetting) -> None:
+    from app.core.base_currency import norm_ccy
+
+    # rows written before the user had settings already assumed USD / average
+    attrs = inspect(target).attrs
+
+    def changed(name: str, default: str, norm) -> bool:
+        hist = attrs[name].history
+        old = (hist.deleted[0] if hist.deleted else None) or default
+        return norm(getattr(target, name) or default) != norm(old)
+
+    if target.owner_user_id is not None and (
+        changed("base_currency_code", "USD", norm_ccy) or changed("cost_basis_method", "average", str.lower)
+    ):
+        _queue(target, ("owner", target.owner_user_id))
+        _queue(target, ("version", target.owner_user_id))
+
+
+@event.listens_for(Instrument, "after_update")
+def _on_instrument(_mapper, _conn, target: Instrument) -> None:
+    # the country decides the tax report's jurisdiction of every holder
+    if inspect(target).attrs["country"].history.has_changes():
+        _queue(target, ("instrument", target.id))
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_pending(session: Session, _flush_context) -> None:
+    pending: Iterable = session.info.pop(_PENDING, ())
+    if not pending:
+        return
+    conn = session.connection()
+    instruments = [v for kind, v in pending if kind == "instrument"]
+    if instruments:
+        holders = conn.execute(
+            select(_ACT.c.owner_user_id).where(_ACT.c.instrument_id.in_(instruments)).distinct()
+        ).scalars()
+        pending = set(pending) | {("version", uid) for uid in holders}
+    owners = {v for kind, v in pending if kind == "owner"}
+    for owner in owners:
+        rebuild_realized(conn, owner)
+    fx_cache: Dict = {}
+    for kind, key in pending:
+        if kind == "lot":
+            replay_lot(conn, key, fx_cache)
+    since: Dict[int, dt_date] = {}
+    for kind, v in pending:
+        if kind == "snapshot" and None not in v:
+            owner, day = v
+            since[owner] = min(day, since.get(owner, day))
+    clear_stale_snapshots(conn, since)
+    touched = {v for kind, v in pending if kind == "version" and v is not None}
+    if touched:
+        s = AppSetting.__table__
+        conn.execute(
+            update(s).where(s.c.owner_user_id.in_(touched)).values(data_version=s.c.data_version + 1)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -45,4 +45,9 @@ class AppSetting(TenantFields, SQLModel, table=True):
         default=None, foreign_key="currency.code", nullable=True
     )
     last_prices_refresh: Optional[datetime] = None
-    last_fx_refresh: Optional[datetime] = None
\ No newline at end of file
+    last_fx_refresh: Optional[datetime] = None
+    # "average" | "fifo" | "lifo" (app/services/lots.py)
+    cost_basis_method: str = Field(default="average")
+    # bumped whenever the owner's activities change (app/models/realized.py);
+    # keys caches of reports derived from them
+    data_version: int = 0
\ No newline at end of file
@@ -0,0 +1,23 @@
+# app/repositories/account.py
+from __future__ import annotations
+
+from typing import Sequence
+
+from sqlmodel import Session
+
+from app.models.account import Account
+from app.repositories.projection import select_columns
+
+VALUATION_COLUMNS = (
+    Account.id,
+    Account.name,
+    Account.type,
+    Account.currency_code,
+    Account.balance,
+)
+
+
+def for_owner(session: Session, user_id: int, *, columns: Sequence = VALUATION_COLUMNS) -> Sequence:
+    """The user's accounts, id order."""
+    q = select_columns(Account, columns).where(Account.owner_user_id == user_id).order_by(Account.id)
+    return session.exec(q).all()
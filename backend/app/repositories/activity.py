@@ -0,0 +1,102 @@
+# app/repositories/activity.py
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Iterator, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.activities import Activity
+from app.repositories.projection import select_columns
+
+# Everything compute_positions / get_portfolio_history read from an activity
+VALUATION_COLUMNS = (
+    Activity.id,
+    Activity.account_id,
+    Activity.instrument_id,
+    Activity.broker_id,
+    Activity.type,
+    Activity.quantity,
+    Activity.unit_price,
+    Activity.fee,
+    Activity.currency_code,
+    Activity.date,
+)
+
+# ... plus the tax fields, for the tax-year report
+TAX_COLUMNS = VALUATION_COLUMNS + (
+    Activity.withholding_tax,
+    Activity.capital_gains_tax,
+    Activity.securities_transaction_tax,
+    Activity.stamp_duty,
+)
+
+
+def _ledger_query(account_ids: Iterable[int], until: Optional[date], columns: Sequence, since: Optional[date] = None):
+    q = select_columns(Activity, columns).where(Activity.account_id.in_(list(account_ids)))
+    if since is not None:
+        q = q.where(Activity.date > since)
+    if until is not None:
+        q = q.where(Activity.date <= until)
+    return q.order_by(Activity.date.asc(), Activity.id.asc())
+
+
+def for_accounts(
+    session: Session,
+    account_ids: Iterable[int],
+    *,
+    until: Optional[date] = None,
+    columns: Sequence = VALUATION_COLUMNS,
+) -> Sequence:
+    """Activities of the given accounts in ledger order (date, id)."""
+    return session.exec(_ledger_query(account_ids, until, columns)).all()
+
+
+def iter_for_accounts(
+    session: Session,
+    account_ids: Iterable[int],
+    *,
+    until: Optional[date] = None,
+    since: Optional[date] = None,
+    columns: Sequence = VALUATION_COLUMNS,
+    batch: Optional[int] = None,
+) -> Iterator:
+    """
+    Like `for_accounts`, but fetched `batch` rows at a time (ACTIVITY_YIELD_PER)
+    so callers that reduce the ledger in one pass hold a bounded number of
+    rows. Uses a server-side cursor where the driver has one (psycopg).
+    Batch 0 loads everything up front. `since` skips activities dated on or
+    before it (the part already folded into a position snapshot).
+    """
+    batch = settings.ACTIVITY_YIELD_PER if batch is None else batch
+    q = _ledger_query(account_ids, until, columns, since)
+    if batch <= 0:
+        return iter(session.exec(q).all())
+    return iter(session.exec(q.execution_options(yield_per=batch)))
+
+
+def ledger_span(
+    session: Session, account_ids: Iterable[int], *, until: Optional[date] = None
+) -> Tuple[Optional[date], Set[int]]:
+    """(first activity date, instrument ids traded) without loading the rows."""
+    q = (
+        select(Activity.instrument_id, func.min(Activity.date))
+        .where(Activity.account_id.in_(list(account_ids)))
+        .group_by(Activity.instrument_id)
+    )
+    if until is not None:
+        q = q.where(Activity.date <= until)
+    rows = session.exec(q).all()
+    if not rows:
+        return None, set()
+    return min(d for _, d in rows), {iid for iid, _ in rows if iid}
+
+
+def currencies(session: Session, account_ids: Iterable[int], *, until: Optional[date] = None) -> Set[str]:
+    """Distinct activity currencies (to preload FX for them)."""
+    q = select(Activity.currency_code).where(Activity.account_id.in_(list(account_ids))).distinct()
+    if until is not None:
+        q = q.where(Activity.date <= until)
+    return {c for c in session.exec(q).all() if c}
@@ -0,0 +1,28 @@
+# app/repositories/instrument.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, Sequence
+
+from sqlmodel import Session
+
+from app.models.instrument import Instrument
+from app.repositories.projection import select_columns
+
+VALUATION_COLUMNS = (
+    Instrument.id,
+    Instrument.symbol,
+    Instrument.name,
+    Instrument.currency_code,
+    Instrument.latest_price,
+    Instrument.asset_class,
+    Instrument.asset_subclass,
+)
+
+
+def by_ids(session: Session, ids: Iterable[int], *, columns: Sequence = VALUATION_COLUMNS) -> Dict[int, object]:
+    """{id: row} for the given instruments (missing ids are left out)."""
+    ids = {i for i in ids if i}
+    if not ids:
+        return {}
+    rows = session.exec(select_columns(Instrument, columns).where(Instrument.id.in_(ids))).all()
+    return {r.id: r for r in rows}
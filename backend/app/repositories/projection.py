@@ -0,0 +1,33 @@
+# app/repositories/projection.py
+"""
+Column projection for read-only valuation code.
+
+Valuation services only read a handful of columns per row. Selecting just
+those columns returns lightweight SQLAlchemy `Row`s (tuples with attribute
+access) instead of SQLModel instances, which skips the identity map,
+attribute instrumentation and model construction.
+
+VALUATION_ROW_PROJECTION=false switches every caller back to full ORM
+objects. Both expose the same attribute names, so callers don't change;
+the toggle exists to compare the two (see benchmarks/bench_valuation.py --rows).
+Rows are read-only: code that needs to modify or add an object must
+load the model itself.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from sqlmodel import select
+
+from app.core.config import settings
+
+
+def projection_enabled() -> bool:
+    return settings.VALUATION_ROW_PROJECTION
+
+
+def select_columns(model, columns: Sequence):
+    """`select(*columns)` when projection is on, else `select(model)`."""
+    if projection_enabled():
+        return select(*columns)
+    return select(model)
@@ -2,9 +2,9 @@ from __future__ import annotations
 from datetime import date
 from typing import List, Optional, Dict, Any
 
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from app.models.account import Account
+from app.repositories import account as account_repo
 from app.core.base_currency import get_base_currency_code   # used elsewhere
 from app.services.fx_resolver import fx_rate_on
 
@@ -33,17 +33,16 @@ def compute_account_balances(
         base_ccy = base_ccy or "USD"
 
     # 🔒 only this user's accounts
-    accounts = session.exec(
-        select(Account).where(Account.owner_user_id == user_id)
-    ).all()
+    accounts = account_repo.for_owner(session, user_id)
 
     out: List[Dict[str, Any]] = []
+    fx_cache: Dict = {}
     for a in accounts:
         bal_ccy = float(a.balance or 0.0)
         acct_ccy = a.currency_code
 
         # acct_ccy → base_ccy (None if same-ccy or missing rate)
-        rate = fx_rate_on(session, acct_ccy, base_ccy, on)
+        rate = fx_rate_on(session, acct_ccy, base_ccy, on, fx_cache)
         bal_base = (bal_ccy * (rate if rate is not None else 1.0)) if acct_ccy == base_ccy else (
             (bal_ccy * rate) if (rate is not None) else 0.0
         )
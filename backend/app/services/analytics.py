@@ -1,13 +1,17 @@
+import math
 from datetime import date, timedelta
 from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
-from sqlmodel import Session, select
-from app.models.activities import Activity
-from app.models.price_history import PriceHistory
-from app.models.account import Account
+import numpy as np
+from sqlmodel import Session
+from app.models.instrument import Instrument
 from app.models.user import User
 from app.core.base_currency import get_base_currency_code
+from app.repositories import account as account_repo
+from app.repositories import activity as activity_repo
+from app.repositories import instrument as instrument_repo
 from app.services.fx_resolver import fx_rate_on
+from app.services.price_cache import PRICE_STORE
 from app.services.positions import compute_positions # Scope: User
 
 def get_portfolio_history(
@@ -30,7 +34,7 @@ def get_portfolio_history(
     base_ccy = base_ccy_override or "USD" # Default, should fetch from settings
     
     # 1. Fetch User Accounts
-    accounts = session.exec(select(Account).where(Account.owner_user_id == user.id)).all()
+    accounts = account_repo.for_owner(session, user.id)
     if not accounts:
         return []
     acc_ids = [a.id for a in accounts]
@@ -50,53 +54,36 @@ def get_portfolio_history(
     current_positions = compute_positions(session, user=user)
     actual_total_inv_base = sum(p["market_value_base"] for p in current_positions)
 
-    # 2. Fetch All Activities (prior to end_date)
-    acts = session.exec(
-        select(Activity)
-        .where(Activity.account_id.in_(acc_ids))
-        .where(Activity.date <= end_date)
-        .order_by(Activity.date.asc(), Activity.id.asc())
-    ).all()
-    
-    if not acts:
+    # 2. Ledger span: first activity date and the instruments involved
+    # (aggregated in SQL; the activities themselves are streamed below)
+    min_act_date, inst_ids = activity_repo.ledger_span(session, acc_ids, until=end_date)
+    if min_act_date is None:
         return []
 
-    # 3. Identify involved instruments
-    inst_ids = {a.instrument_id for a in acts if a.instrument_id}
-    
-    # 4. Fetch Price History
-    # We fetch ALL history likely relevant. Optimization: min(act_date)
-    min_act_date = acts[0].date
-    prices = session.exec(
-        select(PriceHistory)
-        .where(PriceHistory.instrument_id.in_(inst_ids))
-        .where(PriceHistory.price_date >= min_act_date) 
-        .where(PriceHistory.price_date <= end_date)
-        .order_by(PriceHistory.price_date.asc())
-    ).all()
-    
-    # Organize prices by date for fast stream processing
-    prices_by_date: Dict[date, List[PriceHistory]] = defaultdict(list)
-    for p in prices:
-        prices_by_date[p.price_date].append(p)
+    # 4. Price History: per-instrument arrays from the shared cache, resolved
+    # up front to "last close on or before each day" (closes before the first
+    # activity are ignored, as before)
+    day_ordinals = np.arange(min_act_date.toordinal(), end_date.toordinal() + 1, dtype=np.int32)
+    series = PRICE_STORE.get_many(session, inst_ids)
+    price_on: Dict[int, List[float]] = {
+        iid: s.asof(day_ordinals, floor=min_act_date.toordinal()).tolist()
+        for iid, s in series.items()
+    }
+
+    # 3. Activities (prior to end_date), streamed in ledger order and applied
+    # as the day walk reaches them
+    acts = activity_repo.iter_for_accounts(session, acc_ids, until=end_date)
+    next_act = next(acts, None)
 
-    # Organize activities by date
-    acts_by_date: Dict[date, List[Activity]] = defaultdict(list)
-    for a in acts:
-        acts_by_date[a.date].append(a)
-        
-        
     # 5. Simulation State
     holdings: Dict[int, float] = defaultdict(float) # inst_id -> qty
     cash_by_currency: Dict[str, float] = defaultdict(float) # ccy -> amount
     
-    current_prices: Dict[int, float] = {} # inst_id -> last_known_ccy_price
-    current_prices_ccy: Dict[int, str] = {} # inst_id -> currency
-    
     # Helper to map instrument currencies
-    from app.models.instrument import Instrument
-    inst_objs = session.exec(select(Instrument).where(Instrument.id.in_(inst_ids))).all()
-    inst_ccy_map = {i.id: i.currency_code for i in inst_objs}
+    inst_ccy_map = {
+        iid: i.currency_code
+        for iid, i in instrument_repo.by_ids(session, inst_ids, columns=(Instrument.id, Instrument.currency_code)).items()
+    }
 
     # Initial Cash from Accounts? 
     # Portivue seems to derive balances from activities, assuming 0 start.
@@ -109,15 +96,11 @@ def get_portfolio_history(
     
     # Pre-fetch FX rates? No, use cache on fly.
     
+    day_idx = 0
     while current_date <= end_date:
-        # A. Update Prices for Today
-        todays_prices = prices_by_date.get(current_date, [])
-        for p in todays_prices:
-            current_prices[p.instrument_id] = p.close
-
         # B. Apply Activities
-        todays_acts = acts_by_date.get(current_date, [])
-        for a in todays_acts:
+        while next_act is not None and next_act.date <= current_date:
+            a, next_act = next_act, next(acts, None)
             # Cash Impact
             ccy = a.currency_code
             amt = (a.quantity or 0) * (a.unit_price or 0)
@@ -157,8 +140,9 @@ def get_portfolio_history(
             for inst_id, qty in holdings.items():
                 if qty <= 1e-9: continue
                 
-                price = current_prices.get(inst_id)
-                if not price: continue # No price known yet
+                prices = price_on.get(inst_id)
+                price = prices[day_idx] if prices else None
+                if not price or math.isnan(price): continue # No price known yet
                 
                 ccy = inst_ccy_map.get(inst_id, "USD") # fallback
                 
@@ -182,6 +166,7 @@ def get_portfolio_history(
             })
             
         current_date += timedelta(days=1)
+        day_idx += 1
         
     # --- RECONCILIATION STEP (ROBUST) ---
     # Goal: Force the "End Date" values to match the "Actual" values.
@@ -1,7 +1,10 @@
 import httpx
 from typing import Dict
 
-FRANK = "https://api.frankfurter.app"
+from app.core.config import settings
+
+FRANK = settings.FRANKFURTER_BASE_URL.rstrip("/")
+OXR = settings.OXR_BASE_URL.rstrip("/")
 
 def fetch_frank_latest() -> dict:
     r = httpx.get(f"{FRANK}/latest", timeout=10)
@@ -25,7 +28,7 @@ def fetch_oxr_latest(app_id: str) -> dict:
     Fetch latest rates from Open Exchange Rates (USD base).
     Returns dict like: {"timestamp": 123456789, "base": "USD", "rates": {"EUR": 0.9, ...}}
     """
-    url = f"https://openexchangerates.org/api/latest.json?app_id={app_id}"
+    url = f"{OXR}/latest.json?app_id={app_id}"
     r = httpx.get(url, timeout=15)
     r.raise_for_status()
     return r.json()
\ No newline at end of file
@@ -1,7 +1,9 @@
 import requests
 from datetime import date, timedelta
 
-BASE_URL = "https://api.frankfurter.app"
+from app.core.config import settings
+
+BASE_URL = settings.FRANKFURTER_BASE_URL.rstrip("/")
 
 def fetch_rates(base: str, symbols: list[str]) -> tuple[date, dict[str, float]]:
     """
@@ -1,12 +1,17 @@
 # app/services/fx_resolver.py
 from __future__ import annotations
+from bisect import bisect_right
 from datetime import date
-from typing import Optional, Dict, Tuple
+from typing import Iterable, Optional, Dict, Tuple
 from sqlmodel import Session, select
 from app.models.fx import FxRate
+from app.core.metrics import CACHE_LOOKUPS
 
 Key = Tuple[str, str, date]
 
+_FX_HIT = CACHE_LOOKUPS.labels("fx", "hit")
+_FX_MISS = CACHE_LOOKUPS.labels("fx", "miss")
+
 def _canon(code: str) -> str:
     """Preserve the special token 'GBp'; otherwise uppercase."""
     s = (code or "").strip()
@@ -56,8 +61,11 @@ def fx_rate_on(
 
     # Regular lookup (GBP/EUR, USD/JPY, etc.)
     key = (b, q, on)
-    if cache is not None and key in cache:
-        return cache[key]
+    if cache is not None:
+        if key in cache:
+            _FX_HIT.inc()
+            return cache[key]
+        _FX_MISS.inc()
 
     stmt = (
         select(FxRate.rate)
@@ -71,4 +79,58 @@ def fx_rate_on(
 
     if cache is not None:
         cache[key] = rate
-    return rate
\ No newline at end of file
+    return rate
+
+class FxTable:
+    """
+    Rates preloaded for a fixed set of pairs, answered like `fx_rate_on`
+    (same GBp rules, as-of <= day, no inversion) without a query per lookup.
+    Build it with `preload_fx`.
+    """
+
+    def __init__(self, series: Dict[Tuple[str, str], Tuple[list, list]]):
+        self._series = series  # (base, quote) -> (sorted dates, rates)
+
+    def rate(self, base: str, quote: str, on: date) -> Optional[float]:
+        b = _canon(base)
+        q = _canon(quote)
+        if b == q:
+            return 1.0
+        if b == "GBP" and q == "GBp":
+            return 100.0
+        if b == "GBp" and q == "GBP":
+            return 0.01
+        if b == "GBp":
+            r = self.rate("GBP", q, on)
+            return None if r is None else r / 100.0
+        if q == "GBp":
+            r = self.rate(b, "GBP", on)
+            return None if r is None else r * 100.0
+
+        s = self._series.get((b, q))
+        if not s:
+            return None
+        i = bisect_right(s[0], on)
+        return s[1][i - 1] if i else None
+
+
+def preload_fx(session: Session, bases: Iterable[str], quotes: Iterable[str], until: date) -> FxTable:
+    """Every base->quote rate dated <= `until` for the given currencies, in one query."""
+    def canon(codes: Iterable[str]) -> set:
+        out = {_canon(c) for c in codes if c}
+        return out | {"GBP"} if "GBp" in out else out
+
+    bs, qs = canon(bases), canon(quotes)
+    series: Dict[Tuple[str, str], Tuple[list, list]] = {}
+    if not bs or not qs:
+        return FxTable(series)
+    rows = session.exec(
+        select(FxRate.base, FxRate.quote, FxRate.as_of_date, FxRate.rate)
+        .where(FxRate.base.in_(bs), FxRate.quote.in_(qs), FxRate.as_of_date <= until)
+        .order_by(FxRate.base, FxRate.quote, FxRate.as_of_date)
+    ).all()
+    for b, q, d, r in rows:
+        dates, rates = series.setdefault((b, q), ([], []))
+        dates.append(d)
+        rates.append(r)
+    return FxTable(series)
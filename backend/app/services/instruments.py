@@ -1,6 +1,10 @@
 import requests
 from typing import Optional, Dict
 
+from app.core.config import settings
+
+YAHOO_QUERY = settings.YAHOO_QUERY_BASE_URL.rstrip("/")
+
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
       "AppleWebKit/537.36 (KHTML, like Gecko) "
       "Chrome/124.0.0.0 Safari/537.36")
@@ -44,7 +48,7 @@ def fetch_from_yahoo(symbol: str) -> Optional[Dict]:
         return None
 
     # 1) v7 quote
-    q7 = _get_json("https://query2.finance.yahoo.com/v7/finance/quote", {"symbols": sym})
+    q7 = _get_json(f"{YAHOO_QUERY}/v7/finance/quote", {"symbols": sym})
     try:
         res = (q7.get("quoteResponse", {}).get("result") or [])[0]
     except Exception:
@@ -63,7 +67,7 @@ def fetch_from_yahoo(symbol: str) -> Optional[Dict]:
 
     # 2) best-effort profile (optional; don’t fail if blocked)
     prof = _get_json(
-        f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{sym}",
+        f"{YAHOO_QUERY}/v10/finance/quoteSummary/{sym}",
         {"modules": "assetProfile,summaryProfile"}
     )
     if prof:
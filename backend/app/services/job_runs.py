@@ -0,0 +1,194 @@
+# app/services/job_runs.py
+"""
+Persistent history of refresh runs (`job_run` table).
+
+Every scheduled or manual price/FX run records one row with its timings and
+counters. The status endpoints read last-run times and duration percentiles
+from here instead of per-process memory, so they survive restarts and agree
+across workers.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session, select
+
+from app.core.metrics import JOB_DURATION, JOB_LAST_SUCCESS
+from app.models.job_run import JobRun
+
+log = logging.getLogger(__name__)
+
+JOBS = ("prices", "fx", "snapshots")
+
+# How many recent runs the percentile stats look at
+STATS_WINDOW = int(os.getenv("JOB_RUN_STATS_WINDOW", "50"))
+
+
+def _aware(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    dt = _aware(dt)
+    return dt.isoformat() if dt else None
+
+
+def record_run(
+    session: Session,
+    *,
+    job: str,
+    started_at: datetime,
+    finished_at: Optional[datetime] = None,
+    trigger: str = "scheduled",
+    provider: Optional[str] = None,
+    total: int = 0,
+    updated: int = 0,
+    skipped: int = 0,
+    errors: int = 0,
+    status: str = "succeeded",
+    error: Optional[str] = None,
+) -> Optional[JobRun]:
+    """
+    Insert one `job_run` row. Elapsed time and throughput
+    ((updated + skipped) / elapsed) are derived from the timestamps.
+    Best effort: a failed write is logged and returns None.
+    """
+    started_at = _aware(started_at)
+    finished_at = _aware(finished_at) or datetime.now(timezone.utc)
+    elapsed = max((finished_at - started_at).total_seconds(), 0.0)
+    done = updated + skipped
+
+    run = JobRun(
+        job=job,
+        trigger=trigger,
+        provider=provider,
+        status=status,
+        started_at=started_at,
+        finished_at=finished_at,
+        elapsed_sec=round(elapsed, 3),
+        total=total,
+        updated=updated,
+        skipped=skipped,
+        errors=errors,
+        symbols_per_sec=round(done / elapsed, 3) if elapsed > 0 and done else None,
+        error=(error or None) and error[:500],
+    )
+    JOB_DURATION.labels(job, status).observe(elapsed)
+    if status == "succeeded":
+        JOB_LAST_SUCCESS.labels(job).set(finished_at.timestamp())
+    try:
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+        return run
+    except Exception:
+        session.rollback()
+        log.exception("[job_run] could not record %s run", job)
+        return None
+
+
+def record_price_run(
+    session: Session,
+    result: Optional[Dict[str, Any]],
+    *,
+    started_at: datetime,
+    trigger: str = "scheduled",
+    provider: Optional[str] = None,
+    error: Optional[str] = None,
+) -> Optional[JobRun]:
+    """Record a `refresh_all_prices` result (or the exception that aborted it)."""
+    result = result or {}
+    return record_run(
+        session,
+        job="prices",
+        started_at=started_at,
+        trigger=trigger,
+        provider=result.get("provider") or provider,
+        total=int(result.get("total_considered") or 0),
+        updated=int(result.get("updated") or 0),
+        skipped=int(result.get("skipped") or 0),
+        errors=len(result.get("errors") or []),
+        status="failed" if error else "succeeded",
+        error=error,
+    )
+
+
+def run_to_dict(run: JobRun) -> Dict[str, Any]:
+    return {
+        "id": run.id,
+        "job": run.job,
+        "trigger": run.trigger,
+        "provider": run.provider,
+        "status": run.status,
+        "started_at": _iso(run.started_at),
+        "finished_at": _iso(run.finished_at),
+        "elapsed_sec": run.elapsed_sec,
+        "total": run.total,
+        "updated": run.updated,
+        "skipped": run.skipped,
+        "errors": run.errors,
+        "symbols_per_sec": run.symbols_per_sec,
+        "error": run.error,
+    }
+
+
+def recent_runs(session: Session, job: str, limit: int = STATS_WINDOW) -> List[JobRun]:
+    """Most recent runs of `job`, newest first."""
+    return list(
+        session.exec(
+            select(JobRun)
+            .where(JobRun.job == job)
+            .order_by(JobRun.started_at.desc(), JobRun.id.desc())
+            .limit(limit)
+        ).all()
+    )
+
+
+def last_run_at(session: Session, job: str) -> Optional[str]:
+    """ISO timestamp of the latest finished run of `job` (any status)."""
+    row = session.exec(
+        select(JobRun.finished_at)
+        .where(JobRun.job == job)
+        .order_by(JobRun.started_at.desc(), JobRun.id.desc())
+        .limit(1)
+    ).first()
+    return _iso(row)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0..100) of `values`; None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_stats(session: Session, job: str, window: int = STATS_WINDOW) -> Dict[str, Any]:
+    """
+    Duration/throughput summary over the last `window` runs of `job`:
+    run counts, p50/p90/p95/max elapsed seconds and median symbols/sec.
+    """
+    runs = recent_runs(session, job, limit=window)
+    elapsed = [r.elapsed_sec for r in runs if r.status == "succeeded"]
+    rates = [r.symbols_per_sec for r in runs if r.symbols_per_sec]
+
+    return {
+        "window": len(runs),
+        "succeeded": sum(1 for r in runs if r.status == "succeeded"),
+        "failed": sum(1 for r in runs if r.status != "succeeded"),
+        "elapsed_sec": {
+            "p50": percentile(elapsed, 50),
+            "p90": percentile(elapsed, 90),
+            "p95": percentile(elapsed, 95),
+            "max": max(elapsed) if elapsed else None,
+        },
+        "symbols_per_sec_p50": percentile(rates, 50),
+        "last": run_to_dict(runs[0]) if runs else None,
+    }
@@ -0,0 +1,283 @@
+# app/services/lots.py
+"""
+Cost-basis lot books, one per (account, instrument, broker) key.
+
+  average  moving average (the original compute_positions method)
+  fifo     sells consume the oldest open buys first
+  lifo     sells consume the newest open buys first
+
+FIFO/LIFO books keep their open lots in `array('d')` columns (quantity,
+cost in the trade currency, cost per base currency) instead of a list of
+lot objects. A sell matches from the head (FIFO, via a moving head index)
+or the tail (LIFO, by truncation), so each buy is consumed at most once and
+a ledger of n fills is matched in amortized O(n). Running totals make the
+remaining quantity and cost O(1) to read.
+
+All books share one interface: `buy(qty, cost_ccy, cost_base)`,
+`sell(qty) -> (cost_ccy, {base: cost})` for the cost of the quantity
+matched, and the `qty` / `cost_ccy` / `cost_base` totals of what is
+still open. A position that drops below EPS is closed and reset.
+A buy without quantity (a fee-only entry) adds its cost to the position
+without adding quantity, in every book: FIFO/LIFO spread it over the open
+lots by quantity, or carry it into the next buy when none is open. A buy
+with a negative quantity (a correction) adds its quantity and cost as-is in
+the average book; FIFO/LIFO take the quantity out of the lots like a sell
+and put the buy's own cost in place of the matched cost. Whatever the open
+lots cannot cover is held as a short quantity and netted against the next
+buys. Either way all methods agree on the remaining quantity and total cost
+of the same ledger.
+`dump()` / `load_book()` round-trip a book through plain JSON values (the
+position snapshots in app/models/position_snapshot.py).
+
+Specific-lot identification would need a lot reference on Sell activities,
+which the schema does not have; it can be added as another book.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Mapping, Tuple
+
+METHODS = ("average", "fifo", "lifo")
+DEFAULT_METHOD = "average"
+EPS = 1e-10
+
+
+def normalize_method(method: str | None) -> str:
+    m = (method or DEFAULT_METHOD).strip().lower()
+    if m not in METHODS:
+        raise ValueError(f"unknown cost basis method {method!r}; use one of {', '.join(METHODS)}")
+    return m
+
+
+class AverageBook:
+    """Moving average: a sell removes the average cost of the quantity sold."""
+
+    __slots__ = ("qty", "cost_ccy", "cost_base")
+
+    def __init__(self) -> None:
+        self.qty = 0.0
+        self.cost_ccy = 0.0
+        self.cost_base: Dict[str, float] = {}
+
+    def buy(self, qty: float, cost_ccy: float, cost_base: Mapping[str, float]) -> None:
+        self.qty += qty
+        self.cost_ccy += cost_ccy
+        for b, c in cost_base.items():
+            self.cost_base[b] = self.cost_base.get(b, 0.0) + c
+
+    def sell(self, qty: float) -> Tuple[float, Dict[str, float]]:
+        sold_ccy, sold_base = 0.0, {}
+        if self.qty <= 0:
+            self.qty -= qty
+        else:
+            avg_ccy = self.cost_ccy / self.qty
+            matched = min(qty, self.qty)
+            sold_ccy = avg_ccy * matched
+            for b, cost in self.cost_base.items():
+                avg = cost / self.qty
+                sold_base[b] = avg * matched
+                self.cost_base[b] = cost - avg * qty
+
+            self.qty -= qty
+            self.cost_ccy -= avg_ccy * qty
+
+        if self.qty < EPS:
+            self._reset()
+        return sold_ccy, sold_base
+
+    def _reset(self) -> None:
+        self.qty = 0.0
+        self.cost_ccy = 0.0
+        self.cost_base.clear()
+
+    def dump(self) -> Dict:
+        return {"qty": self.qty, "cost_ccy": self.cost_ccy, "cost_base": dict(self.cost_base)}
+
+    def _restore(self, state: Mapping) -> None:
+        self.qty = float(state["qty"])
+        self.cost_ccy = float(state["cost_ccy"])
+        self.cost_base = {b: float(c) for b, c in state["cost_base"].items()}
+
+
+class QueueBook:
+    """FIFO (`lifo=False`) or LIFO lot queue in parallel float arrays."""
+
+    __slots__ = ("lifo", "_qty", "_ccy", "_base", "_head", "_carry", "_short", "qty", "cost_ccy", "cost_base")
+
+    def __init__(self, lifo: bool = False) -> None:
+        self.lifo = lifo
+        self._qty = array("d")
+        self._ccy = array("d")
+        self._base: Dict[str, array] = {}
+        self._head = 0  # first open lot (FIFO); lots before it are fully consumed
+        self._carry: Dict[str, float] = {}  # fee-only cost awaiting a lot ("" = trade currency)
+        self._short = 0.0  # negative-buy quantity no open lot covered, netted against the next buys
+        self.qty = 0.0
+        self.cost_ccy = 0.0
+        self.cost_base: Dict[str, float] = {}
+
+    def buy(self, qty: float, cost_ccy: float, cost_base: Mapping[str, float]) -> None:
+        if qty < 0:
+            # take the quantity out like a sell, then book the difference to the buy's cost
+            sold_ccy, sold_base, short = 0.0, {}, -qty
+            if self._head < len(self._qty):
+                before = self.qty
+                sold_ccy, sold_base = self.sell(-qty)
+                short -= before - self.qty
+            if short > EPS:
+                self._short += short
+                self.qty -= short
+            cost_ccy += sold_ccy
+            cost_base = {b: cost_base.get(b, 0.0) + sold_base.get(b, 0.0) for b in {*cost_base, *sold_base}}
+            qty = 0.0
+        elif self._short:
+            # the first bought units cover an earlier uncovered correction
+            covered = min(qty, self._short)
+            self._short -= covered
+            self.qty += covered
+            qty -= covered
+            if qty <= EPS:
+                qty = 0.0
+        if cost_base.keys() != self._base.keys():
+            self._add_bases(cost_base)
+        totals = self.cost_base
+        self.cost_ccy += cost_ccy
+        if qty == 0:
+            self._capitalize(cost_ccy, cost_base)
+            for b in self._base:
+                totals[b] += cost_base.get(b, 0.0)
+            return
+        carry = self._carry
+        self._qty.append(qty)
+        self._ccy.append(cost_ccy + carry.pop("", 0.0))
+        for b, col in self._base.items():
+            c = cost_base.get(b, 0.0)
+            col.append(c + carry.pop(b, 0.0))
+            totals[b] += c
+        self.qty += qty
+
+    def _capitalize(self, cost_ccy: float, cost_base: Mapping[str, float]) -> None:
+        """Spread a quantity-less cost over the open lots by quantity, or carry it to the next buy."""
+        h, n = self._head, len(self._qty)
+        if h >= n:
+            carry = self._carry
+            carry[""] = carry.get("", 0.0) + cost_ccy
+            for b in self._base:
+                carry[b] = carry.get(b, 0.0) + cost_base.get(b, 0.0)
+            return
+        for i in range(h, n):
+            w = self._qty[i] / self.qty
+            self._ccy[i] += cost_ccy * w
+            for b, col in self._base.items():
+                col[i] += cost_base.get(b, 0.0) * w
+
+    def _add_bases(self, cost_base: Mapping[str, float]) -> None:
+        for b in cost_base:
+            if b not in self._base:
+                # a base first seen now: older lots carry no cost in it
+                self._base[b] = array("d", bytes(8 * len(self._qty)))
+                self.cost_base[b] = 0.0
+
+    def sell(self, qty: float) -> Tuple[float, Dict[str, float]]:
+        qs, cs, base = self._qty, self._ccy, self._base
+        sold_ccy = 0.0
+        sold_base = dict.fromkeys(base, 0.0)
+        left = qty
+        while left > EPS and self._head < len(qs):
+            i = len(qs) - 1 if self.lifo else self._head
+            lot_qty = qs[i]
+            if left >= lot_qty - EPS:  # the whole lot
+                sold_ccy += cs[i]
+                for b, col in base.items():
+                    sold_base[b] += col[i]
+                left -= lot_qty
+                self._drop(i)
+            else:
+                frac = left / lot_qty
+                c = cs[i] * frac
+                sold_ccy += c
+                cs[i] -= c
+                for b, col in base.items():
+                    cb = col[i] * frac
+                    sold_base[b] += cb
+                    col[i] -= cb
+                qs[i] = lot_qty - left
+                left = 0.0
+
+        self.qty -= qty - max(left, 0.0)
+        self.cost_ccy -= sold_ccy
+        for b, v in sold_base.items():
+            self.cost_base[b] -= v
+        if self.qty < EPS:
+            self._reset()
+        return sold_ccy, sold_base
+
+    def _drop(self, i: int) -> None:
+        if self.lifo:
+            self._qty.pop()
+            self._ccy.pop()
+            for col in self._base.values():
+                col.pop()
+            return
+        self._head += 1
+        # compact once the consumed prefix is at least half the arrays
+        if self._head >= 64 and self._head * 2 >= len(self._qty):
+            h = self._head
+            del self._qty[:h], self._ccy[:h]
+            for col in self._base.values():
+                del col[:h]
+            self._head = 0
+
+    def _reset(self) -> None:
+        self._qty = array("d")
+        self._ccy = array("d")
+        self._base = {}
+        self._head = 0
+        self._carry = {}
+        self._short = 0.0
+        self.qty = 0.0
+        self.cost_ccy = 0.0
+        self.cost_base = {}
+
+    def dump(self) -> Dict:
+        h = self._head
+        return {
+            "qty": self.qty, "cost_ccy": self.cost_ccy, "cost_base": dict(self.cost_base),
+            "lots": {
+                "qty": self._qty[h:].tolist(),
+                "ccy": self._ccy[h:].tolist(),
+                "base": {b: col[h:].tolist() for b, col in self._base.items()},
+                "carry": dict(self._carry),
+                "short": self._short,
+            },
+        }
+
+    def _restore(self, state: Mapping) -> None:
+        lots = state["lots"]
+        self._qty = array("d", lots["qty"])
+        self._ccy = array("d", lots["ccy"])
+        self._base = {b: array("d", col) for b, col in lots["base"].items()}
+        self._head = 0
+        self._carry = {k: float(v) for k, v in lots.get("carry", {}).items()}
+        self._short = float(lots.get("short", 0.0))
+        self.qty = float(state["qty"])
+        self.cost_ccy = float(state["cost_ccy"])
+        self.cost_base = {b: float(c) for b, c in state["cost_base"].items()}
+
+
+def new_book(method: str):
+    """An empty book for `method` (see METHODS)."""
+    if method == "average":
+        return AverageBook()
+    if method == "fifo":
+        return QueueBook(lifo=False)
+    if method == "lifo":
+        return QueueBook(lifo=True)
+    raise ValueError(f"unknown cost basis method {method!r}")
+
+
+def load_book(method: str, state: Mapping):
+    """A book for `method` holding a state saved with `dump()`."""
+    book = new_book(method)
+    book._restore(state)
+    return book
@@ -0,0 +1,144 @@
+# app/services/market_calendar.py
+"""
+Exchange calendar used to skip price refreshes that cannot return anything new.
+
+The exchange is derived from the Yahoo-style symbol suffix, i.e. the same
+codes as the Stooq mapping in yf_client (`HSBA.L` -> "L", `AAPL` -> "US").
+An instrument is "due" when its exchange has had a regular close since the
+instrument's `latest_price_at`; weekends and rows in `market_holiday` are not
+sessions. Symbols whose exchange we don't know are always due.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+from zoneinfo import ZoneInfo
+
+from sqlmodel import Session, select
+
+from app.models.market_holiday import MarketHoliday
+from app.services.yf_client import _STOOQ_SUFFIX_MAP
+
+
+@dataclass(frozen=True)
+class Exchange:
+    code: str
+    tz: str
+    close: time          # regular session close, local time
+
+    @property
+    def zone(self) -> ZoneInfo:
+        return ZoneInfo(self.tz)
+
+
+# Keyed by the Yahoo suffix codes of _STOOQ_SUFFIX_MAP
+EXCHANGES: Dict[str, Exchange] = {
+    "US": Exchange("US", "America/New_York", time(16, 0)),
+    "L":  Exchange("L",  "Europe/London",    time(16, 30)),
+    "DE": Exchange("DE", "Europe/Berlin",    time(17, 30)),
+    "PA": Exchange("PA", "Europe/Paris",     time(17, 30)),
+    "HK": Exchange("HK", "Asia/Hong_Kong",   time(16, 0)),
+}
+
+_SUFFIX_RE = re.compile(r"^([A-Z0-9\-]+)\.([A-Z]{1,3})$")
+# FX pairs (EURUSD=X), crypto (BTC-USD) and indices (^GSPC) have no single venue
+_NO_VENUE_RE = re.compile(r"(=X$|^\^|-[A-Z]{3}$)")
+
+# How far back to look for the previous session (covers long holiday runs)
+_MAX_LOOKBACK_DAYS = 10
+
+
+def exchange_for_symbol(symbol: Optional[str]) -> Optional[Exchange]:
+    """Exchange for a Yahoo-style symbol, or None when it can't be determined."""
+    s = (symbol or "").strip().upper()
+    if not s or _NO_VENUE_RE.search(s):
+        return None
+
+    m = _SUFFIX_RE.match(s)
+    if m:
+        suf = m.group(2)
+        if suf in _STOOQ_SUFFIX_MAP:
+            return EXCHANGES.get(suf)
+        # One-letter suffixes are US share classes (BRK.B); others are unknown venues
+        return EXCHANGES["US"] if len(suf) == 1 else None
+
+    return EXCHANGES["US"]
+
+
+def load_holidays(
+    session: Session,
+    *,
+    since: Optional[date] = None,
+    exchanges: Optional[Iterable[str]] = None,
+) -> Dict[str, Set[date]]:
+    """Holiday dates per exchange code, from `since` (default: lookback window) onwards."""
+    since = since or (datetime.now(timezone.utc).date() - timedelta(days=_MAX_LOOKBACK_DAYS + 1))
+    q = select(MarketHoliday.exchange, MarketHoliday.holiday_date).where(MarketHoliday.holiday_date >= since)
+    if exchanges is not None:
+        q = q.where(MarketHoliday.exchange.in_(list(exchanges)))
+
+    out: Dict[str, Set[date]] = {}
+    for code, d in session.exec(q).all():
+        out.setdefault(code, set()).add(d)
+    return out
+
+
+def is_session_day(ex: Exchange, d: date, holidays: Optional[Set[date]] = None) -> bool:
+    return d.weekday() < 5 and d not in (holidays or ())
+
+
+def last_close(ex: Exchange, now: datetime, holidays: Optional[Set[date]] = None) -> Optional[datetime]:
+    """UTC datetime of the most recent regular close at or before `now`."""
+    local_now = now.astimezone(ex.zone)
+    d = local_now.date()
+    for _ in range(_MAX_LOOKBACK_DAYS + 1):
+        if is_session_day(ex, d, holidays):
+            close_at = datetime.combine(d, ex.close, tzinfo=ex.zone)
+            if close_at <= local_now:
+                return close_at.astimezone(timezone.utc)
+        d -= timedelta(days=1)
+    return None
+
+
+def _effective_price_time(ex: Exchange, ts: datetime) -> datetime:
+    """
+    Daily-close providers (Stooq, yfinance) stamp prices at midnight UTC of the
+    session date; read those as that session's close so they aren't refetched.
+    """
+    ts = ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    utc = ts.astimezone(timezone.utc)
+    if utc.time() == time(0, 0):
+        return datetime.combine(utc.date(), ex.close, tzinfo=ex.zone).astimezone(timezone.utc)
+    return utc
+
+
+class MarketCalendar:
+    """Per-run helper: holidays are loaded once, `is_due` is then pure CPU."""
+
+    def __init__(self, holidays: Optional[Dict[str, Set[date]]] = None, now: Optional[datetime] = None):
+        self.holidays = holidays or {}
+        self.now = now or datetime.now(timezone.utc)
+        self._closes: Dict[str, Optional[datetime]] = {}
+
+    @classmethod
+    def load(cls, session: Session, now: Optional[datetime] = None) -> "MarketCalendar":
+        return cls(load_holidays(session), now=now)
+
+    def last_close(self, ex: Exchange) -> Optional[datetime]:
+        if ex.code not in self._closes:
+            self._closes[ex.code] = last_close(ex, self.now, self.holidays.get(ex.code))
+        return self._closes[ex.code]
+
+    def is_due(self, symbol: Optional[str], latest_price_at: Optional[datetime]) -> bool:
+        """True if the symbol's market closed since `latest_price_at` (or we can't tell)."""
+        if latest_price_at is None:
+            return True
+        ex = exchange_for_symbol(symbol)
+        if ex is None:
+            return True
+        closed_at = self.last_close(ex)
+        if closed_at is None:
+            return True
+        return _effective_price_time(ex, latest_price_at) < closed_at
@@ -0,0 +1,131 @@
+# app/services/position_snapshots.py
+"""
+Periodic position snapshots (app/models/position_snapshot.py): the lot
+books at month ends, so positions as of any day replay only the activities
+since the latest snapshot before it instead of the whole ledger.
+
+`write_snapshots` extends a user's snapshots up to the last complete month,
+starting from their latest valid snapshot, for the user's current cost basis
+method and base currency. A snapshot is kept at a month end once at least
+POSITION_SNAPSHOT_MIN_ACTIVITIES trades were replayed since the previous
+one, which bounds an as-of replay to about that many trades plus one month.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from app.core.base_currency import norm_ccy
+from app.core.config import settings
+from app.core.settings_svc import get_or_create_settings
+from app.models.activities import Activity
+from app.models.position_snapshot import PositionSnapshot
+from app.models.user import User
+from app.repositories import account as account_repo
+from app.repositories import activity as activity_repo
+from app.services.lots import load_book, normalize_method
+
+
+def month_end(year: int, month: int) -> date:
+    return date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+
+
+def last_complete_month_end(today: Optional[date] = None) -> date:
+    return (today or date.today()).replace(day=1) - timedelta(days=1)
+
+
+def latest(session: Session, owner_user_id: int, method: str, base_ccy: str, on: date) -> Optional[PositionSnapshot]:
+    """The newest snapshot dated on or before `on`, if any."""
+    return session.exec(
+        select(PositionSnapshot)
+        .where(
+            PositionSnapshot.owner_user_id == owner_user_id,
+            PositionSnapshot.method == method,
+            PositionSnapshot.base_currency == base_ccy,
+            PositionSnapshot.as_of <= on,
+        )
+        .order_by(PositionSnapshot.as_of.desc())
+        .limit(1)
+    ).first()
+
+
+def restore(snap: PositionSnapshot, method: str, account_ids: Iterable[int]) -> Dict[tuple, Any]:
+    """The snapshot's books, keyed like compute_positions, for the given accounts."""
+    accounts = set(account_ids)
+    return {
+        (acc, inst, brk): load_book(method, state)
+        for acc, inst, brk, state in snap.books
+        if acc in accounts
+    }
+
+
+def dump(lots: Dict[tuple, Any]) -> List[list]:
+    # a book without quantity can still hold the cost of fee-only buys or a short correction
+    return [[*key, book.dump()] for key, book in lots.items() if book.qty or book.cost_ccy]
+
+
+def write_snapshots(
+    session: Session,
+    user: User,
+    *,
+    until: Optional[date] = None,
+    min_activities: Optional[int] = None,
+) -> int:
+    """Add month-end snapshots for `user` up to `until` (last complete month); returns how many."""
+    from app.services.positions import replay_lots
+
+    until = until or last_complete_month_end()
+    min_activities = settings.POSITION_SNAPSHOT_MIN_ACTIVITIES if min_activities is None else min_activities
+    prefs = get_or_create_settings(session, user=user)
+    base_ccy = norm_ccy(prefs.base_currency_code or "USD")
+    method = normalize_method(prefs.cost_basis_method)
+
+    acc_ids = [a.id for a in account_repo.for_owner(session, user.id)]
+    if not acc_ids:
+        return 0
+
+    lots: Dict[tuple, Any] = {}
+    since: Optional[date] = None
+    count = 0
+    last = latest(session, user.id, method, base_ccy, until)
+    if last is not None:
+        lots = restore(last, method, acc_ids)
+        since, count = last.as_of, last.activity_count
+
+    acts = activity_repo.iter_for_accounts(session, acc_ids, since=since, until=until)
+    fx_cache: Dict = {}
+    added: List[PositionSnapshot] = []
+    pending = 0
+    for (year, month), group in groupby(acts, key=lambda a: (a.date.year, a.date.month)):
+        n = replay_lots(session, group, lots, method, [base_ccy], fx_cache)
+        count += n
+        pending += n
+        if pending and pending >= min_activities:
+            added.append(PositionSnapshot(
+                owner_user_id=user.id, as_of=month_end(year, month), method=method,
+                base_currency=base_ccy, activity_count=count, books=dump(lots),
+            ))
+            pending = 0
+
+    if added:
+        session.add_all(added)
+        session.commit()
+    return len(added)
+
+
+def write_all_snapshots(session: Session, *, until: Optional[date] = None) -> Dict[str, int]:
+    """`write_snapshots` for every user with activities (the scheduled job)."""
+    owners = session.exec(
+        select(Activity.owner_user_id).where(Activity.owner_user_id.is_not(None)).distinct()
+    ).all()
+    stats = {"users": 0, "snapshots": 0}
+    for owner in owners:
+        user = session.get(User, owner)
+        if user is None:
+            continue
+        stats["users"] += 1
+        stats["snapshots"] += write_snapshots(session, user, until=until)
+    return stats
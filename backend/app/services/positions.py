@@ -1,19 +1,25 @@
 # app/services/positions.py
 from __future__ import annotations
-from collections import defaultdict
-from dataclasses import dataclass
 from datetime import date
-from typing import Dict, List, Optional, Tuple, Any
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Any
 
+import numpy as np
 from sqlmodel import Session, select
-from app.models.activities import Activity
 from app.models.instrument import Instrument
 from app.models.account import Account
 from app.models.broker import Broker
 from app.models.user import User
 
+from app.core.base_currency import norm_ccy
 from app.core.settings_svc import get_or_create_settings
+from app.repositories import account as account_repo
+from app.repositories import activity as activity_repo
+from app.repositories import instrument as instrument_repo
+from app.services import position_snapshots
 from app.services.fx_resolver import fx_rate_on
+from app.services.lots import new_book, normalize_method
+from app.services.price_cache import PRICE_STORE
 
 try:
     from app.core.tenant import TenantContext
@@ -21,25 +27,53 @@ except Exception:
     TenantContext = Any
 
 
-@dataclass
-class Lot:
-    qty: float = 0.0
-    cost_ccy: float = 0.0   # cost in instrument txn currency
-    cost_base: float = 0.0  # cost in app base currency
-
-
 def _safe_div(a: float, b: float) -> float:
     return a / b if b else 0.0
 
 
-def _norm_ccy(code: Optional[str]) -> str:
-    """
-    Preserve 'GBp' exactly; otherwise uppercase 3-letter codes.
-    """
-    if not code:
-        return ""
-    s = code.strip()
-    return "GBp" if s == "GBp" else s.upper()
+def _valuation(qty: float, cost: float, last: float) -> Dict[str, float]:
+    mv = qty * last
+    return {"avg_cost": _safe_div(cost, qty), "last": last, "market_value": mv, "unrealized": mv - cost}
+
+
+Key = Tuple[int, int, Optional[int]]
+
+
+def replay_lots(
+    session: Session,
+    acts: Iterable,
+    lots: Dict[Key, Any],
+    method: str,
+    bases: Sequence[str],
+    fx_cache: Optional[Dict] = None,
+) -> int:
+    """Apply Buy/Sell activities (ledger order) to `lots`; returns the number applied."""
+    n = 0
+    for a in acts:
+        if not a.instrument_id or a.type not in ("Buy", "Sell"):
+            continue
+
+        # broker_id can be None
+        key: Key = (a.account_id, a.instrument_id, a.broker_id)
+        lot = lots.get(key)
+        if lot is None:
+            lot = lots[key] = new_book(method)
+
+        q = float(a.quantity or 0.0)
+        p = float(a.unit_price or 0.0)
+        fee = float(a.fee or 0.0)
+        ccy = norm_ccy(a.currency_code)
+        trade_total = q * p + fee
+
+        if a.type == "Buy":
+            lot.buy(q, trade_total, {
+                b: trade_total * (fx_rate_on(session, ccy, b, a.date, cache=fx_cache) or 0.0)
+                for b in bases
+            })
+        else:  # Sell
+            lot.sell(q)
+        n += 1
+    return n
 
 
 def compute_positions(
@@ -48,99 +82,84 @@ def compute_positions(
     *,
     user: Optional[User] = None,
     ctx: Optional[TenantContext] = None,
+    bases: Optional[Sequence[str]] = None,
+    method: Optional[str] = None,
+    as_of: Optional[date] = None,
 ) -> List[Dict]:
     """
-    Rolls all Activities by (account_id, instrument_id) using moving-average method.
-    Produces closing positions and valuations in both instrument currency and base currency.
+    Rolls all Activities by (account_id, instrument_id, broker_id) into lot
+    books (app.services.lots) using the user's cost basis method (moving
+    average, FIFO or LIFO; `method` overrides it). Produces closing positions and valuations in both instrument currency and base currency.
     Scoped to a specific user (and optionally tenant/org via ctx).
+
+    `bases` values the same replay in further base currencies: each row then
+    carries a "bases" mapping {ccy: {avg_cost, last, market_value,
+    unrealized}} that includes the primary base. Only the FX leg differs per
+    base, so the activities are read once whatever the number of bases.
+
+    `as_of` gives the positions at the end of that day instead: activities
+    dated after it are ignored, and positions are valued at the last
+    PriceHistory close and FX rate on or before it. The lots are restored
+    from the latest position snapshot (app.services.position_snapshots) at
+    or before the day, so only the activities since that snapshot are
+    replayed.
     """
     if not user:
         return []
 
     # 0) base currency (user's settings; allow override)
     settings = get_or_create_settings(session, user=user)
-    base_ccy = _norm_ccy(base_ccy_override or settings.base_currency_code or "USD")
-
-    # 1) load this user's accounts
-    accounts = session.exec(
-        select(Account).where(Account.owner_user_id == user.id)
-    ).all()
+    base_ccy = norm_ccy(base_ccy_override or settings.base_currency_code or "USD")
+    method = normalize_method(method or settings.cost_basis_method)
+    all_bases = [base_ccy]
+    for b in bases or ():
+        b = norm_ccy(b)
+        if b and b not in all_bases:
+            all_bases.append(b)
+
+    # 1) load this user's accounts (column rows, see app.repositories.projection)
+    accounts = account_repo.for_owner(session, user.id)
     if not accounts:
         return []
     acc_map: Dict[int, Account] = {a.id: a for a in accounts}
     acc_ids = list(acc_map.keys())
 
-    # 2) user's activities (restricted to their accounts)
-    acts = session.exec(
-        select(Activity)
-        .where(Activity.account_id.in_(acc_ids))
-        .order_by(Activity.date.asc(), Activity.id.asc())
-    ).all()
-    if not acts:
-        return []
+    # 2) rolling lots, key: (account_id, instrument_id, broker_id). For an
+    # as-of date they start from the latest snapshot at or before it, so only
+    # the activities since then are read (snapshots hold the primary base only)
+    lots: Dict[Key, Any] = {}
+    since: Optional[date] = None
+    if as_of is not None and len(all_bases) == 1:
+        snap = position_snapshots.latest(session, user.id, method, base_ccy, as_of)
+        if snap is not None:
+            lots = position_snapshots.restore(snap, method, acc_ids)
+            since = snap.as_of
+
+    # 3) user's activities (restricted to their accounts), streamed in ledger
+    # order and reduced in one pass: only the lots stay in memory
+    acts = activity_repo.iter_for_accounts(session, acc_ids, since=since, until=as_of)
+    fx_cache: Dict[Tuple[str, str, date], Optional[float]] = {}
+    replay_lots(session, acts, lots, method, all_bases, fx_cache)
 
-    # 3) cache instruments & brokers
-    inst_ids = {a.instrument_id for a in acts if a.instrument_id}
-    inst_map: Dict[int, Instrument] = {}
-    if inst_ids:
-        rows = session.exec(select(Instrument).where(Instrument.id.in_(inst_ids))).all()
-        inst_map = {r.id: r for r in rows}
+    # 4) cache instruments & brokers of the positions
+    inst_ids = {k[1] for k in lots}
+    inst_map: Dict[int, Instrument] = instrument_repo.by_ids(session, inst_ids)
 
-    broker_ids = {a.broker_id for a in acts if a.broker_id}
+    broker_ids = {k[2] for k in lots if k[2]}
     broker_map: Dict[int, Broker] = {}
     if broker_ids:
         brows = session.exec(select(Broker).where(Broker.id.in_(broker_ids))).all()
         broker_map = {b.id: b for b in brows}
 
-
-    # 4) rolling lots
-    # Key: (account_id, instrument_id, broker_id)
-    Key = Tuple[int, int, Optional[int]]
-    lots: Dict[Key, Lot] = defaultdict(Lot)
-    fx_cache: Dict[Tuple[str, str, date], Optional[float]] = {}
-
-    for a in acts:
-        if not a.instrument_id or a.type not in ("Buy", "Sell"):
-            continue
-
-        # broker_id can be None
-        key: Key = (a.account_id, a.instrument_id, a.broker_id)
-        lot = lots[key]
-
-
-        q = float(a.quantity or 0.0)
-        p = float(a.unit_price or 0.0)
-        fee = float(a.fee or 0.0)
-        ccy = _norm_ccy(a.currency_code)
-        trade_total = q * p + fee
-
-        r = fx_rate_on(session, ccy, base_ccy, a.date, cache=fx_cache) or 0.0
-        trade_total_base = trade_total * r
-
-        if a.type == "Buy":
-            lot.qty += q
-            lot.cost_ccy += trade_total
-            lot.cost_base += trade_total_base
-        else:  # Sell
-            if lot.qty <= 0:
-                lot.qty -= q
-            else:
-                avg_ccy = _safe_div(lot.cost_ccy, lot.qty)
-                avg_base = _safe_div(lot.cost_base, lot.qty)
-
-                lot.qty -= q
-                lot.cost_ccy -= avg_ccy * q
-                lot.cost_base -= avg_base * q
-
-            if lot.qty < 1e-10:
-                lot.qty = 0.0
-                lot.cost_ccy = 0.0
-                lot.cost_base = 0.0
-
-        lots[key] = lot
-
-    # 5) build rows
-    today = date.today()
+    # 5) build rows, priced at the latest price or, for an as-of date, that day's close
+    value_day = as_of or date.today()
+    closes: Dict[int, float] = {}
+    if as_of is not None:
+        day = np.array([as_of.toordinal()])
+        closes = {
+            iid: float(series.asof(day)[0])
+            for iid, series in PRICE_STORE.get_many(session, inst_ids).items()
+        }
     rows: List[Dict] = []
     for (account_id, instrument_id, broker_id), lot in lots.items():
         if lot.qty <= 0:
@@ -151,7 +170,8 @@ def compute_positions(
         brk = broker_map.get(broker_id) if broker_id else None
 
         if not inst:
-            rows.append({
+            cost_base = lot.cost_base.get(base_ccy, 0.0)
+            row = {
                 "account_id": account_id,
                 "account_name": acc.name if acc else account_id,
                 "broker_id": broker_id,
@@ -165,30 +185,47 @@ def compute_positions(
                 "instrument_currency": None,
                 "qty": lot.qty,
                 "avg_cost_ccy": _safe_div(lot.cost_ccy, lot.qty),
-                "avg_cost_base": _safe_div(lot.cost_base, lot.qty),
+                "avg_cost_base": _safe_div(cost_base, lot.qty),
                 "last_ccy": 0.0,
                 "last_base": 0.0,
                 "market_value_ccy": 0.0,
                 "market_value_base": 0.0,
                 "unrealized_ccy": -lot.cost_ccy,
-                "unrealized_base": -lot.cost_base,
+                "unrealized_base": -cost_base,
                 "base_currency": base_ccy,
-            })
+            }
+            if bases:
+                row["bases"] = {
+                    b: _valuation(lot.qty, lot.cost_base.get(b, 0.0), 0.0) for b in all_bases
+                }
+            rows.append(row)
             continue
 
-        inst_ccy = _norm_ccy(inst.currency_code)
-        last_ccy = float(inst.latest_price or 0.0)
-
-        fx_today = fx_rate_on(session, inst_ccy, base_ccy, today, cache=fx_cache) or 0.0
-        last_base = last_ccy * fx_today
+        inst_ccy = norm_ccy(inst.currency_code)
+        if as_of is None:
+            last_ccy = float(inst.latest_price or 0.0)
+        else:
+            c = closes.get(instrument_id, math.nan)
+            last_ccy = 0.0 if math.isnan(c) else c
+
+        per_base = {
+            b: _valuation(
+                lot.qty,
+                lot.cost_base.get(b, 0.0),
+                last_ccy * (fx_rate_on(session, inst_ccy, b, value_day, cache=fx_cache) or 0.0),
+            )
+            for b in all_bases
+        }
+        primary = per_base[base_ccy]
+        last_base = primary["last"]
 
         mv_ccy = lot.qty * last_ccy
-        mv_base = lot.qty * last_base
+        mv_base = primary["market_value"]
 
         avg_cost_ccy = _safe_div(lot.cost_ccy, lot.qty)
-        avg_cost_base = _safe_div(lot.cost_base, lot.qty)
+        avg_cost_base = primary["avg_cost"]
 
-        rows.append({
+        row = {
             "account_id": account_id,
             "account_name": acc.name if acc else account_id,
             "broker_id": broker_id,
@@ -208,9 +245,12 @@ def compute_positions(
             "market_value_ccy": mv_ccy,
             "market_value_base": mv_base,
             "unrealized_ccy": mv_ccy - lot.cost_ccy,
-            "unrealized_base": mv_base - lot.cost_base,
+            "unrealized_base": primary["unrealized"],
             "base_currency": base_ccy,
-        })
+        }
+        if bases:
+            row["bases"] = per_base
+        rows.append(row)
 
     rows.sort(key=lambda r: (str(r["account_name"]), str(r["name"] or r["symbol"] or r["instrument_id"])))
     return rows
\ No newline at end of file
@@ -0,0 +1,101 @@
+# app/services/price_archive.py
+"""
+Optional on-disk archive of public daily closes, one `.npy` file per
+instrument under PRICE_ARCHIVE_DIR (off when unset).
+
+Each file holds a (2, N) float64 array: row 0 date ordinals (ascending, one
+per day), row 1 closes. Reads memory-map the file read-only, so both rows are
+contiguous zero-copy views and only the pages a query touches are read.
+Files are replaced atomically (write temp + rename), so readers holding an
+older mapping keep a consistent snapshot.
+
+The archive only ever holds public rows (price_history.org_id IS NULL)
+older than the DB window: `python -m app.tasks.compact_prices` is its only
+writer, moving old public price_history rows here. Recent rows stay in the
+DB, as do tenant and manual rows. When a day exists in both places, the DB
+row wins (see PriceSeries.with_archive).
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def archive_dir() -> Optional[Path]:
+    return Path(settings.PRICE_ARCHIVE_DIR) if settings.PRICE_ARCHIVE_DIR else None
+
+
+def enabled() -> bool:
+    return archive_dir() is not None
+
+
+def path_for(instrument_id: int) -> Path:
+    d = archive_dir()
+    if d is None:
+        raise RuntimeError("PRICE_ARCHIVE_DIR is not set")
+    return d / f"{int(instrument_id)}.npy"
+
+
+def read(instrument_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(dates, closes) as read-only memmap views, or None if nothing is archived."""
+    if not enabled():
+        return None
+    try:
+        mm = np.load(path_for(instrument_id), mmap_mode="r")
+    except FileNotFoundError:
+        return None
+    if mm.ndim != 2 or mm.shape[0] != 2 or mm.shape[1] == 0:
+        return None
+    return mm[0], mm[1]
+
+
+def last_date(instrument_id: int) -> Optional[date]:
+    got = read(instrument_id)
+    return date.fromordinal(int(got[0][-1])) if got else None
+
+
+def merge(instrument_id: int, rows: Iterable[Tuple[date, float]]) -> int:
+    """
+    Merge (date, close) rows into an instrument's file; a row replaces an
+    archived close for the same day, and later rows win over earlier ones.
+    Returns the number of archived days afterwards.
+    """
+    rows = list(rows)
+    if not rows:
+        existing = read(instrument_id)
+        return len(existing[0]) if existing else 0
+
+    new_d = np.fromiter((d.toordinal() for d, _ in rows), dtype=np.float64, count=len(rows))
+    new_c = np.fromiter((c for _, c in rows), dtype=np.float64, count=len(rows))
+    existing = read(instrument_id)
+    if existing is not None:
+        new_d = np.concatenate([existing[0], new_d])
+        new_c = np.concatenate([existing[1], new_c])
+
+    order = np.argsort(new_d, kind="stable")
+    d, c = new_d[order], new_c[order]
+    keep = np.append(d[1:] != d[:-1], True)  # last of each day
+    _write(path_for(instrument_id), np.stack([d[keep], c[keep]]))
+    return int(keep.sum())
+
+
+def _write(path: Path, arr: np.ndarray) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(arr, dtype=np.float64))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
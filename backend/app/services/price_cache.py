@@ -0,0 +1,270 @@
+# app/services/price_cache.py
+"""
+Process-wide columnar cache of daily closes, per instrument.
+
+Each cached instrument is a `PriceSeries`: two parallel NumPy arrays of
+date ordinals (int32, ascending, one entry per date) and closes (float64).
+Series are loaded lazily, all missing instruments in one query that fetches
+plain tuples, and evicted least-recently-used once the arrays together
+exceed PRICE_CACHE_MAX_MB.
+
+Writes made through the ORM in this process are applied after their
+session commits: inserts are merged into cached arrays, updates and deletes
+drop the instrument so it is reloaded. Rows written by other processes (or
+Core bulk loads) show up once a series is older than PRICE_CACHE_TTL_SEC.
+
+Like the analytics query it replaces, a series merges every row for the
+instrument; when several rows share a date the one with the highest id wins.
+With PRICE_ARCHIVE_DIR set, older public closes come from the memory-mapped
+archive instead (see app.services.price_archive).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
+from app.models.price_history import PriceHistory
+from app.services import price_archive
+
+_HIT = CACHE_LOOKUPS.labels("prices", "hit")
+_MISS = CACHE_LOOKUPS.labels("prices", "miss")
+_PENDING = "price_cache_pending"
+
+
+class PriceSeries:
+    """
+    `dates`/`closes` hold the rows loaded from the DB. `archived`, when set,
+    is a read-only segment from the on-disk archive (app.services.price_archive);
+    it is memory-mapped, not copied, and DB rows are overlaid on it at lookup.
+    """
+    __slots__ = ("dates", "closes", "loaded_at", "archived")
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        closes: np.ndarray,
+        loaded_at: Optional[float] = None,
+        archived: Optional["PriceSeries"] = None,
+    ):
+        self.dates = dates
+        self.closes = closes
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        self.archived = archived
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[date, float]]) -> "PriceSeries":
+        """Rows must be ordered by (date, id); the last row of each date is kept."""
+        rows = list(rows)
+        dates = np.fromiter((d.toordinal() for d, _ in rows), dtype=np.int32, count=len(rows))
+        closes = np.fromiter((c for _, c in rows), dtype=np.float64, count=len(rows))
+        if len(dates) > 1:
+            keep = np.append(dates[1:] != dates[:-1], True)
+            dates, closes = dates[keep], closes[keep]
+        return cls(dates, closes)
+
+    @classmethod
+    def with_archive(cls, archived: Optional["PriceSeries"], db: "PriceSeries") -> "PriceSeries":
+        """
+        Overlay DB rows on an archived segment. Nothing is copied: `asof`
+        looks in both and takes the later day, the DB row on a day present
+        in both (corrections, tenant rows).
+        """
+        if archived is None or len(archived) == 0:
+            return db
+        return cls(db.dates, db.closes, db.loaded_at, archived=archived)
+
+    @property
+    def nbytes(self) -> int:
+        # archived pages belong to the OS page cache, not to this process' budget
+        return int(self.dates.nbytes + self.closes.nbytes)
+
+    def __len__(self) -> int:
+        # days present in both the DB rows and the archive count twice
+        return len(self.dates) + (len(self.archived) if self.archived is not None else 0)
+
+    def _last(self, ordinals: np.ndarray, floor: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(day of the last own close on or before each ordinal, -1 if none; that close or NaN)"""
+        days = np.full(len(ordinals), -1.0)
+        out = np.full(len(ordinals), np.nan)
+        if len(self.dates):
+            idx = np.searchsorted(self.dates, ordinals, side="right") - 1
+            ok = idx >= 0
+            if floor is not None:
+                ok &= self.dates[np.clip(idx, 0, None)] >= floor
+            days[ok] = self.dates[idx[ok]]
+            out[ok] = self.closes[idx[ok]]
+        return days, out
+
+    def asof(self, ordinals: np.ndarray, floor: Optional[int] = None) -> np.ndarray:
+        """
+        Last close on or before each ordinal (NaN where there is none).
+        Closes dated before `floor` are ignored.
+        """
+        days, out = self._last(ordinals, floor)
+        if self.archived is not None:
+            arch_days, arch_out = self.archived._last(ordinals, floor)
+            later = arch_days > days  # the DB row wins a day present in both
+            out[later] = arch_out[later]
+        return out
+
+    def merged(self, ordinal: int, close: float) -> "PriceSeries":
+        """A copy with `close` set on `ordinal` (replacing a same-day DB close)."""
+        i = int(np.searchsorted(self.dates, ordinal))
+        if i < len(self.dates) and self.dates[i] == ordinal:
+            closes = self.closes.copy()
+            closes[i] = close
+            return PriceSeries(self.dates, closes, self.loaded_at, self.archived)
+        return PriceSeries(
+            np.insert(self.dates, i, ordinal),
+            np.insert(self.closes, i, close),
+            self.loaded_at,
+            self.archived,
+        )
+
+
+class PriceStore:
+    """LRU of PriceSeries bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int, ttl_sec: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._series: "OrderedDict[int, PriceSeries]" = OrderedDict()
+        self._bytes = 0
+        self._version = 0  # bumped by every write; loads started before one aren't cached
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, instrument_id: int) -> bool:
+        return instrument_id in self._series
+
+    def get_many(self, session: Session, instrument_ids: Iterable[int]) -> Dict[int, PriceSeries]:
+        ids = {int(i) for i in instrument_ids if i}
+        out: Dict[int, PriceSeries] = {}
+        now = time.monotonic()
+        with self._lock:
+            for iid in ids:
+                s = self._series.get(iid)
+                if s is None or (self.ttl_sec and now - s.loaded_at > self.ttl_sec):
+                    continue
+                self._series.move_to_end(iid)
+                out[iid] = s
+            version = self._version
+        _HIT.inc(len(out))
+
+        missing = sorted(ids - out.keys())
+        if missing:
+            _MISS.inc(len(missing))
+            loaded = self._load(session, missing)
+            out.update(loaded)
+            with self._lock:
+                if self._version == version:
+                    for iid, s in loaded.items():
+                        self._put(iid, s)
+        return out
+
+    @staticmethod
+    def _load(session: Session, ids: List[int]) -> Dict[int, PriceSeries]:
+        rows = session.exec(
+            select(PriceHistory.instrument_id, PriceHistory.price_date, PriceHistory.close)
+            .where(PriceHistory.instrument_id.in_(ids))
+            .order_by(PriceHistory.instrument_id, PriceHistory.price_date, PriceHistory.id)
+        ).all()
+        by_inst: Dict[int, List[Tuple[date, float]]] = {i: [] for i in ids}
+        for iid, d, c in rows:
+            by_inst[iid].append((d, c))
+        out = {iid: PriceSeries.from_rows(r) for iid, r in by_inst.items()}
+        if price_archive.enabled():
+            for iid in ids:
+                arch = price_archive.read(iid)
+                if arch is not None:
+                    out[iid] = PriceSeries.with_archive(PriceSeries(*arch), out[iid])
+        return out
+
+    def _put(self, iid: int, series: PriceSeries) -> None:
+        old = self._series.pop(iid, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if series.nbytes > self.max_bytes:
+            return
+        self._series[iid] = series
+        self._bytes += series.nbytes
+        while self._bytes > self.max_bytes and self._series:
+            _, evicted = self._series.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def append(self, instrument_id: int, price_date: date, close: float) -> None:
+        """Merge a newly written close into the cached series (no-op if not cached)."""
+        with self._lock:
+            self._version += 1
+            s = self._series.get(instrument_id)
+            if s is not None:
+                self._put(instrument_id, s.merged(price_date.toordinal(), float(close)))
+
+    def invalidate(self, instrument_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._version += 1
+            if instrument_id is None:
+                self._series.clear()
+                self._bytes = 0
+                return
+            old = self._series.pop(instrument_id, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+
+    clear = invalidate
+
+
+PRICE_STORE = PriceStore(
+    max_bytes=int(settings.PRICE_CACHE_MAX_MB * 1024 * 1024),
+    ttl_sec=settings.PRICE_CACHE_TTL_SEC,
+)
+
+
+# ---- write-through -----------------------------------------------------------
+# Mapper events only queue the change on the session; it reaches the store
+# once the transaction commits, so rolled-back writes never leak into it.
+
+def _queue(target: PriceHistory, op: str) -> None:
+    session = object_session(target)
+    if session is None:
+        PRICE_STORE.invalidate(target.instrument_id)
+        return
+    session.info.setdefault(_PENDING, []).append((op, target.instrument_id, target.price_date, target.close))
+
+
+@event.listens_for(PriceHistory, "after_insert")
+def _on_insert(_mapper, _conn, target: PriceHistory) -> None:
+    _queue(target, "append")
+
+
+@event.listens_for(PriceHistory, "after_update")
+@event.listens_for(PriceHistory, "after_delete")
+def _on_change(_mapper, _conn, target: PriceHistory) -> None:
+    _queue(target, "invalidate")
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    for op, iid, d, close in session.info.pop(_PENDING, ()):
+        if op == "append":
+            PRICE_STORE.append(iid, d, close)
+        else:
+            PRICE_STORE.invalidate(iid)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -1,26 +1,42 @@
 # app/services/price_history.py
 from sqlmodel import Session, select
-from typing import Optional
-from app.models.price_history import PriceHistory
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import date
+from app.models.latest_price import LatestPrice
 
-def latest_price_for(session: Session, instrument_id: int, org_id: Optional[int] = None):
+PricePoint = Tuple[float, date]
+
+
+def latest_prices_for(
+    session: Session, instrument_ids: Iterable[int], org_id: Optional[int] = None
+) -> Dict[int, PricePoint]:
+    """
+    {instrument_id: (close, price_date)} from the latest_price table in one query.
+    With an org_id, the newer of the tenant's and the public close is used
+    (the tenant's on a tie).
+    """
+    ids = {int(i) for i in instrument_ids}
+    if not ids:
+        return {}
+    scopes = [0] if org_id is None else [0, org_id]
+    rows = session.exec(
+        select(LatestPrice)
+        .where(LatestPrice.instrument_id.in_(ids))
+        .where(LatestPrice.org_id.in_(scopes))
+        .order_by(LatestPrice.org_id.asc())   # public first
+    ).all()
+    out: Dict[int, PricePoint] = {}
+    for r in rows:
+        cur = out.get(r.instrument_id)
+        if cur is None or r.price_date >= cur[1]:
+            out[r.instrument_id] = (r.close, r.price_date)
+    return out
+
+
+def latest_price_for(session: Session, instrument_id: int, org_id: Optional[int] = None) -> Optional[PricePoint]:
     """
     Return (close, price_date) for the most recent PriceHistory row for an instrument,
     optionally filtered by org_id (tenant). If org_id is provided, we prefer org-specific
     rows; otherwise we fall back to public rows.
     """
-    q = (
-        select(PriceHistory)
-        .where(PriceHistory.instrument_id == instrument_id)
-        .order_by(PriceHistory.price_date.desc(), PriceHistory.id.desc())
-    )
-    if org_id is not None:
-        # prefer org rows first; if you want a strict org-only behaviour, also add:
-        # q = q.where(PriceHistory.org_id == org_id)
-        # If you want fallback to public, you can do two queries.
-        q = q.where((PriceHistory.org_id == org_id) | (PriceHistory.org_id.is_(None)))
-
-    row = session.exec(q).first()
-    if not row:
-        return None
-    return row.close, row.price_date
\ No newline at end of file
+    return latest_prices_for(session, [instrument_id], org_id).get(instrument_id)
@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 import time
 
 from sqlmodel import Session, select
 
 from app.models.instrument import Instrument
+from app.services.market_calendar import MarketCalendar
 from app.services.yf_client import fetch_latest_price_by_provider
 
 
@@ -18,6 +19,10 @@ def refresh_all_prices(
     time_budget_sec: int = 25,
     provider: str = "auto",            # {"auto","alphavantage","stooq"}
     logger: Optional[Any] = None,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    only_due: bool = False,
+    calendar: Optional[MarketCalendar] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
 ) -> Dict[str, Any]:
     """
     Refresh instrument prices using the selected provider.
@@ -25,6 +30,17 @@ def refresh_all_prices(
     provider ∈ {"auto", "alphavantage", "stooq"} (default "auto").
     Processes up to `limit` rows (0 = all) or until `time_budget_sec` is exceeded.
     Commits periodically. Returns stats + errors.
+
+    `progress`, if given, is called with running counters
+    ({total, processed, updated, skipped, errors}) after every instrument.
+
+    With `only_due=True`, instruments whose exchange has not closed since their
+    `latest_price_at` are left out before any provider call (see
+    app.services.market_calendar); they are reported as `not_due`.
+
+    `checkpoint`, if given, is called before every instrument and may raise to
+    stop the refresh (uncommitted updates roll back); jobs pass
+    app.tasks.lease.check_lease.
     """
     # Only refresh PUBLIC Yahoo rows (shared instruments)
     q = (
@@ -32,10 +48,21 @@ def refresh_all_prices(
         .where(Instrument.data_source == "yahoo", Instrument.symbol.is_not(None))
         .order_by(Instrument.id.asc())
     )
-    if limit and limit > 0:
-        q = q.limit(limit)
-
-    instruments = session.exec(q).all()
+    not_due = 0
+    if only_due:
+        calendar = calendar or MarketCalendar.load(session)
+        instruments = []
+        for inst in session.exec(q):
+            if calendar.is_due(inst.symbol, inst.latest_price_at):
+                instruments.append(inst)
+            else:
+                not_due += 1
+        if limit and limit > 0:
+            instruments = instruments[:limit]
+    else:
+        if limit and limit > 0:
+            q = q.limit(limit)
+        instruments = session.exec(q).all()
 
     updated = 0
     skipped = 0
@@ -43,13 +70,35 @@ def refresh_all_prices(
     processed = 0
     started = time.monotonic()
 
+    def _report() -> None:
+        if progress is None:
+            return
+        try:
+            progress({
+                "total": len(instruments),
+                "processed": processed,
+                "updated": updated,
+                "skipped": skipped,
+                "errors": len(errors),
+            })
+        except Exception:
+            # progress reporting must never break the refresh itself
+            if logger:
+                logger.exception("[prices] progress callback failed")
+
+    _report()
+
     if logger:
         logger.info(
-            "[prices] refresh start: total=%d, limit=%s, budget=%ss, provider=%s",
-            len(instruments), (limit or "ALL"), time_budget_sec, provider,
+            "[prices] refresh start: total=%d, not_due=%d, limit=%s, budget=%ss, provider=%s",
+            len(instruments), not_due, (limit or "ALL"), time_budget_sec, provider,
         )
 
     for inst in instruments:
+        # e.g. stop if another runner took the job's lease over
+        if checkpoint is not None:
+            checkpoint()
+
         # Soft time budget
         if (time.monotonic() - started) >= time_budget_sec:
             if logger:
@@ -101,6 +150,8 @@ def refresh_all_prices(
             errors.append(msg)
             if logger:
                 logger.exception("[prices] ERROR %s", sym)
+        finally:
+            _report()
 
     # Final commit
     session.commit()
@@ -115,6 +166,7 @@ def refresh_all_prices(
         "processed": updated + skipped,
         "updated": updated,
         "skipped": skipped,
+        "not_due": not_due,
         "partial": partial,
         "elapsed_sec": round(elapsed, 2),
         "errors": errors[:50],
@@ -0,0 +1,183 @@
+# app/services/provider_health.py
+"""
+Per-provider health for the latest-price fetchers in yf_client.
+
+Every provider call records its outcome and latency in a rolling window.
+A circuit breaker per provider opens after N consecutive failures, so calls
+are skipped (instead of paying the full HTTP timeout per symbol) until a
+cool-down has passed. After that one probe call is let through ("half-open"):
+if it succeeds the breaker closes, otherwise it re-opens.
+
+"No data for this symbol" counts as a healthy answer; only transport errors,
+HTTP errors and rate-limit responses count as failures.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+FAILURE_THRESHOLD = int(os.getenv("PROVIDER_BREAKER_FAILURES", "5"))
+COOLDOWN_SEC = float(os.getenv("PROVIDER_BREAKER_COOLDOWN_SEC", "300"))
+# Providers with fewer samples keep their configured position in the auto chain
+MIN_SAMPLES = 5
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class ProviderError(Exception):
+    """A provider call failed in a way that says something about the provider's health."""
+
+
+def _pct(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class _State:
+    samples: Deque[Tuple[bool, float]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    breaker: str = CLOSED
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    last_error: Optional[str] = None
+
+    def success_rate(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        return sum(1 for ok, _ in self.samples if ok) / len(self.samples)
+
+    def latencies(self) -> List[float]:
+        return [lat for _, lat in self.samples]
+
+
+class ProviderHealth:
+    """Thread-safe registry of provider stats and breakers (one per process)."""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown_sec: float = COOLDOWN_SEC,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[str, _State] = {}
+
+    def _state(self, name: str) -> _State:
+        st = self._states.get(name)
+        if st is None:
+            st = self._states[name] = _State()
+        return st
+
+    # ---- breaker -------------------------------------------------------------
+
+    def allow(self, name: str) -> bool:
+        """Whether a call to `name` may go out now (claims the probe when half-open)."""
+        with self._lock:
+            st = self._state(name)
+            if st.breaker == CLOSED:
+                return True
+            if st.breaker == OPEN and self._clock() - st.opened_at >= self.cooldown_sec:
+                st.breaker = HALF_OPEN
+                st.probe_in_flight = False
+            if st.breaker == HALF_OPEN and not st.probe_in_flight:
+                st.probe_in_flight = True
+                return True
+            return False
+
+    def release(self, name: str) -> None:
+        """Give back a half-open probe that went out without recording an outcome."""
+        with self._lock:
+            st = self._state(name)
+            if st.breaker == HALF_OPEN:
+                st.probe_in_flight = False
+
+    def record(self, name: str, ok: bool, latency_sec: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            st = self._state(name)
+            st.samples.append((ok, latency_sec))
+            st.calls += 1
+            if ok:
+                st.consecutive_failures = 0
+                st.breaker = CLOSED
+                st.probe_in_flight = False
+                return
+
+            st.failures += 1
+            st.consecutive_failures += 1
+            st.last_error = (error or "")[:200] or None
+            if st.breaker == HALF_OPEN or st.consecutive_failures >= self.failure_threshold:
+                st.breaker = OPEN
+                st.opened_at = self._clock()
+                st.probe_in_flight = False
+
+    # ---- ordering ------------------------------------------------------------
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """
+        Reorder a provider chain by observed health: higher success rate first,
+        then lower median latency. Providers without enough samples keep their
+        configured rank; open breakers go last (`allow` will skip them anyway).
+        """
+        names = list(names)
+        with self._lock:
+            def key(item: Tuple[int, str]):
+                idx, name = item
+                st = self._states.get(name)
+                if st is None or len(st.samples) < MIN_SAMPLES:
+                    return (0, 0.0, 0.0, idx)
+                rate = st.success_rate() or 0.0
+                p50 = _pct(st.latencies(), 50) or 0.0
+                return (int(st.breaker == OPEN), -round(rate, 1), round(p50, 1), idx)
+
+            return [name for _, name in sorted(enumerate(names), key=key)]
+
+    # ---- reporting -----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = self._clock()
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for name, st in sorted(self._states.items()):
+                lat = st.latencies()
+                rate = st.success_rate()
+                p50, p95 = _pct(lat, 50), _pct(lat, 95)
+                out[name] = {
+                    "breaker": st.breaker,
+                    "calls": st.calls,
+                    "failures": st.failures,
+                    "consecutive_failures": st.consecutive_failures,
+                    "window": len(st.samples),
+                    "success_rate": round(rate, 3) if rate is not None else None,
+                    "latency_ms_p50": round(p50 * 1000, 1) if p50 is not None else None,
+                    "latency_ms_p95": round(p95 * 1000, 1) if p95 is not None else None,
+                    "retry_in_sec": (
+                        round(max(0.0, self.cooldown_sec - (now - st.opened_at)), 1)
+                        if st.breaker == OPEN else None
+                    ),
+                    "last_error": st.last_error,
+                }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+# Process-wide instance used by yf_client
+provider_health = ProviderHealth()
@@ -0,0 +1,74 @@
+# app/services/realized.py
+"""
+Realized P&L and income totals, aggregated in SQL over the realized_entry
+ledger (see app/models/realized.py) instead of replaying activities.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import case, extract, func, select
+from sqlmodel import Session
+
+from app.models.account import Account
+from app.models.instrument import Instrument
+from app.models.realized import RealizedEntry
+
+GROUPS = ("year", "account", "instrument")
+
+
+def realized_summary(
+    session: Session,
+    owner_user_id: int,
+    group_by: Sequence[str] = ("year",),
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Dict]:
+    """
+    Totals in the owner's base currency per group: realized gains on sells,
+    income (dividends + interest) and the taxes recorded on them.
+    `unconverted` counts entries left out of the base totals for want of an
+    FX rate.
+    """
+    e = RealizedEntry
+    year = extract("year", e.date)
+    cols, keys = [], []
+    if "year" in group_by:
+        cols.append(year.label("year"))
+        keys.append(year)
+    if "account" in group_by:
+        cols += [e.account_id.label("account_id"), Account.name.label("account_name")]
+        keys += [e.account_id, Account.name]
+    if "instrument" in group_by:
+        cols += [e.instrument_id.label("instrument_id"), Instrument.symbol.label("symbol"),
+                 Instrument.name.label("instrument_name")]
+        keys += [e.instrument_id, Instrument.symbol, Instrument.name]
+
+    is_sell = e.kind == "sell"
+    q = select(
+        *cols,
+        func.coalesce(func.sum(case((is_sell, e.amount_base), else_=0.0)), 0.0).label("realized_base"),
+        func.coalesce(func.sum(case((is_sell, 0.0), else_=e.amount_base)), 0.0).label("income_base"),
+        func.coalesce(func.sum(e.tax_base), 0.0).label("tax_base"),
+        func.count().label("entries"),
+        func.coalesce(func.sum(case((e.amount_base.is_(None), 1), else_=0)), 0).label("unconverted"),
+        func.max(e.base_currency).label("base_currency"),
+    ).where(e.owner_user_id == owner_user_id)
+    if "account" in group_by:
+        q = q.join(Account, Account.id == e.account_id)
+    if "instrument" in group_by:
+        q = q.outerjoin(Instrument, Instrument.id == e.instrument_id)
+    if start is not None:
+        q = q.where(e.date >= start)
+    if end is not None:
+        q = q.where(e.date <= end)
+    if keys:
+        q = q.group_by(*keys).order_by(*keys)
+
+    rows = [dict(r._mapping) for r in session.exec(q).all()]
+    for r in rows:
+        if "year" in r and r["year"] is not None:
+            r["year"] = int(r["year"])
+    return [r for r in rows if r["entries"]]
@@ -0,0 +1,234 @@
+# app/services/tax_report.py
+"""
+Tax-year report: realized gains (average cost and FIFO), income, and the
+taxes and fees recorded on activities, in base currency, per jurisdiction.
+
+One date-ordered pass over the user's ledger up to the end of the tax year
+keeps one lot book per method (app/services/lots.py) side by side; only
+activities dated inside the year are reported. FX comes from one preloaded
+table (`preload_fx`) instead of a query per currency and day.
+
+The jurisdiction of an activity is the country of its instrument (blank for
+cash activities and instruments without one).
+
+Reports are cached in memory per (user, tax year, year start, base currency,
+AppSetting.data_version, FX marker). The data version follows the activity
+and instrument writes listed in app/models/realized.py; the FX marker (row
+count, newest id, latest updated_at) follows FX writes made through SQLAlchemy.
+"""
+from __future__ import annotations
+
+import copy
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.base_currency import norm_ccy
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
+from app.core.settings_svc import get_or_create_settings
+from app.models.fx import FxRate
+from app.models.instrument import Instrument
+from app.models.settings import AppSetting
+from app.models.user import User
+from app.repositories import account as account_repo
+from app.repositories import activity as activity_repo
+from app.repositories import instrument as instrument_repo
+from app.services.fx_resolver import preload_fx
+from app.services.lots import new_book
+
+METHODS = ("average", "fifo")
+
+_HIT = CACHE_LOOKUPS.labels("tax_report", "hit")
+_MISS = CACHE_LOOKUPS.labels("tax_report", "miss")
+
+
+def tax_year_bounds(year: int, year_start: Optional[str] = None) -> Tuple[date, date]:
+    """First and last day of the tax year starting in `year` (year_start is MM-DD)."""
+    month, day = (int(x) for x in (year_start or settings.TAX_YEAR_START).split("-"))
+    start = date(year, month, day)
+    return start, date(year + 1, month, day) - timedelta(days=1)
+
+
+@dataclass
+class Totals:
+    proceeds: float = 0.0
+    gain_average: float = 0.0
+    gain_fifo: float = 0.0
+    dividends: float = 0.0
+    interest: float = 0.0
+    withholding_tax: float = 0.0
+    capital_gains_tax: float = 0.0
+    securities_transaction_tax: float = 0.0
+    stamp_duty: float = 0.0
+    fees: float = 0.0
+    sells: int = 0
+    unconverted: int = 0  # activities without an FX rate to base (counted as 0)
+
+    def add(self, other: "Totals") -> None:
+        for k, v in asdict(other).items():
+            setattr(self, k, getattr(self, k) + v)
+
+    def as_dict(self) -> Dict:
+        d = asdict(self)
+        d["taxes_and_fees"] = (
+            self.withholding_tax + self.capital_gains_tax + self.securities_transaction_tax
+            + self.stamp_duty + self.fees
+        )
+        return d
+
+
+def compute_tax_report(
+    session: Session,
+    user: User,
+    year: int,
+    *,
+    base_ccy_override: Optional[str] = None,
+    year_start: Optional[str] = None,
+) -> Dict:
+    start, end = tax_year_bounds(year, year_start)
+    base_ccy = norm_ccy(base_ccy_override or get_or_create_settings(session, user=user).base_currency_code or "USD")
+    report = {
+        "tax_year": year, "start": start, "end": end, "base_currency": base_ccy,
+        "methods": list(METHODS), "jurisdictions": [], "totals": Totals().as_dict(),
+    }
+
+    acc_ids = [a.id for a in account_repo.for_owner(session, user.id)]
+    if not acc_ids:
+        return report
+    _, inst_ids = activity_repo.ledger_span(session, acc_ids, until=end)
+    country = {
+        iid: (row.country or "").strip().upper()
+        for iid, row in instrument_repo.by_ids(session, inst_ids, columns=(Instrument.id, Instrument.country)).items()
+    }
+    fx = preload_fx(session, activity_repo.currencies(session, acc_ids, until=end), [base_ccy], end)
+
+    Key = Tuple[int, Optional[int], Optional[int]]
+    books: Dict[Key, Tuple] = {}  # key -> one book per METHODS entry
+    per: Dict[str, Totals] = defaultdict(Totals)
+
+    for a in activity_repo.iter_for_accounts(session, acc_ids, until=end, columns=activity_repo.TAX_COLUMNS):
+        rate = fx.rate(a.currency_code, base_ccy, a.date)
+        r = rate or 0.0
+        q = float(a.quantity or 0.0)
+        p = float(a.unit_price or 0.0)
+        fee = float(a.fee or 0.0)
+        key: Key = (a.account_id, a.instrument_id, a.broker_id)
+        in_year = a.date >= start
+        t = per[country.get(a.instrument_id, "")] if in_year else None
+
+        if a.type in ("Buy", "Sell") and a.instrument_id:
+            lots = books.get(key)
+            if lots is None:
+                lots = books[key] = tuple(new_book(m) for m in METHODS)
+            if a.type == "Buy":
+                cost = {base_ccy: (q * p + fee) * r}
+                for book in lots:
+                    book.buy(q, 0.0, cost)
+            else:
+                sold_avg, sold_fifo = (book.sell(q)[1].get(base_ccy, 0.0) for book in lots)
+                if t is not None:
+                    proceeds = (q * p - fee) * r
+                    t.proceeds += proceeds
+                    t.gain_average += proceeds - sold_avg
+                    t.gain_fifo += proceeds - sold_fifo
+                    t.capital_gains_tax += float(a.capital_gains_tax or 0.0) * r
+                    t.sells += 1
+        elif t is not None:
+            if a.type == "Dividend":
+                t.dividends += abs(p) * r
+            elif a.type == "Interest":
+                t.interest += abs(p) * r
+            elif a.type == "Fee":
+                t.fees += abs(p) * r
+
+        if t is None:
+            continue
+        t.fees += fee * r
+        t.withholding_tax += float(a.withholding_tax or 0.0) * r
+        t.securities_transaction_tax += float(a.securities_transaction_tax or 0.0) * r
+        t.stamp_duty += float(a.stamp_duty or 0.0) * r
+        if rate is None:
+            t.unconverted += 1
+
+    total = Totals()
+    for jurisdiction in sorted(per):
+        total.add(per[jurisdiction])
+        report["jurisdictions"].append({"jurisdiction": jurisdiction, **per[jurisdiction].as_dict()})
+    report["totals"] = total.as_dict()
+    return report
+
+
+# ---- cache -------------------------------------------------------------------
+
+class _ReportCache:
+    """LRU of reports; callers get their own copy, so changing one never reaches the cache."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._data: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Dict]:
+        with self._lock:
+            report = self._data.get(key)
+            if report is None:
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(report)
+
+    def put(self, key: tuple, report: Dict) -> None:
+        report = copy.deepcopy(report)
+        with self._lock:
+            self._data[key] = report
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+REPORT_CACHE = _ReportCache(settings.TAX_REPORT_CACHE_SIZE)
+
+
+def _fx_marker(session: Session) -> tuple:
+    return tuple(session.exec(select(func.count(), func.max(FxRate.id), func.max(FxRate.updated_at))).one())
+
+
+def _data_version(session: Session, user_id: int) -> Optional[int]:
+    return session.exec(select(AppSetting.data_version).where(AppSetting.owner_user_id == user_id)).first()
+
+
+def tax_report(
+    session: Session,
+    user: User,
+    year: int,
+    *,
+    base_ccy_override: Optional[str] = None,
+    year_start: Optional[str] = None,
+) -> Dict:
+    """`compute_tax_report`, cached until the user's activities or the FX table change."""
+    version = _data_version(session, user.id)
+    if version is None or REPORT_CACHE.size <= 0:
+        # no settings row yet: writes so far were not versioned
+        return compute_tax_report(session, user, year, base_ccy_override=base_ccy_override, year_start=year_start)
+
+    key = (
+        user.id, year, year_start or settings.TAX_YEAR_START, norm_ccy(base_ccy_override) or None,
+        version, _fx_marker(session),
+    )
+    report = REPORT_CACHE.get(key)
+    if report is not None:
+        _HIT.inc()
+        return report
+    _MISS.inc()
+    report = compute_tax_report(session, user, year, base_ccy_override=base_ccy_override, year_start=year_start)
+    REPORT_CACHE.put(key, report)
+    return report
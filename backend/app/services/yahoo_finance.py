@@ -6,6 +6,11 @@ from typing import Dict, List, Optional, Tuple
 
 import requests
 
+from app.core.config import settings
+
+YAHOO_QUERY = settings.YAHOO_QUERY_BASE_URL.rstrip("/")
+YAHOO_AUTOC = settings.YAHOO_AUTOC_BASE_URL.rstrip("/")
+
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
       "AppleWebKit/537.36 (KHTML, like Gecko) "
       "Chrome/124.0.0.0 Safari/537.36")
@@ -88,7 +93,7 @@ def search_symbols(query: str, include_indices: bool = False, limit: int = 10) -
     items: List[Dict] = []
 
     # 1) autoc
-    auto = _get("https://autoc.finance.yahoo.com/autoc", {"query": query, "region": 1, "lang": "en-US"}) or {}
+    auto = _get(f"{YAHOO_AUTOC}/autoc", {"query": query, "region": 1, "lang": "en-US"}) or {}
     results = (auto.get("ResultSet") or {}).get("Result") or []
     for r in results[: limit * 3]:
         sym = r.get("symbol")
@@ -131,7 +136,7 @@ def get_quotes(symbols: List[str]) -> Dict[str, Dict]:
 
     failed: List[str] = []
     for chunk in chunks(ysyms, 50):
-        data = _get("https://query2.finance.yahoo.com/v7/finance/quote", {"symbols": ",".join(chunk)})
+        data = _get(f"{YAHOO_QUERY}/v7/finance/quote", {"symbols": ",".join(chunk)})
         results = (data or {}).get("quoteResponse", {}).get("result") or []
         if not results:
             failed.extend(chunk)
@@ -148,7 +153,7 @@ def get_quotes(symbols: List[str]) -> Dict[str, Dict]:
 
     # Fallback: quoteSummary for those that failed
     for ys in failed:
-        qs = _get(f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{ys}", {"modules": "price"})
+        qs = _get(f"{YAHOO_QUERY}/v10/finance/quoteSummary/{ys}", {"modules": "price"})
         price = ((qs or {}).get("quoteSummary") or {}).get("result") or []
         if price:
             p = price[0].get("price") or {}
@@ -165,7 +170,7 @@ def get_historical(symbol: str, start: date, end: date) -> Dict[str, Dict]:
     Ghostfolio uses chart(interval=1d, period1/2). Return {YYYY-MM-DD: {marketPrice}}.
     """
     ys = convert_to_yahoo_symbol(symbol)
-    data = _get(f"https://query2.finance.yahoo.com/v8/finance/chart/{ys}", {
+    data = _get(f"{YAHOO_QUERY}/v8/finance/chart/{ys}", {
         "interval": "1d",
         "period1": start.strftime("%Y-%m-%d"),
         "period2": end.strftime("%Y-%m-%d"),
@@ -189,7 +194,7 @@ def get_dividends(symbol: str, start: date, end: date) -> Dict[str, Dict]:
     chart events=dividends. Return {YYYY-MM-DD: {marketPrice: dividend}}
     """
     ys = convert_to_yahoo_symbol(symbol)
-    data = _get(f"https://query2.finance.yahoo.com/v8/finance/chart/{ys}", {
+    data = _get(f"{YAHOO_QUERY}/v8/finance/chart/{ys}", {
         "events": "dividends",
         "interval": "1d",
         "period1": start.strftime("%Y-%m-%d"),
@@ -212,7 +217,7 @@ def get_asset_profile(symbol: str) -> Dict:
     Ghostfolio’s getAssetProfile → quoteSummary modules.
     """
     ys = convert_to_yahoo_symbol(symbol)
-    data = _get(f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{ys}",
+    data = _get(f"{YAHOO_QUERY}/v10/finance/quoteSummary/{ys}",
                 {"modules": "assetProfile,summaryProfile,price,quoteType"}) or {}
     results = (data.get("quoteSummary") or {}).get("result") or []
     if not results: return {}
@@ -10,8 +10,11 @@ import csv
 import io
 
 import requests
-from yahooquery import Ticker
 
+from app.core.config import settings
+
+from app.core.metrics import PROVIDER_ERRORS, PROVIDER_LATENCY
+from .provider_health import ProviderError, provider_health
 from .yf_enhancer import (
     convert_to_yahoo_symbol,
     convert_from_yahoo_symbol,
@@ -19,7 +22,6 @@ from .yf_enhancer import (
     format_name,
 )
 
-key = os.getenv("ALPHA_VANTAGE_KEY")
 USE_YFINANCE_FALLBACK = os.getenv("ENABLE_YFINANCE_FALLBACK", "0").lower() in ("1","true","yes")
 
 # make the import lazy to avoid loading when disabled
@@ -29,6 +31,11 @@ def _yf():
     import yfinance as _yfinance  # local import
     return _yfinance
 
+# yahooquery pulls in pandas (~0.5s); only /upsert_from_yahoo needs it
+def _yq_ticker(symbol: str):
+    from yahooquery import Ticker  # local import
+    return Ticker(symbol, asynchronous=False)
+
 # Default currency fallback (only used for upsert/metadata)
 DEFAULT_CURRENCY = "USD"
 
@@ -90,7 +97,7 @@ def fetch_profile_and_price(symbol: str, is_crypto: bool = False) -> Optional[Di
     backoff_s = 1.2
     for attempt in range(1, max_retries + 1):
         try:
-            t = Ticker(ys, asynchronous=False)
+            t = _yq_ticker(ys)
 
             price_map = _get_dict(getattr(t, "price", {}))
             quotes_map = _get_dict(getattr(t, "quotes", {}))
@@ -187,112 +194,158 @@ def _stooq_symbol(yahoo_symbol: str) -> str:
     base = s.replace(".", "-")  # BRK.B -> BRK-B
     return f"{base.lower()}.{_STOOQ_SUFFIX_MAP['US']}"
 
-def fetch_latest_price_stooq(symbol: str) -> Optional[Dict]:
-    """Fetch last daily close from Stooq CSV."""
-    sym = (symbol or "").strip().upper()
-    if not sym:
+def _timed(provider: str, fn, symbol: str) -> Optional[Dict]:
+    """
+    Run one provider fetch, recording its outcome/latency in provider_health.
+    `fn` returns a dict, None (no data: still a healthy answer) or raises.
+    """
+    started = time.monotonic()
+    try:
+        res = fn(symbol)
+    except Exception as e:
+        elapsed = time.monotonic() - started
+        provider_health.record(provider, False, elapsed, error=str(e))
+        PROVIDER_LATENCY.labels(provider).observe(elapsed)
+        PROVIDER_ERRORS.labels(provider).inc()
+        logger.debug("[%s] fetch failed for %s: %s", provider, symbol, e)
         return None
+    elapsed = time.monotonic() - started
+    provider_health.record(provider, True, elapsed)
+    PROVIDER_LATENCY.labels(provider).observe(elapsed)
+    return res
+
+def _check_http(provider: str, r) -> None:
+    """Rate limits and server errors are provider failures; 4xx per-symbol misses are not."""
+    if r.status_code == 429 or r.status_code >= 500:
+        raise ProviderError(f"{provider} HTTP {r.status_code}")
 
+def _stooq_fetch(sym: str) -> Optional[Dict]:
     stq = _stooq_symbol(sym)
-    url = f"https://stooq.com/q/d/l/?s={stq}&i=d"
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200 or not r.text.strip():
-            return None
+    url = f"{settings.STOOQ_BASE_URL.rstrip('/')}/q/d/l/?s={stq}&i=d"
+    r = requests.get(url, timeout=10)
+    _check_http("stooq", r)
+    text = r.text.strip() if r.status_code == 200 else ""
+    if not text:
+        return None
+    if "exceeded the daily hits limit" in text.lower():
+        raise ProviderError("stooq daily hits limit exceeded")
 
-        reader = csv.DictReader(io.StringIO(r.text))
-        rows = list(reader)
-        if not rows:
-            return None
+    reader = csv.DictReader(io.StringIO(text))
+    rows = list(reader)
+    if not rows:
+        return None
 
-        last = rows[-1]
-        price = _float_or_none(last.get("Close"))
-        if price is None:
-            return None
+    last = rows[-1]
+    price = _float_or_none(last.get("Close"))
+    if price is None:
+        return None
 
-        try:
-            ts = datetime.fromisoformat(last["Date"]).replace(tzinfo=timezone.utc)
-        except Exception:
-            ts = _now_utc()
+    try:
+        ts = datetime.fromisoformat(last["Date"]).replace(tzinfo=timezone.utc)
+    except Exception:
+        ts = _now_utc()
 
-        return {"symbol": sym, "latest_price": price, "latest_price_at": ts}
-    except Exception as e:
-        logger.debug("[stooq] fetch failed for %s: %s", sym, e)
+    return {"symbol": sym, "latest_price": price, "latest_price_at": ts}
+
+def fetch_latest_price_stooq(symbol: str) -> Optional[Dict]:
+    """Fetch last daily close from Stooq CSV."""
+    sym = (symbol or "").strip().upper()
+    if not sym:
         return None
+    return _timed("stooq", _stooq_fetch, sym)
 
 # ---------- Alpha Vantage (needs API key) ----------
-def fetch_latest_price_alpha_vantage(symbol: str) -> Optional[Dict]:
+def _alpha_vantage_fetch(sym: str) -> Optional[Dict]:
     key = os.getenv("ALPHA_VANTAGE_KEY")
-    if not key:
+    url = f"{settings.ALPHA_VANTAGE_BASE_URL.rstrip('/')}/query"
+    params = {"function": "GLOBAL_QUOTE", "symbol": sym, "apikey": key}
+    r = requests.get(url, params=params, timeout=12)
+    _check_http("alphavantage", r)
+    if r.status_code != 200:
+        return None
+    data = r.json()
+    # Throttled/over-quota answers come back as 200 with a Note/Information message
+    if "Note" in data or "Information" in data:
+        raise ProviderError(f"alphavantage throttled: {data.get('Note') or data.get('Information')}")
+    q = data.get("Global Quote") or {}
+    px = _float_or_none(q.get("05. price") or q.get("05.price"))
+    if px is None:
+        return None
+    return {"symbol": sym, "latest_price": px, "latest_price_at": _now_utc()}
+
+def fetch_latest_price_alpha_vantage(symbol: str) -> Optional[Dict]:
+    if not os.getenv("ALPHA_VANTAGE_KEY"):
         return None
 
     sym = (symbol or "").strip().upper()
     if not sym:
         return None
+    return _timed("alphavantage", _alpha_vantage_fetch, sym)
 
-    url = "https://www.alphavantage.co/query"
-    params = {"function": "GLOBAL_QUOTE", "symbol": sym, "apikey": key}
-    try:
-        r = requests.get(url, params=params, timeout=12)
-        if r.status_code != 200:
-            return None
-        data = r.json()
-        q = data.get("Global Quote") or {}
-        px = _float_or_none(q.get("05. price") or q.get("05.price"))
-        if px is None:
-            return None
-        return {"symbol": sym, "latest_price": px, "latest_price_at": _now_utc()}
-    except Exception as e:
-        logger.debug("[alphavantage] fetch failed for %s: %s", sym, e)
+# ---------- yfinance fallback ----------
+def _yfinance_fetch(sym: str) -> Optional[Dict]:
+    yf = _yf()
+    if yf is None:
+        return None
+    t = yf.Ticker(sym)
+    hist = t.history(period="5d", interval="1d")
+    if hist is None or hist.empty:
         return None
+    last = hist.iloc[-1]
+    price = float(last["Close"])
+    idx = last.name
+    if hasattr(idx, "to_pydatetime"):
+        idx = idx.to_pydatetime()
+    ts = idx if isinstance(idx, datetime) else _now_utc()
+    if ts and not ts.tzinfo:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return {"symbol": sym, "latest_price": price, "latest_price_at": ts}
 
-# ---------- yfinance fallback ----------
 def fetch_latest_price_yfinance(symbol: str) -> Optional[Dict]:
     if not USE_YFINANCE_FALLBACK:
         return None
     sym = (symbol or "").strip().upper()
     if not sym:
         return None
-    try:
-        yf = _yf()
-        if yf is None:
-            return None
-        t = yf.Ticker(sym)
-        hist = t.history(period="5d", interval="1d")
-        if hist is None or hist.empty:
-            return None
-        last = hist.iloc[-1]
-        price = float(last["Close"])
-        idx = last.name
-        if hasattr(idx, "to_pydatetime"):
-            idx = idx.to_pydatetime()
-        ts = idx if isinstance(idx, datetime) else _now_utc()
-        if ts and not ts.tzinfo:
-            ts = ts.replace(tzinfo=timezone.utc)
-        return {"symbol": sym, "latest_price": price, "latest_price_at": ts}
-    except Exception as e:
-        logger.debug("[yfinance] fetch failed for %s: %s", sym, e)
-        return None
+    return _timed("yfinance", _yfinance_fetch, sym)
 
 # ---------- Unified selector ----------
+# name -> (fetcher, "is configured?") in default auto-chain order
+_PRICE_PROVIDERS = {
+    "alphavantage": (fetch_latest_price_alpha_vantage, lambda: bool(os.getenv("ALPHA_VANTAGE_KEY"))),
+    "stooq":        (fetch_latest_price_stooq,         lambda: True),
+    "yfinance":     (fetch_latest_price_yfinance,      lambda: USE_YFINANCE_FALLBACK),
+}
+
+def _call_provider(name: str, symbol: str) -> Optional[Dict]:
+    fetch, configured = _PRICE_PROVIDERS[name]
+    if not configured() or not (symbol or "").strip():
+        return None
+    if not provider_health.allow(name):
+        logger.debug("[%s] circuit open, skipping %s", name, symbol)
+        return None
+    try:
+        return fetch(symbol)
+    finally:
+        # a fetcher that returned before _timed (e.g. yfinance not installed)
+        # recorded nothing; don't keep the half-open probe claimed forever
+        provider_health.release(name)
+
 def fetch_latest_price_by_provider(symbol: str, provider: str = "auto") -> Optional[Dict]:
     """
     provider ∈ {"auto", "alphavantage", "stooq"}.
-    auto: AlphaVantage (if key) → Stooq → yfinance.
+    auto: AlphaVantage (if key) → Stooq → yfinance, reordered by observed
+    provider health; providers with an open circuit breaker are skipped.
     """
     p = (provider or "auto").lower().strip()
-    if p == "alphavantage":
-        return fetch_latest_price_alpha_vantage(symbol)
-    if p == "stooq":
-        return fetch_latest_price_stooq(symbol)
-
-    res = fetch_latest_price_alpha_vantage(symbol)
-    if res:
-        return res
-    res = fetch_latest_price_stooq(symbol)
-    if res:
-        return res
-    return fetch_latest_price_yfinance(symbol)
+    if p in ("alphavantage", "stooq"):
+        return _call_provider(p, symbol)
+
+    for name in provider_health.order(_PRICE_PROVIDERS):
+        res = _call_provider(name, symbol)
+        if res:
+            return res
+    return None
 
 # ---------- Compatibility helper ----------
 def fetch_latest_price(symbol: str) -> Optional[Dict]:
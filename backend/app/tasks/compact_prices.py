@@ -0,0 +1,94 @@
+# app/tasks/compact_prices.py
+"""
+Move old public price_history rows into the on-disk price archive.
+
+    python -m app.tasks.compact_prices                      # keep PRICE_ARCHIVE_KEEP_DAYS in the DB
+    python -m app.tasks.compact_prices --before 2025-01-01  # archive everything older
+    python -m app.tasks.compact_prices --dry-run
+
+Only public rows (org_id IS NULL) are moved; tenant and manual rows stay in
+the DB. Per instrument, rows are merged into its .npy file first and deleted
+from the DB afterwards, so an interrupted run at worst leaves rows in both
+places (the DB copy wins when they are read back).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.price_history import PriceHistory
+from app.services import price_archive
+
+log = logging.getLogger("app.tasks.compact_prices")
+
+
+def compact(engine: Engine, before: date, *, dry_run: bool = False) -> Dict[str, int]:
+    """Archive public rows dated before `before`; returns counters."""
+    if not price_archive.enabled():
+        raise RuntimeError("PRICE_ARCHIVE_DIR is not set")
+    from app.services.price_cache import PRICE_STORE
+
+    table = PriceHistory.__table__
+    public_old = (table.c.org_id.is_(None)) & (table.c.price_date < before)
+    stats = {"instruments": 0, "rows": 0}
+
+    with engine.connect() as conn:
+        ids = conn.execute(
+            select(table.c.instrument_id).where(public_old).distinct().order_by(table.c.instrument_id)
+        ).scalars().all()
+
+    for iid in ids:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.price_date, table.c.close)
+                .where(public_old, table.c.instrument_id == iid)
+                .order_by(table.c.price_date, table.c.id)
+            ).all()
+            if not rows:
+                continue
+            stats["instruments"] += 1
+            stats["rows"] += len(rows)
+            if dry_run:
+                continue
+            days = price_archive.merge(iid, rows)
+            conn.execute(delete(table).where(public_old, table.c.instrument_id == iid))
+        PRICE_STORE.invalidate(iid)
+        log.info("archived %d rows of instrument %s (%d days on disk)", len(rows), iid, days)
+
+    log.info("compaction %s: %s", "dry run" if dry_run else "done", stats)
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Move old public price_history rows into the price archive")
+    parser.add_argument("--before", type=date.fromisoformat, default=None,
+                        help="Archive rows dated before this day (default: today - PRICE_ARCHIVE_KEEP_DAYS)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be moved")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+    if not price_archive.enabled():
+        log.error("PRICE_ARCHIVE_DIR is not set; nothing to do")
+        return 2
+
+    from app.core.db import engine
+
+    before = args.before or date.today() - timedelta(days=settings.PRICE_ARCHIVE_KEEP_DAYS)
+    compact(engine, before, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# app/tasks/jobs.py
+"""
+In-process background job runner for work triggered over HTTP.
+
+Endpoints call `enqueue_price_refresh(...)`, which inserts a `background_job`
+row and hands the work to a small thread pool. The runner updates the row's
+counters as it goes, so any web worker can report progress from the DB.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session
+
+from app.models.background_job import BackgroundJob
+from app.tasks.lease import JobLease, check_lease
+
+log = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Progress rows are written at most this often (seconds)
+PROGRESS_MIN_INTERVAL_SEC = float(os.getenv("JOB_PROGRESS_INTERVAL_SEC", "1.0"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    thread_name_prefix="bg-job",
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _default_engine() -> Engine:
+    from app.core.db import engine
+    return engine
+
+
+def _set(engine: Engine, job_id: str, **values: Any) -> None:
+    table = BackgroundJob.__table__
+    with engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == job_id).values(**values))
+
+
+def create_job(session: Session, kind: str, params: Optional[Dict[str, Any]] = None) -> BackgroundJob:
+    job = BackgroundJob(id=uuid.uuid4().hex, kind=kind, status="queued", params=params or {})
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def get_job(session: Session, job_id: str) -> Optional[BackgroundJob]:
+    return session.get(BackgroundJob, job_id)
+
+
+def job_to_dict(job: BackgroundJob) -> Dict[str, Any]:
+    def _iso(dt: Optional[datetime]) -> Optional[str]:
+        if dt is None:
+            return None
+        return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).isoformat()
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params or {},
+        "progress": {
+            "total": job.total,
+            "processed": job.processed,
+            "updated": job.updated,
+            "skipped": job.skipped,
+            "errors": job.errors,
+        },
+        "result": job.result,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+    }
+
+
+def accepted_payload(job: BackgroundJob) -> Dict[str, Any]:
+    """Body returned by endpoints that enqueue a job (HTTP 202)."""
+    return {
+        "ok": True,
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+    }
+
+
+# ---- price refresh -----------------------------------------------------------
+
+def run_price_refresh(job_id: str, *, engine: Optional[Engine] = None) -> None:
+    """Execute a queued price-refresh job (runs on the executor thread)."""
+    from app.core.settings_svc import get_or_create_settings
+    from app.services.job_runs import record_price_run
+    from app.services.price_refresher import refresh_all_prices
+    from app.tasks.scheduler import LAST_RUN
+
+    engine = engine or _default_engine()
+    SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False, autocommit=False)
+
+    with SessionLocal() as s:
+        job = s.get(BackgroundJob, job_id)
+        if job is None:
+            log.warning("[jobs] job %s vanished before it started", job_id)
+            return
+        params = dict(job.params or {})
+
+    # Share the scheduler's lease so a manual refresh never overlaps a cron run
+    with JobLease("prices", engine=engine, note=f"job:{job_id}") as lease:
+        if not lease.acquired:
+            _set(engine, job_id, status="failed", finished_at=_now(),
+                 error="Another price refresh is already running")
+            return
+
+        started_at = _now()
+        _set(engine, job_id, status="running", started_at=started_at)
+        last_write = [0.0]
+
+        def _progress(counts: Dict[str, int]) -> None:
+            t = time.monotonic()
+            if t - last_write[0] < PROGRESS_MIN_INTERVAL_SEC and counts["processed"] < counts["total"]:
+                return
+            last_write[0] = t
+            try:
+                _set(engine, job_id, **counts)
+            except Exception as e:  # noqa: BLE001 - best effort (e.g. SQLite writer busy)
+                log.debug("[jobs] progress write skipped for %s: %s", job_id, e)
+
+        try:
+            with SessionLocal() as s:
+                result = refresh_all_prices(
+                    s,
+                    limit=int(params.get("limit") or 0),
+                    time_budget_sec=int(params.get("time_budget_sec") or 90),
+                    provider=str(params.get("provider") or "auto"),
+                    logger=log,
+                    progress=_progress,
+                    only_due=bool(params.get("only_due")),
+                    checkpoint=check_lease,
+                )
+
+                settings_row = get_or_create_settings(s)
+                settings_row.last_prices_refresh = _now()
+                s.add(settings_row)
+                s.commit()
+
+                record_price_run(s, result, started_at=started_at, trigger="manual")
+
+            LAST_RUN["prices"] = _now().isoformat()
+            _set(
+                engine, job_id,
+                status="succeeded",
+                finished_at=_now(),
+                result=result,
+                total=result.get("total_considered", 0),
+                processed=result.get("processed", 0) + len(result.get("errors") or []),
+                updated=result.get("updated", 0),
+                skipped=result.get("skipped", 0),
+                errors=len(result.get("errors") or []),
+            )
+        except Exception as e:  # noqa: BLE001
+            log.exception("[jobs] price refresh %s failed", job_id)
+            _set(engine, job_id, status="failed", finished_at=_now(), error=str(e)[:500])
+            with SessionLocal() as s:
+                record_price_run(
+                    s, None, started_at=started_at, trigger="manual",
+                    provider=params.get("provider"), error=str(e) or e.__class__.__name__,
+                )
+
+
+def enqueue_price_refresh(
+    session: Session,
+    *,
+    limit: int = 0,
+    time_budget_sec: int = 90,
+    provider: str = "auto",
+    only_due: bool = False,
+) -> BackgroundJob:
+    """Record a queued price-refresh job and start it on the background pool."""
+    job = create_job(
+        session,
+        "prices",
+        {"limit": limit, "time_budget_sec": time_budget_sec, "provider": provider, "only_due": only_due},
+    )
+    _executor.submit(run_price_refresh, job.id)
+    return job
@@ -0,0 +1,231 @@
+# app/tasks/lease.py
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.models.job_lock import JobLock
+
+log = logging.getLogger(__name__)
+
+# Identity of this process; combined with a per-lease nonce so two leases in the
+# same process (e.g. a manual run racing a cron run) never share an owner string.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+DEFAULT_TTL_SEC = int(os.getenv("JOB_LEASE_TTL_SEC", "120"))
+
+# The lease held by the job running in this thread (see check_lease).
+_current: ContextVar[Optional["JobLease"]] = ContextVar("job_lease", default=None)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LeaseLost(RuntimeError):
+    """The job's lease expired and was taken over by another runner."""
+
+
+class JobLease:
+    """
+    DB-backed lease for a named job. Works the same on SQLite and Postgres:
+
+      - acquire(): atomically claims the `job_lock` row if it is free or expired
+      - a daemon thread renews `expires_at` every ttl/3 while the job runs
+      - release(): deletes the row (only if we still own it)
+
+    If the holder crashes, heartbeats stop and the lease expires after `ttl_sec`,
+    so the next runner takes it over. A holder that merely stalled past the
+    TTL finds out on its next heartbeat (`lost`); long jobs call
+    `check_lease()` between units of work so they stop instead of racing the
+    new holder.
+
+    Usage:
+        with JobLease("prices") as lease:
+            if not lease.acquired:
+                return
+            ...
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_sec: Optional[int] = None,
+        engine: Optional[Engine] = None,
+        note: Optional[str] = None,
+    ):
+        if engine is None:
+            from app.core.db import engine as default_engine
+            engine = default_engine
+
+        self.name = name
+        self.ttl_sec = int(ttl_sec or DEFAULT_TTL_SEC)
+        self.engine = engine
+        self.note = note
+        self.owner = f"{WORKER_ID}:{uuid.uuid4().hex[:8]}"
+        self.acquired = False
+        self.lost = False
+
+        self._stop = threading.Event()
+        self._hb_thread: Optional[threading.Thread] = None
+
+    # ---- lifecycle ----
+
+    def acquire(self) -> bool:
+        now = _utcnow()
+        expires = now + timedelta(seconds=self.ttl_sec)
+        table = JobLock.__table__
+
+        with self.engine.begin() as conn:
+            # 1) take over a free/expired row (or re-enter our own)
+            res = conn.execute(
+                update(table)
+                .where(table.c.name == self.name)
+                .where((table.c.owner == self.owner) | (table.c.expires_at < now))
+                .values(
+                    owner=self.owner,
+                    acquired_at=now,
+                    heartbeat_at=now,
+                    expires_at=expires,
+                    note=self.note,
+                )
+            )
+            if res.rowcount == 1:
+                self.acquired = True
+
+        if not self.acquired:
+            # 2) first ever run for this name → insert the row
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        insert(table).values(
+                            name=self.name,
+                            owner=self.owner,
+                            acquired_at=now,
+                            heartbeat_at=now,
+                            expires_at=expires,
+                            note=self.note,
+                        )
+                    )
+                self.acquired = True
+            except IntegrityError:
+                # someone else holds a live lease
+                self.acquired = False
+
+        if self.acquired:
+            self._start_heartbeat()
+            log.debug("[lease] %s acquired by %s (ttl=%ss)", self.name, self.owner, self.ttl_sec)
+        else:
+            log.info("[lease] %s is held by another runner; skipping", self.name)
+        return self.acquired
+
+    def heartbeat(self) -> bool:
+        """Extend the lease. Returns False if we no longer own it."""
+        now = _utcnow()
+        table = JobLock.__table__
+        with self.engine.begin() as conn:
+            res = conn.execute(
+                update(table)
+                .where(table.c.name == self.name)
+                .where(table.c.owner == self.owner)
+                .values(heartbeat_at=now, expires_at=now + timedelta(seconds=self.ttl_sec))
+            )
+        if res.rowcount != 1:
+            self.lost = True
+            log.warning("[lease] %s lost by %s (taken over after expiry?)", self.name, self.owner)
+            return False
+        return True
+
+    def ensure_held(self) -> None:
+        """Raise LeaseLost if a heartbeat found the lease taken over."""
+        if self.lost:
+            raise LeaseLost(f"lease {self.name!r} was taken over by another runner")
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._hb_thread is not None:
+            self._hb_thread.join(timeout=5)
+            self._hb_thread = None
+
+        if not self.acquired:
+            return
+        table = JobLock.__table__
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    delete(table)
+                    .where(table.c.name == self.name)
+                    .where(table.c.owner == self.owner)
+                )
+        except Exception:
+            log.exception("[lease] failed to release %s", self.name)
+        finally:
+            self.acquired = False
+
+    # ---- heartbeat thread ----
+
+    def _start_heartbeat(self) -> None:
+        interval = max(1.0, self.ttl_sec / 3.0)
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    if not self.heartbeat():
+                        return
+                except Exception:
+                    log.exception("[lease] heartbeat failed for %s", self.name)
+
+        self._stop.clear()
+        self._hb_thread = threading.Thread(
+            target=_run, name=f"lease-heartbeat-{self.name}", daemon=True
+        )
+        self._hb_thread.start()
+
+    # ---- context manager ----
+
+    def __enter__(self) -> "JobLease":
+        self.acquire()
+        self._token = _current.set(self if self.acquired else None)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        self.release()
+
+
+def check_lease() -> None:
+    """
+    Raise LeaseLost if the lease of the job running in this thread was lost.
+    A no-op outside a lease (manual runs, tests).
+    """
+    lease = _current.get()
+    if lease is not None:
+        lease.ensure_held()
+
+
+def singleton_job(name: str, *, ttl_sec: Optional[int] = None) -> Callable:
+    """
+    Decorator for scheduler jobs: run the wrapped function only if this process
+    wins the `name` lease; otherwise return None without doing any work.
+    """
+    def deco(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with JobLease(name, ttl_sec=ttl_sec, note=fn.__name__) as lease:
+                if not lease.acquired:
+                    return None
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
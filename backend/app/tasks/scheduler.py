@@ -18,13 +18,17 @@ from app.services.price_refresher import refresh_all_prices
 from app.services.fx_client import fetch_frank_latest, cross_to_base, fetch_oxr_latest
 from app.models.fx import FxRate
 from app.core.config import settings
+from app.tasks.lease import check_lease, singleton_job
+from app.services.job_runs import record_price_run, record_run
 
 log = logging.getLogger(__name__)
 
-# Last-run timestamps (UTC ISO strings) that the jobs update
+# Last-run timestamps (UTC ISO strings) that the jobs update.
+# Per-process only; the durable history lives in the job_run table.
 LAST_RUN = {
     "prices": None,
     "fx": None,
+    "snapshots": None,
 }
 
 SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False, autocommit=False)
@@ -35,7 +39,10 @@ def _iso_now() -> str:
 
 
 # ---- Jobs --------------------------------------------------------------------
+# Each job is guarded by a DB lease so that, with several web workers and/or a
+# dedicated worker process, exactly one runner executes it at a time.
 
+@singleton_job("prices")
 def job_refresh_prices():
     """
     Refresh instrument prices using the selected provider.
@@ -49,6 +56,8 @@ def job_refresh_prices():
 
     time_budget = int(os.getenv("REFRESH_TIME_BUDGET_SEC", "25"))
     limit = int(os.getenv("REFRESH_LIMIT", "0"))  # 0 = all
+    # Only fetch instruments whose exchange closed since their last price
+    only_due = os.getenv("REFRESH_MARKET_AWARE", "1").lower() in ("1", "true", "yes")
 
     log.info(
         "[prices] refresh start: limit=%s, budget=%ss, provider=%s",
@@ -57,6 +66,9 @@ def job_refresh_prices():
         provider,
     )
 
+    started_at = datetime.now(dt_tz.utc)
+    res = None
+    error = None
     try:
         with SessionLocal() as s:
             res = refresh_all_prices(
@@ -65,18 +77,28 @@ def job_refresh_prices():
                 time_budget_sec=time_budget,
                 provider=provider,
                 logger=log,
+                only_due=only_due,
+                checkpoint=check_lease,
             )
         # mark last-run only after attempt completes
         LAST_RUN["prices"] = datetime.now(dt_tz.utc).isoformat()
         log.info("[prices] provider=%s result=%s", provider, res)
-    except Exception:
+    except Exception as e:
         log.exception("[prices] refresh failed")
+        error = str(e) or e.__class__.__name__
         # still stamp last-run so the UI shows “attempted”
         LAST_RUN["prices"] = _iso_now()
 
+    with SessionLocal() as s:
+        record_price_run(s, res, started_at=started_at, provider=provider, error=error)
 
+
+@singleton_job("fx")
 def job_refresh_fx_rates():
     """Fetch latest FX rates. Priority: OXR (if key) -> Frankfurter (fallback)."""
+    # Collected for the job_run history row written in `finally`
+    run = {"provider": None, "total": 0, "updated": 0, "skipped": 0, "error": None}
+    started_at = datetime.now(dt_tz.utc)
     try:
         with SessionLocal() as s:
             # 1. Try OXR if configured
@@ -89,6 +111,7 @@ def job_refresh_fx_rates():
                     
                     # Log source
                     log.info("[fx] fetched from OXR (base USD)")
+                    run["provider"] = "oxr"
 
                     # We have USD rates directly.
                     # Convert to desired base if needed, but our helper cross_to_base expects EUR rates?
@@ -116,6 +139,7 @@ def job_refresh_fx_rates():
                 data = fetch_frank_latest()
                 if not data or "rates" not in data:
                     log.warning("Frankfurter latest: empty or error")
+                    run["error"] = "Frankfurter latest: empty or error"
                     return
                 
                 # Frankfurter gives EUR-based rates: {USD: 1.1, GBP: 0.85} per 1 EUR
@@ -127,6 +151,7 @@ def job_refresh_fx_rates():
                 rate_eur_usd = eur_rates.get("USD")
                 if not rate_eur_usd:
                     log.error("Frankfurter missing USD rate, cannot normalize")
+                    run["error"] = "Frankfurter missing USD rate"
                     return
                 
                 rates_map_usd_base = {}
@@ -134,6 +159,7 @@ def job_refresh_fx_rates():
                     rates_map_usd_base[k] = v / rate_eur_usd
                 
                 log.info("[fx] fetched from Frankfurter (base EUR -> norm to USD)")
+                run["provider"] = "frankfurter"
 
             # 3. Upsert needed pairs
             # We now have rates_map_usd_base: {CODE: rate_per_USD}
@@ -155,6 +181,7 @@ def job_refresh_fx_rates():
             as_of = datetime.now(dt_tz.utc).date()
 
             inserts = 0
+            run["total"] = len(needed - {base_currency})
             for q in needed:
                 if q not in rates_map_usd_base:
                     continue
@@ -192,6 +219,7 @@ def job_refresh_fx_rates():
                     # We'll stick to skip if exists to avoid churn, or update? 
                     # If it's "latest", we might want to update.
                     # Original: "if exists: continue"
+                    run["skipped"] += 1
                     continue
 
                 rate_obj = FxRate(base=base_currency, quote=q, as_of_date=as_of, rate=round(float(rate_val), 8))
@@ -199,20 +227,65 @@ def job_refresh_fx_rates():
                     s.add(rate_obj)
                     inserts += 1
 
+            check_lease()  # the new holder writes today's rates instead
             try:
                 if inserts:
                     s.commit()
-            except Exception:
+            except Exception as e:
                 s.rollback()
                 log.exception("FX commit failed")
+                run["error"] = f"FX commit failed: {e}"
             else:
+                run["updated"] = inserts
                 if inserts:
                     log.info("FX upserted %s rows for %s", inserts, as_of)
-    except Exception:
+    except Exception as e:
         log.exception("[fx] refresh failed")
+        run["error"] = str(e) or e.__class__.__name__
     finally:
         LAST_RUN["fx"] = datetime.now(dt_tz.utc).isoformat()
+        with SessionLocal() as s:
+            record_run(
+                s,
+                job="fx",
+                started_at=started_at,
+                provider=run["provider"],
+                total=run["total"],
+                updated=run["updated"],
+                skipped=run["skipped"],
+                status="failed" if run["error"] else "succeeded",
+                error=run["error"],
+            )
+
+
+
+@singleton_job("snapshots")
+def job_snapshot_positions():
+    """Extend every user's month-end position snapshots (app.services.position_snapshots)."""
+    from app.services.position_snapshots import write_all_snapshots
 
+    started_at = datetime.now(dt_tz.utc)
+    stats = {"users": 0, "snapshots": 0}
+    error = None
+    try:
+        with SessionLocal() as s:
+            stats = write_all_snapshots(s)
+        log.info("[snapshots] done: %s", stats)
+    except Exception as e:
+        log.exception("[snapshots] failed")
+        error = str(e) or e.__class__.__name__
+    finally:
+        LAST_RUN["snapshots"] = _iso_now()
+        with SessionLocal() as s:
+            record_run(
+                s,
+                job="snapshots",
+                started_at=started_at,
+                total=stats["users"],
+                updated=stats["snapshots"],
+                status="failed" if error else "succeeded",
+                error=error,
+            )
 
 
 # ---- Scheduler bootstrap -----------------------------------------------------
@@ -298,6 +371,8 @@ def build_scheduler() -> BackgroundScheduler:
     # ----- end quick-test overrides -----
 
     # --- Price refresh 4×/day (London & NY windows; Mon–Fri) ---
+    # Each run only fetches instruments whose own exchange has closed since
+    # their last price (REFRESH_MARKET_AWARE=0 refreshes everything).
     pr1 = os.getenv("YF_REFRESH_CRON_1") or "0 10 * * 1-5"   # 10:00 Europe/London
     pr2 = os.getenv("YF_REFRESH_CRON_2") or "30 10 * * 1-5"  # 10:30 America/New_York
     pr3 = os.getenv("YF_REFRESH_CRON_3") or "30 17 * * 1-5"  # 17:30 Europe/London
@@ -315,5 +390,9 @@ def build_scheduler() -> BackgroundScheduler:
     _add_cron(sched, job_refresh_fx_rates, fx1, "fx_uk_open_plus1h", "Europe/London")
     _add_cron(sched, job_refresh_fx_rates, fx2, "fx_us_close_plus1h", "America/New_York")
 
+    # --- Position snapshots, monthly (after the month's last prices/FX) ---
+    snap = os.getenv("POSITION_SNAPSHOT_CRON") or "30 2 1 * *"  # 02:30 UTC on the 1st
+    _add_cron(sched, job_snapshot_positions, snap, "position_snapshots_monthly", "UTC")
+
     log.info("[sched] STANDARD MODE jobs: %s", [str(j) for j in sched.get_jobs()])
     return sched
\ No newline at end of file
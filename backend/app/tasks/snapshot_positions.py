@@ -0,0 +1,54 @@
+# app/tasks/snapshot_positions.py
+"""
+Write month-end position snapshots (see app/services/position_snapshots.py).
+
+    python -m app.tasks.snapshot_positions                     # up to the last complete month
+    python -m app.tasks.snapshot_positions --until 2025-06-30
+
+Each user's snapshots are extended from their latest valid one, so a run
+after the first only replays the activities of the months since. The
+scheduler runs it monthly (job_snapshot_positions).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.services.position_snapshots import write_all_snapshots
+
+log = logging.getLogger("app.tasks.snapshot_positions")
+
+
+def snapshot(engine: Engine, until: Optional[date] = None) -> Dict[str, int]:
+    with Session(engine) as session:
+        stats = write_all_snapshots(session, until=until)
+    log.info("position snapshots: %s", stats)
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write month-end position snapshots")
+    parser.add_argument("--until", type=date.fromisoformat, default=None,
+                        help="Last day a snapshot may be dated (default: end of the last complete month)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+    from app.core.db import engine
+
+    snapshot(engine, args.until)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
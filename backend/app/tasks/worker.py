@@ -1,15 +1,85 @@
-import asyncio
-from app.tasks.scheduler import build_scheduler
+# app/tasks/worker.py
+"""
+Standalone scheduler worker.
+
+Run price/FX/snapshot jobs outside the web processes:
+
+    python -m app.tasks.worker                 # run the cron schedule forever
+    python -m app.tasks.worker --once prices   # run one job now and exit
+
+Jobs take a DB lease (see app.tasks.lease), so it is safe to run several
+workers (or leave SCHEDULER_ENABLED on in the web tier): only one runner
+executes each job, and a crashed runner's lease is taken over after it expires.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+from app.core.db import init_db
+from app.tasks.lease import WORKER_ID
+from app.tasks.scheduler import build_scheduler, job_refresh_fx_rates, job_refresh_prices, job_snapshot_positions
+
+log = logging.getLogger("app.tasks.worker")
+
+JOBS = {
+    "prices": job_refresh_prices,
+    "fx": job_refresh_fx_rates,
+    "snapshots": job_snapshot_positions,
+}
+
+
+def _setup_logging() -> None:
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+
+
+def run_forever() -> None:
+    stop = threading.Event()
+
+    def _handle(signum, _frame):
+        log.info("Received signal %s, shutting down worker %s", signum, WORKER_ID)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _handle)
+    signal.signal(signal.SIGINT, _handle)
 
-async def main():
     sched = build_scheduler()
     sched.start()
-    print("Scheduler started…")
+    log.info("Scheduler worker %s started with jobs: %s", WORKER_ID, [str(j) for j in sched.get_jobs()])
     try:
-        while True:
-            await asyncio.sleep(3600)
-    except (KeyboardInterrupt, SystemExit):
-        sched.shutdown()
+        while not stop.wait(3600):
+            pass
+    finally:
+        # wait=True lets a running job finish and release its lease cleanly
+        sched.shutdown(wait=True)
+        log.info("Scheduler worker %s stopped", WORKER_ID)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Portivue background scheduler worker")
+    parser.add_argument("--once", choices=sorted(JOBS), help="Run a single job immediately and exit")
+    parser.add_argument("--skip-init-db", action="store_true", help="Do not run init_db() on start")
+    args = parser.parse_args(argv)
+
+    _setup_logging()
+    if not args.skip_init_db:
+        init_db()
+
+    if args.once:
+        JOBS[args.once]()
+        return 0
+
+    run_forever()
+    return 0
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(main())
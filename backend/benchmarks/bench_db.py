@@ -0,0 +1,169 @@
+"""
+Read / write throughput of the tuned engine vs a plain create_engine.
+
+Seeds a price_history-shaped table in a fresh SQLite file (or the --db URL),
+then for each profile measures:
+
+  writes_per_sec      single-row INSERTs, one transaction each (the refresh
+                      jobs' pattern), from --threads writers
+  point_reads_per_sec PK lookups, from --threads readers
+  range_reads_per_sec "last N closes of one instrument" queries
+  mixed_reads_per_sec reads while one writer thread keeps committing
+
+"baseline" is `create_engine(url)` with SQLite's defaults (rollback journal,
+synchronous=FULL); "tuned" is app.core.db.make_engine(url).
+
+  cd backend
+  python -m benchmarks.bench_db
+  python -m benchmarks.bench_db --writes 2000 --reads 20000 --threads 4 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+INSTRUMENTS = 200
+DAYS = 250
+
+
+def _schema(engine) -> None:
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_px"))
+        conn.execute(text(
+            "CREATE TABLE bench_px (id INTEGER PRIMARY KEY, instrument_id INTEGER NOT NULL, "
+            "price_date DATE NOT NULL, close FLOAT NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX ix_bench_px_inst_date ON bench_px (instrument_id, price_date)"))
+        start = date(2024, 1, 1)
+        rows = [
+            {"i": i, "d": start + timedelta(days=d), "c": 100.0 + i + d * 0.1}
+            for i in range(INSTRUMENTS) for d in range(DAYS)
+        ]
+        conn.execute(text("INSERT INTO bench_px (instrument_id, price_date, close) VALUES (:i, :d, :c)"), rows)
+
+
+def _parallel(threads: int, total: int, fn: Callable[[object, random.Random], None], engine) -> float:
+    per = max(1, total // threads)
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        with engine.connect() as conn:
+            for _ in range(per):
+                fn(conn, rng)
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return per * threads / (time.perf_counter() - t0)
+
+
+def measure(engine, *, writes: int, reads: int, threads: int) -> Dict[str, float]:
+    from sqlalchemy import text
+
+    insert = text("INSERT INTO bench_px (instrument_id, price_date, close) VALUES (:i, :d, :c)")
+    point = text("SELECT close FROM bench_px WHERE id = :id")
+    rng_q = text("SELECT price_date, close FROM bench_px WHERE instrument_id = :i ORDER BY price_date DESC LIMIT 30")
+    max_id = INSTRUMENTS * DAYS
+
+    def write(conn, rng):
+        conn.execute(insert, {"i": rng.randrange(INSTRUMENTS), "d": date(2025, 1, 1), "c": rng.random()})
+        conn.commit()
+
+    def point_read(conn, rng):
+        conn.execute(point, {"id": rng.randrange(1, max_id)}).scalar()
+
+    def range_read(conn, rng):
+        conn.execute(rng_q, {"i": rng.randrange(INSTRUMENTS)}).all()
+
+    out = {
+        "writes_per_sec": _parallel(threads, writes, write, engine),
+        "point_reads_per_sec": _parallel(threads, reads, point_read, engine),
+        "range_reads_per_sec": _parallel(threads, reads // 4, range_read, engine),
+    }
+
+    stop = threading.Event()
+
+    def background_writer():
+        r = random.Random(99)
+        with engine.connect() as conn:
+            while not stop.is_set():
+                write(conn, r)
+
+    bw = threading.Thread(target=background_writer)
+    bw.start()
+    try:
+        out["mixed_reads_per_sec"] = _parallel(threads, reads // 4, range_read, engine)
+    finally:
+        stop.set()
+        bw.join()
+    return {k: round(v, 1) for k, v in out.items()}
+
+
+def run(args) -> Dict[str, Dict[str, float]]:
+    from sqlalchemy import create_engine
+
+    from app.core.db import make_engine
+
+    results = {}
+    for profile in ("baseline", "tuned"):
+        tmp = None
+        url = args.db
+        if not url:
+            tmp = tempfile.TemporaryDirectory(prefix=f"bench-db-{profile}-")
+            url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        try:
+            engine = create_engine(url) if profile == "baseline" else make_engine(url)
+            _schema(engine)
+            results[profile] = measure(engine, writes=args.writes, reads=args.reads, threads=args.threads)
+            engine.dispose()
+            print(f"[{profile}] {results[profile]}", file=sys.stderr)
+        finally:
+            if tmp:
+                tmp.cleanup()
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Engine tuning read/write throughput")
+    ap.add_argument("--db", default=None, help="SQLAlchemy URL (default: a fresh temp SQLite file per profile)")
+    ap.add_argument("--writes", type=int, default=1000)
+    ap.add_argument("--reads", type=int, default=10000)
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    # The app's settings need these; its own engine is never used here
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-32-characters-long!!")
+
+    res = run(args)
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    keys = list(res["baseline"])
+    print(f"{'metric':<22} {'baseline':>12} {'tuned':>12} {'speedup':>8}")
+    for k in keys:
+        b, t = res["baseline"][k], res["tuned"][k]
+        print(f"{k:<22} {b:>12} {t:>12} {t / b if b else float('nan'):>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Lot matching throughput: the lot books of app.services.lots against a naive
+list-of-lots FIFO (list.pop(0) / per-lot objects).
+
+Generates a synthetic fill stream (no database): --fills fills spread over
+--keys lot keys, shaped like a heavy trader who accumulates many small buys
+and sells in larger clips, so a sell consumes several open lots while the
+open-lot queue keeps growing. Every method replays the same stream, with
+cost tracked in one base currency; times are the best of --repeat runs.
+
+The naive FIFO pops matched lots off the front of a Python list, which is
+O(open lots) per pop, so its time per fill grows with the queue length.
+
+  cd backend
+  python -m benchmarks.bench_lots
+  python -m benchmarks.bench_lots --fills 1m --keys 50 --naive-max 200k --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+Fill = Tuple[int, bool, float, float]  # key, is_buy, qty, cost
+
+
+def _size(label: str) -> int:
+    label = label.strip().lower()
+    if label.endswith("m"):
+        return int(float(label[:-1]) * 1_000_000)
+    if label.endswith("k"):
+        return int(float(label[:-1]) * 1_000)
+    return int(label)
+
+
+def fills(n: int, keys: int, seed: int = 11) -> List[Fill]:
+    rnd = random.Random(seed)
+    held = [0.0] * keys
+    out: List[Fill] = []
+    for _ in range(n):
+        k = rnd.randrange(keys)
+        if held[k] > 200 and rnd.random() < 0.3:
+            q = rnd.uniform(5, 15)
+            held[k] -= q
+            out.append((k, False, q, 0.0))
+        else:
+            q = rnd.uniform(1, 10)
+            held[k] += q
+            out.append((k, True, q, q * rnd.uniform(50, 150)))
+    return out
+
+
+def run_book(method: str, stream: List[Fill]) -> float:
+    from app.services.lots import new_book
+
+    books: Dict[int, object] = {}
+    realized = 0.0
+    for k, is_buy, q, c in stream:
+        book = books.get(k)
+        if book is None:
+            book = books[k] = new_book(method)
+        if is_buy:
+            book.buy(q, c, {"EUR": c})
+        else:
+            realized += book.sell(q)[0]
+    return realized
+
+
+class _Lot:
+    def __init__(self, qty: float, cost: float, cost_base: Dict[str, float]):
+        self.qty, self.cost, self.cost_base = qty, cost, cost_base
+
+
+def run_naive(stream: List[Fill]) -> float:
+    books: Dict[int, List[_Lot]] = {}
+    realized = 0.0
+    for k, is_buy, q, c in stream:
+        lots = books.setdefault(k, [])
+        if is_buy:
+            lots.append(_Lot(q, c, {"EUR": c}))
+            continue
+        while q > 1e-10 and lots:
+            lot = lots[0]
+            take = min(q, lot.qty)
+            part = lot.cost * take / lot.qty
+            realized += part
+            lot.cost -= part
+            for b, cb in lot.cost_base.items():
+                lot.cost_base[b] = cb - cb * take / lot.qty
+            lot.qty -= take
+            q -= take
+            if lot.qty <= 1e-10:
+                lots.pop(0)
+    return realized
+
+
+def _best(fn, repeat: int) -> Tuple[float, float]:
+    best, out = float("inf"), 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Lot matching throughput by cost basis method")
+    ap.add_argument("--fills", default="1m", help="number of fills (e.g. 200k, 1m)")
+    ap.add_argument("--keys", type=int, default=5, help="distinct lot keys")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--naive-max", default="1m", help="skip the naive FIFO above this many fills")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    n = _size(args.fills)
+    stream = fills(n, args.keys)
+    sells = sum(1 for f in stream if not f[1])
+    res: Dict[str, Dict] = {}
+    for method in ("average", "fifo", "lifo"):
+        sec, realized = _best(lambda: run_book(method, stream), args.repeat)
+        res[method] = {"sec": round(sec, 3), "us_per_fill": round(sec / n * 1e6, 2), "matched_cost": round(realized, 2)}
+    if n <= _size(args.naive_max):
+        sec, realized = _best(lambda: run_naive(stream), args.repeat)
+        res["naive_fifo"] = {"sec": round(sec, 3), "us_per_fill": round(sec / n * 1e6, 2), "matched_cost": round(realized, 2)}
+        assert abs(realized - res["fifo"]["matched_cost"]) <= 1e-6 * max(1.0, abs(realized))
+
+    if args.json:
+        print(json.dumps({"fills": n, "sells": sells, "keys": args.keys, "results": res}, indent=2))
+        return
+    print(f"{n} fills ({sells} sells) over {args.keys} keys")
+    print(f"{'method':<11} {'sec':>8} {'us/fill':>8}")
+    for method, m in res.items():
+        print(f"{method:<11} {m['sec']:>8} {m['us_per_fill']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Peak memory of the ledger reducers vs ledger size, streamed vs loaded whole.
+
+For each --sizes entry a synthetic ledger (one user, benchmarks.datagen) is
+seeded into a temp SQLite file (or --db), then each target runs in a fresh
+child process, once with ACTIVITY_YIELD_PER=<batch> (streamed) and once with
+ACTIVITY_YIELD_PER=0 (the old `.all()`). The child resets its peak RSS
+(VmHWM, Linux) right before the call and reports how far the peak rose above
+the RSS it started from, so interpreter and import overhead are excluded.
+Elsewhere ru_maxrss is used, which is only meaningful if the call raises the
+process' all-time peak.
+
+Streamed, the growth stays roughly flat as the ledger grows; loaded whole it
+grows with the row count.
+
+  cd backend
+  python -m benchmarks.bench_memory
+  python -m benchmarks.bench_memory --sizes 10k,100k,400k --targets compute_positions --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+TARGETS = ("compute_positions", "portfolio_history_1y")
+
+
+def _size(label: str) -> int:
+    label = label.strip().lower()
+    if label.endswith("m"):
+        return int(float(label[:-1]) * 1_000_000)
+    if label.endswith("k"):
+        return int(float(label[:-1]) * 1_000)
+    return int(label)
+
+
+def _status_mb(field: str) -> float | None:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak() -> bool:
+    """Reset VmHWM (Linux >= 4.0) so the peak reflects only what follows."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_mb() -> float:
+    hwm = _status_mb("VmHWM")
+    if hwm is not None:
+        return hwm
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB elsewhere
+
+
+def child(db_url: str, user_id: int, target: str) -> Dict[str, float]:
+    """Run one target once in this process and report its memory growth."""
+    from sqlalchemy import create_engine
+    from sqlmodel import Session, select
+
+    from app.models.user import User
+    from app.services.analytics import get_portfolio_history
+    from app.services.positions import compute_positions
+
+    engine = create_engine(db_url)
+    end = date.today() - timedelta(days=1)
+    with Session(engine) as s:
+        user = s.exec(select(User).where(User.id == user_id)).one()
+        fn = {
+            "compute_positions": lambda: compute_positions(s, user=user),
+            "portfolio_history_1y": lambda: get_portfolio_history(s, user, end - timedelta(days=365), end),
+        }[target]
+
+        # without a peak reset (non-Linux) an earlier import spike can hide the call's growth
+        before = _status_mb("VmRSS") if _reset_peak() else _peak_mb()
+        fn()
+        after = _peak_mb()
+    return {"rss_growth_mb": round(after - before, 1), "peak_rss_mb": round(after, 1)}
+
+
+def _run_child(db_url: str, user_id: int, target: str, batch: int) -> Dict[str, float]:
+    env = dict(os.environ, ACTIVITY_YIELD_PER=str(batch))
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_memory", "--child", db_url, str(user_id), target],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(sizes: List[str], targets: List[str], batch: int, db_url: str | None) -> Dict:
+    from sqlalchemy import create_engine
+
+    from benchmarks.datagen import GenSpec, generate
+
+    results: Dict = {}
+    for label in sizes:
+        n = _size(label)
+        tmp = None
+        url = db_url
+        if not url:
+            tmp = tempfile.TemporaryDirectory(prefix=f"bench-mem-{label}-")
+            url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        try:
+            engine = create_engine(url)
+            gen = generate(engine, GenSpec(activities=n, instruments=50, years=3))
+            engine.dispose()
+            print(f"[{label}] seeded {gen.counts['activities']} activities in {gen.elapsed_sec}s", file=sys.stderr)
+            for target in targets:
+                for mode, b in (("streamed", batch), ("all", 0)):
+                    m = _run_child(url, gen.user_ids[0], target, b)
+                    results.setdefault(label, {}).setdefault(target, {})[mode] = m
+                    print(f"[{label}] {target:<22} {mode:<9} {m}", file=sys.stderr)
+        finally:
+            if tmp:
+                tmp.cleanup()
+    return results
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _setup_env()
+        print(json.dumps(child(sys.argv[2], int(sys.argv[3]), sys.argv[4])))
+        return
+
+    ap = argparse.ArgumentParser(description="Peak memory of the ledger reducers, streamed vs loaded whole")
+    ap.add_argument("--sizes", default="20k,100k,300k", help="comma list of ledger sizes (e.g. 10k,1m)")
+    ap.add_argument("--targets", default=",".join(TARGETS), help=f"comma list of {', '.join(TARGETS)}")
+    ap.add_argument("--batch", type=int, default=2000, help="ACTIVITY_YIELD_PER for the streamed runs")
+    ap.add_argument("--db", default=None, help="SQLAlchemy URL (default: a fresh temp SQLite file per size)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+    _setup_env()
+
+    targets = [t for t in args.targets.split(",") if t]
+    for t in targets:
+        if t not in TARGETS:
+            ap.error(f"unknown target {t!r}")
+    res = run([s for s in args.sizes.split(",") if s.strip()], targets, args.batch, args.db)
+
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"{'size':<6} {'target':<22} {'streamed_mb':>12} {'all_mb':>9}   (peak RSS growth during the call)")
+    for label, per_target in res.items():
+        for target, m in per_target.items():
+            print(f"{label:<6} {target:<22} {m['streamed']['rss_growth_mb']:>12} {m['all']['rss_growth_mb']:>9}")
+
+
+def _setup_env() -> None:
+    # The app's settings need these; its own engine is never used for the data
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'portivue-bench-app.db')}")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-32-characters-long!!")
+    os.environ.setdefault("REDIS_URL", "memory://")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Price-refresh throughput against the local fake providers.
+
+Starts benchmarks.fake_providers on a free port, points every provider base
+URL at it, seeds a throwaway SQLite database with N public instruments
+(spread across the US/L/DE/PA/HK suffixes) and times `refresh_all_prices`.
+
+  cd backend
+  python -m benchmarks.bench_refresh --instruments 500 --latency-ms 20
+  python -m benchmarks.bench_refresh --provider auto --alphavantage --rate-limit 5
+  python -m benchmarks.bench_refresh --error-rate 0.2 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.fake_providers import FakeConfig, start_server  # noqa: E402
+
+SUFFIXES = ("", ".L", ".DE", ".PA", ".HK")
+
+
+def _configure_env(server, db_path: str, args) -> None:
+    os.environ.update(server.env())
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-32-characters-long!!")
+    os.environ.setdefault("REDIS_URL", "memory://")
+    if args.alphavantage:
+        os.environ["ALPHA_VANTAGE_KEY"] = "bench"
+    else:
+        os.environ.pop("ALPHA_VANTAGE_KEY", None)
+
+
+def _seed(session, n: int) -> None:
+    from app.models.instrument import Instrument
+
+    for i in range(n):
+        suffix = SUFFIXES[i % len(SUFFIXES)]
+        sym = f"B{i:04d}{suffix}"
+        session.add(Instrument(symbol=sym, name=f"Bench {i}", currency_code="USD", data_source="yahoo"))
+    session.commit()
+
+
+def run(args) -> dict:
+    cfg = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    server = start_server(cfg)
+    tmp = tempfile.TemporaryDirectory(prefix="bench-refresh-")
+    try:
+        _configure_env(server, os.path.join(tmp.name, "bench.db"), args)
+
+        # App imports must come after the env points at the fake server
+        from sqlmodel import Session, SQLModel, create_engine
+        import app.models  # noqa: F401  (register tables)
+        from app.services.price_refresher import refresh_all_prices
+        from app.services.provider_health import provider_health
+
+        engine = create_engine(os.environ["DATABASE_URL"])
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as s:
+            _seed(s, args.instruments)
+
+        rounds = []
+        for r in range(args.rounds):
+            provider_health.reset()
+            server.reset()
+            with Session(engine) as s:
+                t0 = time.perf_counter()
+                res = refresh_all_prices(s, provider=args.provider, time_budget_sec=args.time_budget)
+                elapsed = time.perf_counter() - t0
+            done = res["updated"] + res["skipped"]
+            rounds.append({
+                "round": r + 1,
+                "elapsed_sec": round(elapsed, 3),
+                "symbols_per_sec": round(done / elapsed, 1) if elapsed > 0 else None,
+                "updated": res["updated"],
+                "skipped": res["skipped"],
+                "errors": len(res["errors"]),
+                "partial": res["partial"],
+                "providers": provider_health.stats(),
+                "server": dict(server.stats),
+            })
+
+        best = min(rounds, key=lambda x: x["elapsed_sec"])
+        return {
+            "instruments": args.instruments,
+            "provider": args.provider,
+            "fake": vars(cfg),
+            "best_elapsed_sec": best["elapsed_sec"],
+            "best_symbols_per_sec": best["symbols_per_sec"],
+            "rounds": rounds,
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+        tmp.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark price refresh against fake providers")
+    ap.add_argument("--instruments", type=int, default=200)
+    ap.add_argument("--provider", default="stooq", choices=["stooq", "alphavantage", "auto"])
+    ap.add_argument("--alphavantage", action="store_true", help="set an Alpha Vantage key (enables it in auto)")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--time-budget", type=int, default=3600)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = ap.parse_args()
+
+    if args.provider == "alphavantage":
+        args.alphavantage = True
+
+    out = run(args)
+    if args.json:
+        print(json.dumps(out, indent=2, default=str))
+        return
+
+    print(f"refresh x{args.instruments} provider={args.provider} "
+          f"latency={args.latency_ms}ms error_rate={args.error_rate} rate_limit={args.rate_limit}/s")
+    for r in out["rounds"]:
+        print(f"  round {r['round']}: {r['elapsed_sec']:.3f}s  {r['symbols_per_sec']} sym/s  "
+              f"updated={r['updated']} skipped={r['skipped']} errors={r['errors']}")
+        for name, st in r["providers"].items():
+            print(f"    {name:<12} breaker={st['breaker']:<9} calls={st['calls']:<5} "
+                  f"ok={st['success_rate']} p50={st['latency_ms_p50']}ms p95={st['latency_ms_p95']}ms")
+    print(f"best: {out['best_elapsed_sec']:.3f}s ({out['best_symbols_per_sec']} sym/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Serialization and compression cost of the large API payloads.
+
+Builds synthetic payloads shaped like the hot endpoints (no database needed)
+and measures, per payload:
+
+  encode_ms  best time to turn the route result into body bytes
+             json:   jsonable_encoder + Starlette JSONResponse (FastAPI's old default)
+             orjson: FastJSONResponse (app/core/responses.py)
+  bytes      body size uncompressed, gzip (GZIP_LEVEL) and br (BROTLI_QUALITY,
+             only when the brotli package is installed), with compress_ms
+
+Payloads: activities (ActivityReadWithCalc models, as /activities returns),
+closing (position dicts, /portfolio/closing) and history (daily points,
+/charts/portfolio_history).
+
+  cd backend
+  python -m benchmarks.bench_serialization
+  python -m benchmarks.bench_serialization --rows 20000 --repeat 3 --json
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _payloads(n: int, seed: int = 7) -> Dict[str, Any]:
+    from app.schemas.activities import ActivityReadWithCalc
+
+    rnd = random.Random(seed)
+    start = date(2020, 1, 1)
+    activities = [
+        ActivityReadWithCalc(
+            id=i, account_id=1 + i % 4, instrument_id=1 + i % 50, broker_id=1, type=rnd.choice(["Buy", "Sell", "Dividend"]),
+            date=start + timedelta(days=i % 1500), quantity=rnd.randint(1, 200), unit_price=rnd.uniform(5, 500),
+            currency_code="USD", fee=1.0, base_currency="EUR", fx_rate=0.91, gross_amount=rnd.uniform(10, 9e4),
+            net_amount=rnd.uniform(10, 9e4), gross_amount_base=rnd.uniform(10, 9e4), net_amount_base=rnd.uniform(10, 9e4),
+        )
+        for i in range(n)
+    ]
+    closing = [
+        {
+            "account_id": 1 + i % 4, "account_name": f"Account {i % 4}", "broker_id": 1, "broker_name": "Broker",
+            "instrument_id": i, "symbol": f"SYM{i}", "name": f"Instrument {i}", "asset_class": "Equity",
+            "asset_subclass": None, "instrument_currency": "USD", "qty": rnd.uniform(1, 1e3),
+            "avg_cost_ccy": rnd.uniform(5, 500), "avg_cost_base": rnd.uniform(5, 500), "last_ccy": rnd.uniform(5, 500),
+            "last_base": rnd.uniform(5, 500), "market_value_ccy": rnd.uniform(1e3, 1e5),
+            "market_value_base": rnd.uniform(1e3, 1e5), "unrealized_ccy": rnd.uniform(-1e4, 1e4),
+            "unrealized_base": rnd.uniform(-1e4, 1e4), "base_currency": "EUR",
+        }
+        for i in range(n)
+    ]
+    history = [
+        {"date": (start + timedelta(days=i)).isoformat(), "value": rnd.uniform(1e5, 2e5),
+         "net_invested": rnd.uniform(1e5, 2e5), "cash": rnd.uniform(0, 1e4)}
+        for i in range(n)
+    ]
+    return {"activities": activities, "closing": closing, "history": history}
+
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 2), out
+
+
+def run(rows: int, repeat: int) -> Dict[str, Dict]:
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    from app.core.compression import brotli
+    from app.core.config import settings
+    from app.core.responses import FastJSONResponse
+
+    results: Dict[str, Dict] = {}
+    for name, payload in _payloads(rows).items():
+        m: Dict[str, Any] = {}
+        m["json_encode_ms"], body = _best_ms(lambda: JSONResponse(jsonable_encoder(payload)).body, repeat)
+        if name == "activities":
+            # response_model route: FastAPI dumps the models, then renders
+            fast = lambda: FastJSONResponse([a.model_dump(mode="json") for a in payload]).body  # noqa: E731
+        else:
+            fast = lambda: FastJSONResponse(payload).body  # noqa: E731
+        m["orjson_encode_ms"], fast_body = _best_ms(fast, repeat)
+        assert json.loads(fast_body) == json.loads(body)
+
+        m["bytes"] = len(fast_body)
+        m["gzip_ms"], gz = _best_ms(lambda: gzip.compress(fast_body, compresslevel=settings.GZIP_LEVEL, mtime=0), repeat)
+        m["gzip_bytes"] = len(gz)
+        if brotli is not None:
+            m["br_ms"], br = _best_ms(lambda: brotli.compress(fast_body, quality=settings.BROTLI_QUALITY), repeat)
+            m["br_bytes"] = len(br)
+        results[name] = m
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="JSON encoding and compression cost of the large API payloads")
+    ap.add_argument("--rows", type=int, default=5000, help="rows per payload")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+    _setup_env()
+
+    res = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"{'payload':<11} {'json_ms':>8} {'orjson_ms':>10} {'bytes':>9} {'gzip':>9} {'gzip_ms':>8} {'br':>9} {'br_ms':>7}")
+    for name, m in res.items():
+        print(f"{name:<11} {m['json_encode_ms']:>8} {m['orjson_encode_ms']:>10} {m['bytes']:>9} "
+              f"{m['gzip_bytes']:>9} {m['gzip_ms']:>8} {m.get('br_bytes', '-'):>9} {m.get('br_ms', '-'):>7}")
+
+
+def _setup_env() -> None:
+    # The app's settings need these; nothing here touches a database
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'portivue-bench-app.db')}")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-32-characters-long!!")
+    os.environ.setdefault("REDIS_URL", "memory://")
+
+
+if __name__ == "__main__":
+    main()
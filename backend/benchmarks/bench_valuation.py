@@ -0,0 +1,237 @@
+"""
+Benchmark suite for the valuation hot paths.
+
+For each scale (total activities) a synthetic dataset is generated with
+benchmarks.datagen, then every target is measured for:
+
+  time_s   best wall time over --repeat runs (fresh Session each run)
+  peak_mb  tracemalloc peak during one extra run
+  queries  SQL statements executed during that run
+
+Targets: compute_positions, compute_positions as of a past day (full replay,
+then again as positions_as_of_snapshot once month-end snapshots were written),
+get_portfolio_history (1Y), compute_account_balances, list_activities (route
+function) and fx_rate_on (2,000 uncached lookups).
+
+Results can be stored as baselines (benchmarks/baselines.json) and checked
+later; --check exits non-zero when a target is slower / bigger than the
+tolerance allows or issues more queries than its baseline. Query counts are
+machine independent; times and memory are only comparable on the same box.
+
+  cd backend
+  python -m benchmarks.bench_valuation --scales 1k
+  python -m benchmarks.bench_valuation --scales 1k,100k --save-baseline
+  python -m benchmarks.bench_valuation --scales 1k --check
+  python -m benchmarks.bench_valuation --scales 100k --rows orm   # compare with full ORM objects
+  python -m benchmarks.bench_valuation --scales 1m --repeat 1 --db postgresql+psycopg://...
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BASELINES = Path(__file__).with_name("baselines.json")
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+FX_LOOKUPS = 2_000
+
+
+class QueryCounter:
+    """Counts statements executed on an engine while active."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        if self.active:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        self.active = True
+        return self
+
+    def __exit__(self, *exc):
+        self.active = False
+
+
+def _targets(user_id: int, end) -> Dict[str, Callable]:
+    from sqlmodel import select
+    from starlette.requests import Request
+
+    from app.api.routes.activities import list_activities
+    from app.models.user import User
+    from app.services.account_balances import compute_account_balances
+    from app.services.analytics import get_portfolio_history
+    from app.services.fx_resolver import fx_rate_on
+    from app.services.positions import compute_positions
+
+    def _user(s):
+        return s.exec(select(User).where(User.id == user_id)).one()
+
+    def fx_lookups(s):
+        rng = random.Random(7)
+        pairs = [("USD", "GBP"), ("GBp", "USD"), ("EUR", "GBp"), ("GBP", "EUR")]
+        for _ in range(FX_LOOKUPS):
+            b, q = rng.choice(pairs)
+            fx_rate_on(s, b, q, end - timedelta(days=rng.randrange(0, 900)))
+
+    return {
+        "compute_positions": lambda s: compute_positions(s, user=_user(s)),
+        "positions_as_of": lambda s: compute_positions(s, user=_user(s), as_of=end - timedelta(days=20)),
+        "portfolio_history_1y": lambda s: get_portfolio_history(s, _user(s), end - timedelta(days=365), end),
+        "account_balances": lambda s: compute_account_balances(s, user_id=user_id),
+        "list_activities": lambda s: list_activities(Request({"type": "http", "headers": []}), session=s, user=_user(s)),
+        "fx_rate_on_x2000": fx_lookups,
+    }
+
+
+def _measure(engine, counter: QueryCounter, fn: Callable, repeat: int) -> Dict[str, float]:
+    from sqlmodel import Session
+
+    with Session(engine) as s:
+        tracemalloc.start()
+        with counter:
+            fn(s)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        with Session(engine) as s:
+            t0 = time.perf_counter()
+            fn(s)
+            best = min(best, time.perf_counter() - t0)
+
+    return {"time_s": round(best, 4), "peak_mb": round(peak / 2**20, 2), "queries": counter.count}
+
+
+def run_scale(label: str, n: int, *, db_url: Optional[str], repeat: int, only: List[str]) -> Dict:
+    from sqlalchemy import create_engine
+
+    from benchmarks.datagen import GenSpec, generate
+
+    tmp = None
+    if not db_url:
+        tmp = tempfile.TemporaryDirectory(prefix=f"bench-val-{label}-")
+        db_url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    try:
+        engine = create_engine(db_url)
+        spec = GenSpec(activities=n, instruments=max(20, min(500, n // 200)), years=3)
+        gen = generate(engine, spec)
+        counter = QueryCounter(engine)
+        print(f"[{label}] seeded {gen.counts['activities']} activities, "
+              f"{gen.counts['price_history']} prices in {gen.elapsed_sec}s", file=sys.stderr)
+
+        results = {}
+        for name, fn in _targets(gen.user_ids[0], spec.end).items():
+            if only and name not in only:
+                continue
+            results[name] = _measure(engine, counter, fn, repeat)
+            print(f"[{label}] {name:<24} {results[name]}", file=sys.stderr)
+            if name == "positions_as_of":
+                # the same lookup once month-end snapshots exist
+                from sqlmodel import Session
+
+                from app.services.position_snapshots import last_complete_month_end, write_all_snapshots
+
+                with Session(engine) as s:
+                    write_all_snapshots(s, until=last_complete_month_end(spec.end))
+                name = "positions_as_of_snapshot"
+                results[name] = _measure(engine, counter, fn, repeat)
+                print(f"[{label}] {name:<24} {results[name]}", file=sys.stderr)
+        engine.dispose()
+        return results
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+
+def compare(current: Dict, baseline: Dict, *, time_tol: float, mem_tol: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline` (empty = ok)."""
+    problems = []
+    for scale, targets in current.items():
+        for name, m in targets.items():
+            b = (baseline.get(scale) or {}).get(name)
+            if not b:
+                continue
+            if m["queries"] > b["queries"]:
+                problems.append(f"{scale}/{name}: queries {m['queries']} > baseline {b['queries']}")
+            if m["time_s"] > b["time_s"] * (1 + time_tol) and m["time_s"] - b["time_s"] > 0.01:
+                problems.append(f"{scale}/{name}: time {m['time_s']}s > baseline {b['time_s']}s (+{time_tol:.0%})")
+            if m["peak_mb"] > b["peak_mb"] * (1 + mem_tol) and m["peak_mb"] - b["peak_mb"] > 1.0:
+                problems.append(f"{scale}/{name}: peak {m['peak_mb']}MB > baseline {b['peak_mb']}MB (+{mem_tol:.0%})")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark valuation hot paths on synthetic data")
+    ap.add_argument("--scales", default="1k", help=f"comma list of {', '.join(SCALES)}")
+    ap.add_argument("--only", default="", help="comma list of target names")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--db", default=None, help="SQLAlchemy URL to seed/measure (default: temp SQLite)")
+    ap.add_argument("--baseline-file", type=Path, default=BASELINES)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 on regression vs baseline")
+    ap.add_argument("--time-tolerance", type=float, default=0.5)
+    ap.add_argument("--mem-tolerance", type=float, default=0.25)
+    ap.add_argument("--rows", choices=("columns", "orm"), default="columns",
+                    help="valuation reads as column rows (default) or full ORM objects")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    # The app's settings need these; its own engine is never used for the data
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'portivue-bench-app.db')}")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-32-characters-long!!")
+    os.environ.setdefault("REDIS_URL", "memory://")
+    os.environ["VALUATION_ROW_PROJECTION"] = "true" if args.rows == "columns" else "false"
+
+    only = [t for t in args.only.split(",") if t]
+    current = {}
+    for label in [s.strip().lower() for s in args.scales.split(",") if s.strip()]:
+        if label not in SCALES:
+            ap.error(f"unknown scale {label!r}")
+        current[label] = run_scale(label, SCALES[label], db_url=args.db, repeat=args.repeat, only=only)
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+    else:
+        print(f"{'scale':<6} {'target':<24} {'time_s':>9} {'peak_mb':>9} {'queries':>9}")
+        for scale, targets in current.items():
+            for name, m in targets.items():
+                print(f"{scale:<6} {name:<24} {m['time_s']:>9} {m['peak_mb']:>9} {m['queries']:>9}")
+
+    baseline = json.loads(args.baseline_file.read_text()) if args.baseline_file.exists() else {}
+    if args.check:
+        problems = compare(current, baseline, time_tol=args.time_tolerance, mem_tol=args.mem_tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+    if args.save_baseline:
+        for scale, targets in current.items():
+            baseline.setdefault(scale, {}).update(targets)
+        args.baseline_file.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline_file}")
+
+
+if __name__ == "__main__":
+    main()
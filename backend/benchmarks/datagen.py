@@ -0,0 +1,249 @@
+"""
+Synthetic portfolio generator for benchmarks.
+
+Seeds a database (SQLite or Postgres, any SQLAlchemy URL) with N users,
+M accounts per user, K instruments, Buy/Sell/Dividend/Interest/Fee streams,
+daily PriceHistory for every instrument and daily fx_rates for the
+USD/EUR/GBP pairs. Output is fully determined by `seed`; prices come from
+benchmarks.fake_providers.fake_close so they match the fake provider server.
+
+  cd backend
+  python -m benchmarks.datagen --db sqlite:///bench.db --activities 100000 --users 2
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.fake_providers import _USD_RATES, fake_close  # noqa: E402
+
+CURRENCIES = [("USD", "US Dollar"), ("EUR", "Euro"), ("GBP", "Pound Sterling"), ("GBp", "Sterling Pence")]
+FX_CODES = ("USD", "EUR", "GBP")
+# (suffix, instrument currency)
+LISTINGS = (("", "USD"), (".L", "GBp"), (".DE", "EUR"))
+ACCOUNT_CCYS = ("USD", "GBP", "EUR")
+CHUNK = 5000
+
+
+@dataclass
+class GenSpec:
+    users: int = 1
+    accounts_per_user: int = 3
+    instruments: int = 50
+    activities: int = 1000          # total, split evenly across users
+    years: int = 3
+    seed: int = 1
+    end: date = field(default_factory=lambda: date.today() - timedelta(days=1))
+
+    @property
+    def start(self) -> date:
+        return self.end - timedelta(days=365 * self.years)
+
+
+@dataclass
+class GenResult:
+    user_ids: List[int]
+    counts: Dict[str, int]
+    elapsed_sec: float
+
+
+def _business_days(start: date, end: date) -> List[date]:
+    n = (end - start).days + 1
+    return [d for d in (start + timedelta(days=i) for i in range(n)) if d.weekday() < 5]
+
+
+def _chunks(rows: List[dict], size: int = CHUNK) -> Iterable[List[dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _bulk(conn, table, rows: List[dict]) -> int:
+    for chunk in _chunks(rows):
+        conn.execute(table.insert(), chunk)
+    return len(rows)
+
+
+def _fx_rows(days: List[date]) -> List[dict]:
+    rows = []
+    for d in days:
+        wiggle = 1.0 + 0.02 * ((d.toordinal() % 29) - 14) / 14.0
+        for b in FX_CODES:
+            for q in FX_CODES:
+                if b == q:
+                    continue
+                # quote units per 1 base, with a small deterministic drift on EUR/GBP
+                r = _USD_RATES[q] / _USD_RATES[b]
+                if "USD" in (b, q):
+                    r = r * wiggle if b == "USD" else r / wiggle
+                rows.append({"base": b, "quote": q, "as_of_date": d, "rate": round(r, 8)})
+    return rows
+
+
+def _activity_stream(
+    rng: random.Random,
+    n: int,
+    *,
+    user_id: int,
+    account_ids: List[int],
+    broker_ids: List[int],
+    instruments: List[dict],
+    days: List[date],
+) -> List[dict]:
+    """n activities over `days` with holdings tracked so Sells never go short."""
+    dates = sorted(rng.choice(days) for _ in range(n))
+    held: Dict[tuple, float] = {}
+    rows: List[dict] = []
+
+    for d in dates:
+        acc = rng.choice(account_ids)
+        roll = rng.random()
+        inst = rng.choice(instruments)
+        key = (acc, inst["id"])
+        base = {
+            "owner_user_id": user_id, "account_id": acc, "date": d,
+            "fee": 0.0, "withholding_tax": 0.0, "capital_gains_tax": 0.0,
+            "securities_transaction_tax": 0.0, "stamp_duty": 0.0, "note": None,
+            "instrument_id": None, "broker_id": None,
+        }
+
+        if roll < 0.55 or (roll < 0.75 and held.get(key, 0.0) <= 0):
+            qty = float(rng.randint(1, 40))
+            held[key] = held.get(key, 0.0) + qty
+            rows.append({**base, "type": "Buy", "instrument_id": inst["id"],
+                         "broker_id": rng.choice(broker_ids), "quantity": qty,
+                         "unit_price": fake_close(inst["symbol"], d), "currency_code": inst["currency_code"],
+                         "fee": round(rng.uniform(0, 5), 2)})
+        elif roll < 0.75:
+            qty = float(max(1, int(held[key] * rng.uniform(0.1, 0.8))))
+            held[key] -= qty
+            rows.append({**base, "type": "Sell", "instrument_id": inst["id"],
+                         "broker_id": rng.choice(broker_ids), "quantity": qty,
+                         "unit_price": fake_close(inst["symbol"], d), "currency_code": inst["currency_code"],
+                         "fee": round(rng.uniform(0, 5), 2)})
+        elif roll < 0.92:
+            ccy = "GBP" if inst["currency_code"] == "GBp" else inst["currency_code"]
+            rows.append({**base, "type": "Dividend", "instrument_id": inst["id"], "quantity": 1.0,
+                         "unit_price": round(rng.uniform(5, 250), 2), "currency_code": ccy,
+                         "withholding_tax": round(rng.uniform(0, 10), 2)})
+        else:
+            rows.append({**base, "type": rng.choice(("Fee", "Interest")), "quantity": 1.0,
+                         "unit_price": round(rng.uniform(1, 50), 2),
+                         "currency_code": rng.choice(ACCOUNT_CCYS)})
+    return rows
+
+
+def generate(engine, spec: Optional[GenSpec] = None) -> GenResult:
+    """Create tables (if missing) and insert one synthetic dataset into `engine`."""
+    from sqlalchemy import select
+    from sqlmodel import SQLModel
+
+    import app.models  # noqa: F401  (register tables)
+    from app.models.account import AccountType
+    from app.models.latest_price import rebuild_latest_prices
+    from app.models.realized import rebuild_realized
+    from app.models import (
+        Account, Activity, AppSetting, Broker, Currency, FxRate, Instrument, PriceHistory, User,
+    )
+
+    spec = spec or GenSpec()
+    rng = random.Random(spec.seed)
+    t0 = time.perf_counter()
+    SQLModel.metadata.create_all(engine)
+
+    days = _business_days(spec.start, spec.end)
+    counts: Dict[str, int] = {}
+
+    with engine.begin() as conn:
+        have = set(conn.execute(select(Currency.code)).scalars())
+        _bulk(conn, Currency.__table__, [{"code": c, "name": n} for c, n in CURRENCIES if c not in have])
+
+        tag = f"s{spec.seed}"
+        now = datetime.now(timezone.utc)
+        users = [{"email": f"bench{i}.{tag}@example.com", "full_name": f"Bench User {i}",
+                  "is_active": True, "is_admin": False, "totp_enabled": False,
+                  "created_at": now, "updated_at": now}
+                 for i in range(spec.users)]
+        counts["users"] = _bulk(conn, User.__table__, users)
+        user_ids = list(conn.execute(
+            select(User.id).where(User.email.like(f"%.{tag}@example.com")).order_by(User.id)
+        ).scalars())
+
+        _bulk(conn, AppSetting.__table__, [
+            {"owner_user_id": uid, "base_currency_code": ("USD", "GBP")[i % 2]}
+            for i, uid in enumerate(user_ids)
+        ])
+
+        inst_rows = []
+        for k in range(spec.instruments):
+            suffix, ccy = LISTINGS[k % len(LISTINGS)]
+            sym = f"S{tag.upper()}{k:05d}{suffix}"
+            inst_rows.append({"symbol": sym, "name": f"Synthetic {k}", "currency_code": ccy,
+                              "asset_class": "Equity", "asset_subclass": "Stock", "data_source": "yahoo",
+                              "latest_price": fake_close(sym, spec.end)})
+        counts["instruments"] = _bulk(conn, Instrument.__table__, inst_rows)
+        instruments = [dict(r._mapping) for r in conn.execute(
+            select(Instrument.id, Instrument.symbol, Instrument.currency_code)
+            .where(Instrument.symbol.like(f"S{tag.upper()}%"))
+        )]
+
+        counts["price_history"] = _bulk(conn, PriceHistory.__table__, [
+            {"instrument_id": i["id"], "price_date": d, "close": fake_close(i["symbol"], d), "source": "yahoo"}
+            for i in instruments for d in days
+        ])
+
+        rebuild_latest_prices(conn)  # Core inserts bypass the PriceHistory events
+
+        have_fx = conn.execute(select(FxRate.id).limit(1)).first()
+        counts["fx_rates"] = 0 if have_fx else _bulk(conn, FxRate.__table__, _fx_rows(days))
+
+        counts["accounts"] = counts["activities"] = 0
+        per_user = max(1, spec.activities // max(1, spec.users))
+        for uid in user_ids:
+            _bulk(conn, Broker.__table__, [{"owner_user_id": uid, "name": f"Broker {b}"} for b in range(2)])
+            broker_ids = list(conn.execute(select(Broker.id).where(Broker.owner_user_id == uid)).scalars())
+
+            counts["accounts"] += _bulk(conn, Account.__table__, [
+                {"owner_user_id": uid, "name": f"Account {a}", "currency_code": ACCOUNT_CCYS[a % 3],
+                 "type": AccountType.broker, "balance": float(rng.randrange(1000, 50000))}
+                for a in range(spec.accounts_per_user)
+            ])
+            account_ids = list(conn.execute(select(Account.id).where(Account.owner_user_id == uid)).scalars())
+
+            acts = _activity_stream(rng, per_user, user_id=uid, account_ids=account_ids,
+                                    broker_ids=broker_ids, instruments=instruments, days=days)
+            counts["activities"] += _bulk(conn, Activity.__table__, acts)
+            rebuild_realized(conn, uid)  # ... and the Activity events
+
+    return GenResult(user_ids=user_ids, counts=counts, elapsed_sec=round(time.perf_counter() - t0, 2))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Seed a database with a synthetic portfolio")
+    ap.add_argument("--db", required=True, help="SQLAlchemy URL, e.g. sqlite:///bench.db")
+    ap.add_argument("--users", type=int, default=1)
+    ap.add_argument("--accounts", type=int, default=3, help="accounts per user")
+    ap.add_argument("--instruments", type=int, default=50)
+    ap.add_argument("--activities", type=int, default=1000)
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+
+    spec = GenSpec(users=args.users, accounts_per_user=args.accounts, instruments=args.instruments,
+                   activities=args.activities, years=args.years, seed=args.seed)
+    res = generate(create_engine(args.db), spec)
+    print(f"seeded in {res.elapsed_sec}s: {res.counts} (user ids {res.user_ids})")
+
+
+if __name__ == "__main__":
+    main()
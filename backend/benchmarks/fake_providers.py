@@ -0,0 +1,409 @@
+"""
+Deterministic stand-in for the market-data and FX providers.
+
+Serves the endpoints the app calls, so refreshes can be measured offline:
+
+  Stooq          GET /q/d/l/?s=aapl.us&i=d                       (CSV)
+  Alpha Vantage  GET /query?function=GLOBAL_QUOTE&symbol=AAPL
+  Yahoo          GET /v7/finance/quote?symbols=A,B
+                 GET /v8/finance/chart/{symbol}?period1=..&period2=..[&events=dividends]
+                 GET /v10/finance/quoteSummary/{symbol}?modules=..
+                 GET /autoc?query=..
+  Frankfurter    GET /latest?from=EUR&to=USD,GBP
+  OXR            GET /api/latest.json, /api/historical/{YYYY-MM-DD}.json
+  Control        GET /_stats, POST /_reset
+
+Prices are a pure function of (symbol, date), so two runs see identical data.
+Injected failures are a pure function of (seed, path, n-th call of that path).
+
+Point the app at it with:
+
+  STOOQ_BASE_URL=http://127.0.0.1:8765
+  ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8765
+  YAHOO_QUERY_BASE_URL=http://127.0.0.1:8765
+  YAHOO_AUTOC_BASE_URL=http://127.0.0.1:8765
+  FRANKFURTER_BASE_URL=http://127.0.0.1:8765
+  OXR_BASE_URL=http://127.0.0.1:8765/api
+
+Run standalone:  python -m benchmarks.fake_providers --port 8765 --latency-ms 40
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+# USD per unit of currency is derived from these (units per 1 USD)
+_USD_RATES = {
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "AED": 3.6725, "PKR": 278.5,
+    "INR": 83.2, "JPY": 151.3, "CNY": 7.23, "AUD": 1.52, "CHF": 0.88,
+}
+_SUFFIX_CCY = {"L": "GBp", "DE": "EUR", "PA": "EUR", "HK": "HKD"}
+_STOOQ_SUFFIX_CCY = {"uk": "GBp", "de": "EUR", "pa": "EUR", "hk": "HKD", "us": "USD"}
+_HISTORY_DAYS = 30
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0          # share of calls answered with HTTP 500
+    rate_limit: int = 0              # max calls per provider per second (0 = unlimited)
+    seed: int = 42
+
+
+def _unit(seed: int, *parts: object) -> float:
+    """Stable pseudo-random number in [0, 1) for the given key."""
+    key = ":".join(str(p) for p in (seed, *parts)).encode()
+    return (zlib.crc32(key) & 0xFFFFFFFF) / 2**32
+
+
+def fake_close(symbol: str, on: date) -> float:
+    """Deterministic daily close: symbol-specific level plus a smooth wiggle."""
+    sym = symbol.upper()
+    base = 5.0 + (zlib.crc32(sym.encode()) % 49500) / 100.0
+    phase = (zlib.crc32(sym[::-1].encode()) % 628) / 100.0
+    day = on.toordinal()
+    return round(base * (1.0 + 0.03 * math.sin(day / 7.0 + phase) + 0.0004 * (day % 365)), 4)
+
+
+def _business_days(end: date, n: int) -> List[date]:
+    out: List[date] = []
+    d = end
+    while len(out) < n:
+        if d.weekday() < 5:
+            out.append(d)
+        d -= timedelta(days=1)
+    return list(reversed(out))
+
+
+def _last_session(today: Optional[date] = None) -> date:
+    d = (today or datetime.now(timezone.utc).date()) - timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return d
+
+
+def _yahoo_currency(symbol: str) -> str:
+    if "." in symbol:
+        return _SUFFIX_CCY.get(symbol.rsplit(".", 1)[1].upper(), "USD")
+    return "USD"
+
+
+class _RateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Deque[float]] = {}
+
+    def allow(self, provider: str, per_sec: int) -> bool:
+        if per_sec <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            q = self._calls.setdefault(provider, deque())
+            while q and now - q[0] >= 1.0:
+                q.popleft()
+            if len(q) >= per_sec:
+                return False
+            q.append(now)
+            return True
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], config: FakeConfig):
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.limiter = _RateLimiter()
+        self._lock = threading.Lock()
+        self.path_calls: Counter = Counter()
+        self.stats: Counter = Counter()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides that point every provider at this server."""
+        b = self.base_url
+        return {
+            "STOOQ_BASE_URL": b,
+            "ALPHA_VANTAGE_BASE_URL": b,
+            "YAHOO_QUERY_BASE_URL": b,
+            "YAHOO_AUTOC_BASE_URL": b,
+            "FRANKFURTER_BASE_URL": b,
+            "OXR_BASE_URL": f"{b}/api",
+        }
+
+    def next_call(self, path: str) -> int:
+        with self._lock:
+            self.path_calls[path] += 1
+            return self.path_calls[path]
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.path_calls.clear()
+            self.stats.clear()
+
+    def start_in_thread(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="fake-providers", daemon=True)
+        t.start()
+        return t
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeProviderServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # keep benchmark output clean
+        pass
+
+    # ---- plumbing ------------------------------------------------------------
+
+    def _send(self, status: int, body: str, ctype: str = "application/json") -> None:
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload, status: int = 200) -> None:
+        self._send(status, json.dumps(payload))
+
+    def _provider(self, path: str) -> str:
+        if path.startswith("/q/d/l"):
+            return "stooq"
+        if path == "/query":
+            return "alphavantage"
+        if path.startswith(("/v7/", "/v8/", "/v10/", "/autoc")):
+            return "yahoo"
+        if path.startswith("/api/"):
+            return "oxr"
+        return "frankfurter"
+
+    def _inject(self, provider: str, path: str) -> bool:
+        """Apply latency, rate limit and error injection. True if a response was sent."""
+        cfg = self.server.config
+        n = self.server.next_call(path)
+        delay = cfg.latency_ms + cfg.jitter_ms * _unit(cfg.seed, "jitter", path, n)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if not self.server.limiter.allow(provider, cfg.rate_limit):
+            self.server.count(f"{provider}.rate_limited")
+            if provider == "alphavantage":
+                # Alpha Vantage answers 200 with a Note when throttled
+                self._json({"Note": "Thank you for using Alpha Vantage! API call frequency exceeded."})
+            else:
+                self._json({"error": "rate limited"}, status=429)
+            return True
+
+        if cfg.error_rate > 0 and _unit(cfg.seed, "error", path, n) < cfg.error_rate:
+            self.server.count(f"{provider}.errors")
+            self._json({"error": "injected failure"}, status=500)
+            return True
+
+        self.server.count(f"{provider}.ok")
+        return False
+
+    def do_POST(self):
+        if urlparse(self.path).path == "/_reset":
+            self.server.reset()
+            return self._json({"ok": True})
+        self._json({"error": "not found"}, status=404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = unquote(url.path)
+        qs = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if path == "/_stats":
+            return self._json(dict(self.server.stats))
+
+        provider = self._provider(path)
+        if self._inject(provider, f"{path}?{url.query}"):
+            return
+
+        try:
+            if provider == "stooq":
+                return self._stooq(qs)
+            if provider == "alphavantage":
+                return self._alpha_vantage(qs)
+            if path.startswith("/v7/finance/quote"):
+                return self._yahoo_quote(qs)
+            if path.startswith("/v8/finance/chart/"):
+                return self._yahoo_chart(path.rsplit("/", 1)[1], qs)
+            if path.startswith("/v10/finance/quoteSummary/"):
+                return self._yahoo_summary(path.rsplit("/", 1)[1])
+            if path.startswith("/autoc"):
+                return self._yahoo_autoc(qs)
+            if path == "/api/latest.json":
+                return self._oxr(_last_session())
+            if path.startswith("/api/historical/"):
+                return self._oxr(date.fromisoformat(path.rsplit("/", 1)[1].removesuffix(".json")))
+            if path == "/latest" or path.lstrip("/")[:4].isdigit():
+                return self._frankfurter(path, qs)
+        except (ValueError, KeyError) as e:
+            return self._json({"error": str(e)}, status=400)
+
+        self._json({"error": "not found"}, status=404)
+
+    # ---- providers -----------------------------------------------------------
+
+    def _stooq(self, qs):
+        sym = qs.get("s", "").lower()
+        if not sym or sym.startswith("zz"):
+            return self._send(200, "No data", "text/csv")
+        rows = ["Date,Open,High,Low,Close,Volume"]
+        for d in _business_days(_last_session(), _HISTORY_DAYS):
+            c = fake_close(sym, d)
+            rows.append(f"{d.isoformat()},{c},{round(c * 1.01, 4)},{round(c * 0.99, 4)},{c},{1000 + d.day}")
+        self._send(200, "\n".join(rows) + "\n", "text/csv")
+
+    def _alpha_vantage(self, qs):
+        if qs.get("function") != "GLOBAL_QUOTE":
+            return self._json({"Error Message": "Invalid API call."})
+        sym = qs.get("symbol", "").upper()
+        d = _last_session()
+        px = fake_close(sym, d)
+        self._json({"Global Quote": {
+            "01. symbol": sym,
+            "05. price": f"{px:.4f}",
+            "07. latest trading day": d.isoformat(),
+            "08. previous close": f"{fake_close(sym, d - timedelta(days=1)):.4f}",
+        }})
+
+    def _quote_row(self, sym: str) -> dict:
+        d = _last_session()
+        ts = int(datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc).timestamp()) + 20 * 3600
+        return {
+            "symbol": sym,
+            "shortName": f"{sym} Corp",
+            "longName": f"{sym} Corporation",
+            "quoteType": "ETF" if sym.startswith("V") else "EQUITY",
+            "currency": _yahoo_currency(sym),
+            "regularMarketPrice": fake_close(sym, d),
+            "regularMarketTime": ts,
+            "marketState": "CLOSED",
+        }
+
+    def _yahoo_quote(self, qs):
+        syms = [s.strip().upper() for s in qs.get("symbols", "").split(",") if s.strip()]
+        self._json({"quoteResponse": {"result": [self._quote_row(s) for s in syms], "error": None}})
+
+    def _yahoo_chart(self, sym: str, qs):
+        sym = sym.upper()
+
+        def _as_date(v: str, default: date) -> date:
+            if not v:
+                return default
+            if v.isdigit():
+                return datetime.fromtimestamp(int(v), tz=timezone.utc).date()
+            return date.fromisoformat(v)
+
+        end = _as_date(qs.get("period2", ""), _last_session())
+        start = _as_date(qs.get("period1", ""), end - timedelta(days=_HISTORY_DAYS))
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        days = [d for d in days if d.weekday() < 5]
+        stamps = [int(datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc).timestamp()) for d in days]
+
+        result = {
+            "meta": {"symbol": sym, "currency": _yahoo_currency(sym)},
+            "timestamp": stamps,
+            "indicators": {"quote": [{"close": [fake_close(sym, d) for d in days]}]},
+        }
+        if qs.get("events") == "dividends":
+            # One deterministic dividend per quarter-end month inside the range
+            divs = {}
+            for d, t in zip(days, stamps):
+                if d.month % 3 == 0 and d.day <= 3 and _unit(0, "div", sym) < 0.6:
+                    divs[str(t)] = {"date": t, "amount": round(fake_close(sym, d) * 0.005, 4)}
+            result["events"] = {"dividends": divs}
+        self._json({"chart": {"result": [result], "error": None}})
+
+    def _yahoo_summary(self, sym: str):
+        sym = sym.upper()
+        row = self._quote_row(sym)
+        self._json({"quoteSummary": {"result": [{
+            "price": {
+                "symbol": sym,
+                "longName": row["longName"],
+                "shortName": row["shortName"],
+                "currency": row["currency"],
+                "regularMarketPrice": {"raw": row["regularMarketPrice"]},
+            },
+            "quoteType": {"quoteType": row["quoteType"]},
+            "assetProfile": {"sector": "Technology", "country": "United States"},
+            "summaryProfile": {"sector": "Technology", "country": "United States"},
+        }], "error": None}})
+
+    def _yahoo_autoc(self, qs):
+        q = qs.get("query", "").upper()
+        results = [{"symbol": f"{q}{s}", "name": f"{q}{s} Corp", "exch": "NMS", "typeDisp": "Equity"}
+                   for s in ("", ".L")] if q else []
+        self._json({"ResultSet": {"Query": q, "Result": results}})
+
+    def _frankfurter(self, path: str, qs):
+        base = qs.get("from", qs.get("base", "EUR")).upper()
+        on = _last_session() if path == "/latest" else date.fromisoformat(path.strip("/")[:10])
+        wanted = [c.upper() for c in qs.get("to", "").split(",") if c] or [c for c in _USD_RATES if c != base]
+        per_usd_base = _USD_RATES.get(base)
+        if per_usd_base is None:
+            return self._json({"message": "not found"}, status=404)
+        rates = {c: round(_USD_RATES[c] / per_usd_base, 6) for c in wanted if c in _USD_RATES and c != base}
+        self._json({"amount": 1.0, "base": base, "date": on.isoformat(), "rates": rates})
+
+    def _oxr(self, on: date):
+        ts = int(datetime.combine(on, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+        self._json({"timestamp": ts, "base": "USD", "rates": dict(_USD_RATES)})
+
+
+def start_server(config: Optional[FakeConfig] = None, host: str = "127.0.0.1", port: int = 0) -> FakeProviderServer:
+    """Start a server on a background thread (port 0 picks a free port)."""
+    server = FakeProviderServer((host, port), config or FakeConfig())
+    server.start_in_thread()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Deterministic fake market-data/FX provider server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=int, default=0, help="calls per provider per second (0 = off)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    cfg = FakeConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.seed)
+    server = FakeProviderServer((args.host, args.port), cfg)
+    print(f"fake providers on {server.base_url}")
+    for k, v in server.env().items():
+        print(f"  {k}={v}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 # tests/conftest.py
 """Pytest configuration and fixtures."""
 import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Optional
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, create_engine, SQLModel
@@ -11,9 +16,20 @@ os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 os.environ["FRONTEND_URL"] = "http://localhost:3000"
 os.environ["SESSION_SECRET"] = "test-secret-32-characters-long-for-testing-only"
 os.environ["REDIS_URL"] = "memory://"  # In-memory rate limiting for tests
+os.environ["QUERY_STATS_ENABLED"] = "1"  # Server-Timing / N+1 logging (off by default outside dev)
 
 from app.app import create_app
-from app.core.db import get_session
+from app.core.db import get_read_session, get_session
+from app.api import deps
+from app.core.query_stats import count_queries
+from app.core.session import create_session_cookie
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.currency import Currency
+from app.models.instrument import Instrument
+from app.models.org import Organization, OrganizationMember
+from app.models.user import User
+from app.services.price_cache import PRICE_STORE
 
 
 @pytest.fixture(name="engine")
@@ -27,6 +43,8 @@ def engine_fixture():
     SQLModel.metadata.create_all(engine)
     yield engine
     SQLModel.metadata.drop_all(engine)
+    # process-wide caches would otherwise carry ids over to the next test's DB
+    PRICE_STORE.clear()
 
 
 @pytest.fixture(name="session")
@@ -45,8 +63,94 @@ def client_fixture(session: Session):
         yield session
     
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[deps.get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
     
     with TestClient(app) as client:
         yield client
     
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="max_queries")
+def max_queries_fixture(engine):
+    """
+    Query budget for a block of code (e.g. one request through `client`):
+
+        with max_queries(6):
+            client.get("/activities")
+
+    Fails with the most frequent statements when the budget is exceeded.
+    """
+    @contextmanager
+    def _budget(limit: int):
+        with count_queries(engine) as stats:
+            yield stats
+        assert stats.count <= limit, f"expected <= {limit} queries, got {stats.report()}"
+
+    return _budget
+
+
+@dataclass
+class Ledger:
+    """A user with one account (and optionally one instrument), see `user_with_account`."""
+    session: Session
+    user: User
+    account: Account
+    instrument: Optional[Instrument] = None
+
+    def add(self, kind: str, day: date, qty=None, px=None, *, instrument: bool = True, **kw) -> Activity:
+        """Add (not commit) an activity on the account, on the instrument unless `instrument=False`."""
+        kw.setdefault("currency_code", self.account.currency_code)
+        act = Activity(
+            owner_user_id=self.user.id, account_id=self.account.id,
+            instrument_id=self.instrument.id if instrument and self.instrument else None,
+            type=kind, quantity=qty, unit_price=px, date=day, **kw,
+        )
+        self.session.add(act)
+        return act
+
+
+@pytest.fixture(name="user_with_account")
+def user_with_account_fixture(session: Session):
+    """
+    Factory for a committed user with currencies, an account in the first
+    currency and optionally an instrument (keyword arguments for Instrument):
+
+        ledger = user_with_account("me@example.com", currencies=("USD", "EUR"),
+                                   instrument={"symbol": "ABC", "name": "Abc"})
+        ledger.add("Buy", date(2025, 1, 1), 10, 10.0)
+        session.commit()
+    """
+    def _make(email: str, *, currencies=("USD",), balance: float = 0.0, instrument: Optional[dict] = None) -> Ledger:
+        now = datetime.now(timezone.utc)
+        user = User(email=email, created_at=now, updated_at=now)
+        session.add_all([user, *(Currency(code=c, name=c) for c in currencies)])
+        session.commit()
+        acc = Account(name="Main", currency_code=currencies[0], owner_user_id=user.id, balance=balance)
+        inst = Instrument(**{"currency_code": currencies[0], **instrument}) if instrument else None
+        session.add_all([acc, *([inst] if inst else [])])
+        session.commit()
+        return Ledger(session, user, acc, inst)
+
+    return _make
+
+
+@pytest.fixture(name="authed_client")
+def authed_client_fixture(client: TestClient, session: Session):
+    """
+    Log `client` in as a user (owner of a fresh organization):
+
+        resp = authed_client(user).get("/portfolio/closing")
+    """
+    def _login(user: User) -> TestClient:
+        now = datetime.now(timezone.utc)
+        org = Organization(name=f"org {user.id}", created_at=now, updated_at=now)
+        session.add(org)
+        session.commit()
+        session.add(OrganizationMember(org_id=org.id, user_id=user.id, role="owner"))
+        session.commit()
+        client.cookies.set("portivue_session", create_session_cookie(user.id, twofa_ok=True))
+        return client
+
+    return _login
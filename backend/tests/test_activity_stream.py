@@ -0,0 +1,62 @@
+# tests/test_activity_stream.py
+"""Tests for streamed (yield_per) activity loading in the ledger reducers."""
+from datetime import date, datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.currency import Currency
+from app.models.instrument import Instrument
+from app.models.price_history import PriceHistory
+from app.models.user import User
+from app.repositories import activity as activity_repo
+from app.services.analytics import get_portfolio_history
+from app.services.positions import compute_positions
+
+
+def _ledger(session: Session):
+    now = datetime.now(timezone.utc)
+    user = User(email="stream@example.com", created_at=now, updated_at=now)
+    session.add_all([user, Currency(code="USD", name="USD")])
+    session.commit()
+    acc = Account(name="Main", currency_code="USD", owner_user_id=user.id, balance=0.0)
+    insts = [Instrument(symbol=f"S{i}", name=f"S{i}", currency_code="USD", latest_price=20.0) for i in range(3)]
+    session.add_all([acc, *insts])
+    session.commit()
+    start = date(2025, 3, 1)
+    session.add(Activity(owner_user_id=user.id, account_id=acc.id, type="Deposit", quantity=1,
+                         unit_price=10_000.0, currency_code="USD", date=start))
+    for d in range(40):
+        inst = insts[d % 3]
+        session.add(Activity(owner_user_id=user.id, account_id=acc.id, instrument_id=inst.id,
+                             type="Sell" if d % 7 == 6 else "Buy", quantity=2, unit_price=10.0 + d,
+                             fee=0.5, currency_code="USD", date=start + timedelta(days=d)))
+        session.add(PriceHistory(instrument_id=inst.id, price_date=start + timedelta(days=d), close=11.0 + d))
+    session.commit()
+    return user, acc.id, start
+
+
+def test_batched_iteration_matches_full_load(session: Session):
+    _, acc_id, start = _ledger(session)
+    full = activity_repo.for_accounts(session, [acc_id])
+    streamed = list(activity_repo.iter_for_accounts(session, [acc_id], batch=3))
+    assert [tuple(r) for r in streamed] == [tuple(r) for r in full]
+
+    first, inst_ids = activity_repo.ledger_span(session, [acc_id], until=start + timedelta(days=1))
+    assert first == start and len(inst_ids) == 2
+
+
+def test_reducers_agree_streamed_and_loaded(session: Session, monkeypatch):
+    user, _, start = _ledger(session)
+    end = start + timedelta(days=45)
+
+    monkeypatch.setattr(settings, "ACTIVITY_YIELD_PER", 4)
+    positions = compute_positions(session, user=user)
+    history = get_portfolio_history(session, user, start, end)
+
+    monkeypatch.setattr(settings, "ACTIVITY_YIELD_PER", 0)
+    assert compute_positions(session, user=user) == positions
+    assert get_portfolio_history(session, user, start, end) == history
+    assert len(positions) == 3 and len(history) == 46
@@ -0,0 +1,57 @@
+# tests/test_background_jobs.py
+"""Tests for async (enqueued) price refresh jobs."""
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models.background_job import BackgroundJob
+from app.models.instrument import Instrument
+from app.tasks import jobs as jobs_mod
+
+
+def _seed_instruments(session: Session, n: int = 3):
+    for i in range(n):
+        session.add(Instrument(symbol=f"SYM{i}", name=f"Instrument {i}", currency_code="USD", data_source="yahoo"))
+    session.commit()
+
+
+def test_price_refresh_job_records_progress(engine, session: Session, monkeypatch):
+    """Running a queued job stores final counters and result on the job row."""
+    _seed_instruments(session, 3)
+
+    def fake_fetch(sym, provider="auto"):
+        if sym == "SYM1":
+            return None  # provider had no data → skipped
+        return {"latest_price": 10.0, "latest_price_at": datetime.now(timezone.utc)}
+
+    monkeypatch.setattr("app.services.price_refresher.fetch_latest_price_by_provider", fake_fetch)
+
+    job = jobs_mod.create_job(session, "prices", {"limit": 0, "time_budget_sec": 30, "provider": "stooq"})
+    assert job.status == "queued"
+
+    jobs_mod.run_price_refresh(job.id, engine=engine)
+
+    session.expire_all()
+    row = session.get(BackgroundJob, job.id)
+    assert row.status == "succeeded"
+    assert row.total == 3
+    assert row.processed == 3
+    assert row.updated == 2
+    assert row.skipped == 1
+    assert row.result["provider"] == "stooq"
+    assert row.started_at is not None and row.finished_at is not None
+
+
+def test_job_status_endpoint(client: TestClient, session: Session):
+    """GET /jobs/{id} reports status and progress; unknown ids are 404."""
+    job = jobs_mod.create_job(session, "prices", {"limit": 5})
+
+    response = client.get(f"/jobs/{job.id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == job.id
+    assert body["status"] == "queued"
+    assert set(body["progress"]) == {"total", "processed", "updated", "skipped", "errors"}
+
+    assert client.get("/jobs/does-not-exist").status_code == 404
@@ -0,0 +1,35 @@
+# tests/test_datagen.py
+"""The synthetic benchmark dataset is valid input for the valuation code."""
+from sqlmodel import Session, select
+
+from app.models.activities import Activity
+from app.models.user import User
+from app.services.positions import compute_positions
+from benchmarks.bench_valuation import compare
+from benchmarks.datagen import GenSpec, generate
+
+
+def test_generate_small_dataset(engine):
+    res = generate(engine, GenSpec(users=2, activities=400, instruments=12, years=1, seed=3))
+
+    assert res.counts["activities"] == 400
+    assert len(res.user_ids) == 2
+
+    with Session(engine) as s:
+        user = s.get(User, res.user_ids[0])
+        acts = s.exec(select(Activity).where(Activity.owner_user_id == user.id)).all()
+        assert {a.type for a in acts} <= {"Buy", "Sell", "Dividend", "Interest", "Fee"}
+
+        rows = compute_positions(s, user=user)
+        assert rows and all(r["qty"] > 0 for r in rows)
+        assert all(r["market_value_base"] > 0 for r in rows)
+
+
+def test_compare_flags_query_and_time_regressions():
+    base = {"1k": {"t": {"time_s": 1.0, "peak_mb": 10.0, "queries": 5}}}
+    ok = {"1k": {"t": {"time_s": 1.2, "peak_mb": 10.5, "queries": 5}}}
+    bad = {"1k": {"t": {"time_s": 2.0, "peak_mb": 10.0, "queries": 6}}}
+
+    assert compare(ok, base, time_tol=0.5, mem_tol=0.25) == []
+    problems = compare(bad, base, time_tol=0.5, mem_tol=0.25)
+    assert len(problems) == 2
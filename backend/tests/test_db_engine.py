@@ -0,0 +1,40 @@
+# tests/test_db_engine.py
+"""Tests for the dialect-aware engine options and SQLite pragmas."""
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.db import engine_options, make_engine
+
+
+def test_sqlite_file_engine_sets_pragmas(tmp_path):
+    eng = make_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        assert isinstance(eng.pool, QueuePool)
+        with eng.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() > 0
+    finally:
+        eng.dispose()
+
+
+def test_sqlite_memory_uses_one_shared_connection():
+    opts = engine_options("sqlite://")
+    assert opts["poolclass"] is StaticPool and "pool_size" not in opts
+    eng = make_engine("sqlite:///:memory:")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with eng.connect() as conn:  # same in-memory database on the next checkout
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+def test_postgres_options():
+    opts = engine_options("postgresql+psycopg://u:p@db:5432/app")
+    args = opts["connect_args"]
+    assert opts["pool_size"] == 10 and opts["max_overflow"] == 20 and opts["pool_pre_ping"]
+    assert args["application_name"] == "portivue"
+    assert args["options"] == "-c statement_timeout=30000"
+    assert args["prepare_threshold"] == 5
+    # psycopg2 has no prepare_threshold
+    assert "prepare_threshold" not in engine_options("postgresql://u:p@db/app")["connect_args"]
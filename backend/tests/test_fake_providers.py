@@ -0,0 +1,49 @@
+# tests/test_fake_providers.py
+"""The offline provider stand-in serves what the real clients parse."""
+import pytest
+
+from app.core.config import settings
+from app.services import yf_client
+from app.services.provider_health import ProviderHealth
+from benchmarks.fake_providers import FakeConfig, start_server
+
+
+@pytest.fixture(name="fake")
+def fake_fixture():
+    server = start_server(FakeConfig())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_stooq_and_alpha_vantage_against_fake(fake, monkeypatch):
+    monkeypatch.setattr(settings, "STOOQ_BASE_URL", fake.base_url)
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_BASE_URL", fake.base_url)
+    monkeypatch.setattr(yf_client, "provider_health", ProviderHealth())
+    monkeypatch.setenv("ALPHA_VANTAGE_KEY", "test")
+
+    a = yf_client.fetch_latest_price_stooq("HSBA.L")
+    b = yf_client.fetch_latest_price_stooq("HSBA.L")
+    assert a["latest_price"] == b["latest_price"] > 0   # deterministic
+
+    av = yf_client.fetch_latest_price_alpha_vantage("AAPL")
+    assert av["latest_price"] > 0
+    assert fake.stats["stooq.ok"] == 2 and fake.stats["alphavantage.ok"] == 1
+
+
+def test_rate_limit_trips_breaker(monkeypatch):
+    server = start_server(FakeConfig(rate_limit=1))
+    try:
+        monkeypatch.setattr(settings, "ALPHA_VANTAGE_BASE_URL", server.base_url)
+        health = ProviderHealth(failure_threshold=2)
+        monkeypatch.setattr(yf_client, "provider_health", health)
+        monkeypatch.setenv("ALPHA_VANTAGE_KEY", "test")
+
+        results = [yf_client.fetch_latest_price_by_provider("AAPL", "alphavantage") for _ in range(5)]
+        assert results[0] is not None
+        assert results[1:] == [None] * 4
+        assert health.stats()["alphavantage"]["breaker"] == "open"
+        assert server.stats["alphavantage.rate_limited"] == 2   # calls stopped once the breaker opened
+    finally:
+        server.shutdown()
+        server.server_close()
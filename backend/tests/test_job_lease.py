@@ -0,0 +1,95 @@
+# tests/test_job_lease.py
+"""Tests for the DB-backed scheduler job lease."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session
+
+from app.models.job_lock import JobLock
+from app.tasks.lease import JobLease, LeaseLost, _current, check_lease, singleton_job
+
+
+def test_second_runner_cannot_acquire_live_lease(engine):
+    """Only one runner holds a named lease at a time."""
+    first = JobLease("prices", ttl_sec=60, engine=engine)
+    second = JobLease("prices", ttl_sec=60, engine=engine)
+
+    assert first.acquire() is True
+    try:
+        assert second.acquire() is False
+    finally:
+        first.release()
+
+    # once released, the next runner gets it
+    assert second.acquire() is True
+    second.release()
+
+
+def test_expired_lease_is_taken_over(engine):
+    """A crashed holder (no heartbeats) loses the lease after it expires."""
+    crashed = JobLease("fx", ttl_sec=60, engine=engine)
+    assert crashed.acquire() is True
+    crashed._stop.set()  # simulate the process dying: no more heartbeats
+
+    with Session(engine) as s:
+        row = s.get(JobLock, "fx")
+        row.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        s.add(row)
+        s.commit()
+
+    successor = JobLease("fx", ttl_sec=60, engine=engine)
+    assert successor.acquire() is True
+    # the old holder notices on its next heartbeat
+    assert crashed.heartbeat() is False
+    successor.release()
+
+
+def test_singleton_job_skips_when_lease_is_held(engine, monkeypatch):
+    """The decorator runs the job body only when the lease is won."""
+    import app.core.db as db
+    monkeypatch.setattr(db, "engine", engine)
+
+    calls = []
+
+    @singleton_job("unit-test-job", ttl_sec=60)
+    def job():
+        calls.append(1)
+        return "ran"
+
+    holder = JobLease("unit-test-job", ttl_sec=60, engine=engine)
+    assert holder.acquire() is True
+    try:
+        assert job() is None
+        assert calls == []
+    finally:
+        holder.release()
+
+    assert job() == "ran"
+    assert calls == [1]
+
+
+def test_job_stops_once_its_lease_is_taken_over(engine, monkeypatch):
+    """check_lease() raises inside a job whose heartbeat found the lease gone."""
+    import app.core.db as db
+    monkeypatch.setattr(db, "engine", engine)
+
+    done = []
+
+    @singleton_job("stalled-job", ttl_sec=60)
+    def job(items):
+        for item in items:
+            check_lease()
+            if item == 2:  # stall past the TTL: another runner takes over
+                with Session(engine) as s:
+                    row = s.get(JobLock, "stalled-job")
+                    row.owner = "elsewhere"
+                    s.add(row)
+                    s.commit()
+                check_lease()  # not noticed until the next heartbeat
+                _current.get().heartbeat()
+            done.append(item)
+
+    with pytest.raises(LeaseLost):
+        job([1, 2, 3, 4])
+    assert done == [1, 2]
+    check_lease()  # outside a job it never raises
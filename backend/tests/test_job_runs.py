@@ -0,0 +1,53 @@
+# tests/test_job_runs.py
+"""Tests for the persisted job_run history and status endpoints."""
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.services.job_runs import percentile, record_price_run, record_run, run_stats
+
+
+def test_percentile_nearest_rank():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 90) == 9.0
+    assert percentile(values, 95) == 10.0
+    assert percentile([], 50) is None
+
+
+def test_record_price_run_derives_elapsed_and_throughput(session: Session):
+    started = datetime.now(timezone.utc) - timedelta(seconds=10)
+    result = {"provider": "stooq", "total_considered": 25, "updated": 18, "skipped": 2, "errors": ["X: boom"]}
+
+    run = record_price_run(session, result, started_at=started)
+
+    assert run is not None
+    assert run.status == "succeeded"
+    assert run.total == 25 and run.updated == 18 and run.skipped == 2 and run.errors == 1
+    assert 9.5 <= run.elapsed_sec <= 15
+    assert run.symbols_per_sec is not None and 1.0 <= run.symbols_per_sec <= 2.2
+
+
+def test_status_endpoints_read_history(client: TestClient, session: Session):
+    base = datetime(2026, 1, 5, 10, 0, tzinfo=timezone.utc)
+    for i, secs in enumerate([4, 8, 2, 6]):
+        start = base + timedelta(hours=i)
+        record_run(session, job="prices", started_at=start, finished_at=start + timedelta(seconds=secs),
+                   updated=10, total=10, provider="stooq")
+    record_run(session, job="fx", started_at=base, finished_at=base + timedelta(seconds=1),
+               status="failed", error="Frankfurter latest: empty or error")
+
+    stats = run_stats(session, "prices")
+    assert stats["window"] == 4
+    assert stats["elapsed_sec"]["p50"] == 4.0
+    assert stats["elapsed_sec"]["max"] == 8.0
+    assert stats["last"]["elapsed_sec"] == 6.0
+
+    body = client.get("/_scheduler_status").json()
+    assert body["last_runs"]["prices"].startswith("2026-01-05T13:00:06")
+    assert body["stats"]["fx"]["failed"] == 1
+
+    body = client.get("/_refresh_status", params={"window": 2}).json()
+    assert body["prices"]["stats"]["window"] == 2
+    assert body["prices"]["stats"]["elapsed_sec"]["max"] == 6.0
@@ -0,0 +1,79 @@
+# tests/test_latest_price.py
+"""Tests for the maintained latest_price table and the batch endpoint."""
+from datetime import date
+
+from sqlmodel import Session, select
+
+from app.models.instrument import Instrument
+from app.models.latest_price import LatestPrice
+from app.models.price_history import PriceHistory
+from app.services.price_history import latest_price_for
+
+
+def _instrument(session: Session, symbol: str) -> Instrument:
+    inst = Instrument(symbol=symbol, name=symbol, currency_code="USD")
+    session.add(inst)
+    session.commit()
+    session.refresh(inst)
+    return inst
+
+
+def test_latest_price_follows_price_history_writes(session: Session):
+    inst = _instrument(session, "AAA")
+    old = PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 5), close=10.0)
+    new = PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 6), close=11.0)
+    session.add_all([new, old])  # out of order on purpose
+    session.add(PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 7), close=99.0, org_id=7))
+    session.commit()
+
+    assert latest_price_for(session, inst.id) == (11.0, date(2026, 1, 6))
+    assert latest_price_for(session, inst.id, org_id=7) == (99.0, date(2026, 1, 7))
+    assert latest_price_for(session, inst.id, org_id=8) == (11.0, date(2026, 1, 6))
+
+    new.close = 12.5
+    session.add(new)
+    session.commit()
+    assert latest_price_for(session, inst.id) == (12.5, date(2026, 1, 6))
+
+    session.delete(new)
+    session.commit()
+    assert latest_price_for(session, inst.id) == (10.0, date(2026, 1, 5))
+    assert len(session.exec(select(LatestPrice)).all()) == 2  # public + org 7
+
+
+def test_batch_endpoint_is_one_query(authed_client, session: Session, user_with_account, max_queries):
+    client = authed_client(user_with_account("prices@example.com").user)
+
+    ids = []
+    for k in range(60):
+        inst = _instrument(session, f"B{k}")
+        ids.append(inst.id)
+        session.add(PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 2), close=float(k)))
+    session.commit()
+    with max_queries(6):
+        resp = client.get("/portfolio/latest_prices", params={"ids": ",".join(map(str, ids + [999999]))})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert len(body) == 61
+    assert body[5] == {"instrument_id": ids[5], "price": 5.0, "date": "2026-01-02"}
+    assert body[-1] == {"instrument_id": 999999, "price": None, "date": None}
+
+    single = client.get(f"/portfolio/{ids[3]}/latest_price").json()
+    assert single == {"instrument_id": ids[3], "price": 3.0, "date": "2026-01-02"}
+
+
+def test_upsert_meets_a_row_written_concurrently(session: Session):
+    """A row another writer inserted first is updated or kept, never re-inserted."""
+    inst = _instrument(session, "RACE")
+    # the other writer's row, committed between our flush's reads and writes
+    session.add(LatestPrice(instrument_id=inst.id, org_id=0, price_date=date(2026, 1, 8), close=8.0))
+    session.commit()
+
+    session.add(PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 7), close=7.0))
+    session.commit()
+    assert latest_price_for(session, inst.id) == (8.0, date(2026, 1, 8))
+
+    session.add(PriceHistory(instrument_id=inst.id, price_date=date(2026, 1, 9), close=9.0))
+    session.commit()
+    assert latest_price_for(session, inst.id) == (9.0, date(2026, 1, 9))
+    assert len(session.exec(select(LatestPrice)).all()) == 1
@@ -0,0 +1,151 @@
+# tests/test_lots.py
+"""Tests for the cost-basis lot books and their use in compute_positions."""
+import random
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlmodel import Session
+
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.currency import Currency
+from app.models.instrument import Instrument
+from app.models.realized import RealizedEntry
+from app.models.settings import AppSetting
+from app.models.user import User
+from app.services.lots import load_book, new_book
+from app.services.positions import compute_positions
+
+
+def _naive(method, fills):
+    """Reference: a Python list of [qty, cost] lots, matched one by one."""
+    lots, out = [], []
+    for kind, q, c in fills:
+        if kind == "buy":
+            lots.append([q, c])
+            continue
+        sold = 0.0
+        while q > 1e-10 and lots:
+            lot = lots[0] if method == "fifo" else lots[-1]
+            take = min(q, lot[0])
+            sold += lot[1] * take / lot[0]
+            lot[1] -= lot[1] * take / lot[0]
+            lot[0] -= take
+            q -= take
+            if lot[0] <= 1e-10:
+                lots.remove(lot)
+        out.append(sold)
+    return out, sum(l[0] for l in lots), sum(l[1] for l in lots)
+
+
+@pytest.mark.parametrize("method", ["fifo", "lifo"])
+def test_queue_books_match_naive_lists(method):
+    rnd = random.Random(5)
+    fills, held = [], 0.0
+    for _ in range(3000):  # long enough to trigger FIFO head compaction
+        if held > 50 and rnd.random() < 0.4:
+            q = rnd.uniform(1, held / 2)
+            fills.append(("sell", q, 0.0))
+            held -= q
+        else:
+            q = rnd.uniform(1, 20)
+            fills.append(("buy", q, q * rnd.uniform(5, 15)))
+            held += q
+
+    book, got = new_book(method), []
+    for kind, q, c in fills:
+        if kind == "buy":
+            book.buy(q, c, {"EUR": c / 2})
+        else:
+            sold_ccy, sold_base = book.sell(q)
+            assert sold_base["EUR"] == pytest.approx(sold_ccy / 2)
+            got.append(sold_ccy)
+    want, qty, cost = _naive(method, fills)
+    assert got == pytest.approx(want)
+    assert (book.qty, book.cost_ccy) == (pytest.approx(qty), pytest.approx(cost))
+
+
+def test_methods_differ_only_in_matching():
+    fills = [("buy", 10, 100.0), ("buy", 10, 200.0), ("sell", 15, 0.0)]
+    sold = {}
+    for method in ("average", "fifo", "lifo"):
+        book = new_book(method)
+        for kind, q, c in fills:
+            if kind == "buy":
+                book.buy(q, c, {})
+            else:
+                sold[method] = book.sell(q)[0]
+        assert book.qty == 5
+    assert sold == {"average": 225.0, "fifo": 200.0, "lifo": 250.0}
+
+    book = new_book("fifo")
+    book.buy(5, 50.0, {})
+    book.sell(8)  # oversell closes the position, like the average book
+    assert (book.qty, book.cost_ccy) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize("method", ["fifo", "lifo"])
+def test_fee_only_buys_cost_the_same_in_every_book(method):
+    fills = [(0, 10.0), (10, 100.0), (0, 5.0), (10, 200.0)]  # fee-only buys before and between lots
+    books = {m: new_book(m) for m in ("average", method)}
+    for book in books.values():
+        for q, c in fills:
+            book.buy(q, c, {"EUR": c / 2})
+        assert (book.qty, book.cost_ccy, book.cost_base["EUR"]) == (20, 315.0, 157.5)
+    assert books["average"].sell(20)[0] == pytest.approx(books[method].sell(20)[0]) == 315.0
+
+
+@pytest.mark.parametrize("method", ["average", "fifo", "lifo"])
+def test_negative_buy_reduces_quantity(method):
+    book = new_book(method)
+    book.buy(10, 100.0, {"EUR": 50.0})
+    book.buy(-5, -50.0, {"EUR": -25.0})
+    # the original compute_positions result: qty 5 at an average cost of 10
+    assert (book.qty, book.cost_ccy, book.cost_base["EUR"]) == (5, 50.0, 25.0)
+    book.buy(-2, -30.0, {"EUR": -15.0})
+    assert (book.qty, book.cost_ccy) == (3, pytest.approx(20.0))
+
+    # a correction larger than what is open, then on an empty book
+    book.buy(-5, -20.0, {"EUR": -10.0})
+    assert (book.qty, book.cost_ccy) == (-2, pytest.approx(0.0))
+    book.buy(-3, 50.0, {"EUR": 25.0})
+    book.buy(10, 100.0, {"EUR": 50.0})
+    assert (book.qty, book.cost_ccy, book.cost_base["EUR"]) == (5, pytest.approx(150.0), pytest.approx(75.0))
+    assert book.sell(5)[0] == pytest.approx(150.0)
+
+
+@pytest.mark.parametrize("method", ["average", "fifo", "lifo"])
+def test_negative_buy_on_an_empty_book(method):
+    book = new_book(method)
+    book.buy(-5, 50.0, {"USD": 50.0})
+    assert book.qty == -5
+    book.buy(10, 100.0, {"USD": 100.0})
+    assert (book.qty, book.cost_ccy) == (5, 150.0)
+    assert load_book(method, book.dump()).dump() == book.dump()
+
+
+def test_user_method_drives_positions_and_realized(session: Session):
+    now = datetime.now(timezone.utc)
+    user = User(email="lots@example.com", created_at=now, updated_at=now)
+    session.add_all([user, Currency(code="USD", name="USD")])
+    session.commit()
+    setting = AppSetting(owner_user_id=user.id, base_currency_code="USD")
+    acc = Account(name="Main", currency_code="USD", owner_user_id=user.id, balance=0.0)
+    inst = Instrument(symbol="LOT", name="Lots", currency_code="USD", latest_price=30.0)
+    session.add_all([setting, acc, inst])
+    session.commit()
+    for i, (kind, qty, px) in enumerate([("Buy", 10, 10.0), ("Buy", 10, 20.0), ("Sell", 15, 25.0)]):
+        session.add(Activity(owner_user_id=user.id, account_id=acc.id, instrument_id=inst.id, type=kind,
+                             quantity=qty, unit_price=px, currency_code="USD", date=date(2025, 1, 1 + i)))
+    session.commit()
+
+    average = compute_positions(session, user=user)
+    setting.cost_basis_method = "fifo"
+    session.add(setting)
+    session.commit()
+    fifo = compute_positions(session, user=user)
+
+    assert set(fifo[0]) == set(average[0])
+    assert (average[0]["avg_cost_ccy"], fifo[0]["avg_cost_ccy"]) == (15.0, 20.0)
+    assert compute_positions(session, user=user, method="lifo")[0]["avg_cost_ccy"] == 10.0
+    assert session.exec(RealizedEntry.__table__.select()).first().cost_ccy == 200.0  # rebuilt as FIFO
@@ -0,0 +1,67 @@
+# tests/test_market_calendar.py
+"""Tests for exchange-calendar-aware price refresh."""
+from datetime import date, datetime, timezone
+
+from sqlmodel import Session
+
+from app.models.instrument import Instrument
+from app.models.market_holiday import MarketHoliday
+from app.services.market_calendar import MarketCalendar, exchange_for_symbol, load_holidays
+from app.services.price_refresher import refresh_all_prices
+
+
+def test_exchange_from_symbol_suffix():
+    assert exchange_for_symbol("AAPL").code == "US"
+    assert exchange_for_symbol("BRK.B").code == "US"
+    assert exchange_for_symbol("HSBA.L").code == "L"
+    assert exchange_for_symbol("0005.HK").code == "HK"
+    assert exchange_for_symbol("BTC-USD") is None
+    assert exchange_for_symbol("EURUSD=X") is None
+    assert exchange_for_symbol("BHP.AX") is None
+
+
+def test_due_only_after_own_market_closes():
+    # Tue 2026-01-13 18:00 UTC: London closed (16:30), New York still open (until 21:00 UTC)
+    cal = MarketCalendar(now=datetime(2026, 1, 13, 18, 0, tzinfo=timezone.utc))
+    # Stooq-style stamp: previous session's date at midnight UTC
+    prev_session = datetime(2026, 1, 12, tzinfo=timezone.utc)
+
+    assert cal.is_due("HSBA.L", prev_session) is True
+    assert cal.is_due("AAPL", prev_session) is False
+    assert cal.is_due("AAPL", None) is True
+    # Already fetched after today's London close
+    assert cal.is_due("HSBA.L", datetime(2026, 1, 13, 17, 0, tzinfo=timezone.utc)) is False
+
+
+def test_holiday_and_weekend_are_not_sessions(session: Session):
+    session.add(MarketHoliday(exchange="US", holiday_date=date(2026, 1, 19), name="MLK Day"))
+    session.commit()
+    holidays = load_holidays(session, since=date(2026, 1, 1))
+
+    # Tue 2026-01-20 10:00 UTC: last US close was Fri 16th (Mon 19th is a holiday)
+    cal = MarketCalendar(holidays, now=datetime(2026, 1, 20, 10, 0, tzinfo=timezone.utc))
+    assert cal.is_due("AAPL", datetime(2026, 1, 16, tzinfo=timezone.utc)) is False
+    assert cal.is_due("AAPL", datetime(2026, 1, 15, tzinfo=timezone.utc)) is True
+
+
+def test_refresh_skips_instruments_not_due(session: Session, monkeypatch):
+    stamp = datetime(2026, 1, 12, tzinfo=timezone.utc)
+    for sym in ("AAPL", "HSBA.L"):
+        session.add(Instrument(symbol=sym, name=sym, currency_code="USD", data_source="yahoo",
+                               latest_price=1.0, latest_price_at=stamp))
+    session.commit()
+
+    fetched = []
+
+    def fake_fetch(sym, provider="auto"):
+        fetched.append(sym)
+        return {"latest_price": 2.0, "latest_price_at": datetime(2026, 1, 13, tzinfo=timezone.utc)}
+
+    monkeypatch.setattr("app.services.price_refresher.fetch_latest_price_by_provider", fake_fetch)
+
+    cal = MarketCalendar(now=datetime(2026, 1, 13, 18, 0, tzinfo=timezone.utc))
+    res = refresh_all_prices(session, only_due=True, calendar=cal)
+
+    assert fetched == ["HSBA.L"]
+    assert res["updated"] == 1
+    assert res["not_due"] == 1
@@ -0,0 +1,59 @@
+# tests/test_metrics.py
+"""Tests for the Prometheus metrics registry and /metrics endpoint."""
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_and_counter_exposition():
+    reg = Registry()
+    h = reg.register(Histogram("t_latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    c = reg.register(Counter("t_requests", "Requests.", ("route",)))
+    for v in (0.05, 0.5, 3.0):
+        h.labels("/a").observe(v)
+    c.labels('/b"x').inc(2)
+
+    text = reg.render()
+    assert '# TYPE t_latency_seconds histogram' in text
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{route="/a"} 3' in text
+    assert 't_requests_total{route="/b\\"x"} 2' in text
+    # 0.0.4 parsers match HELP/TYPE to samples by exact name
+    assert '# HELP t_requests_total Requests.' in text
+    assert '# TYPE t_requests_total counter' in text
+    assert '# TYPE t_requests counter' not in text
+
+
+def test_metrics_endpoint_reports_route_templates(client: TestClient):
+    assert client.get("/health").status_code == 200
+    assert client.get("/jobs/does-not-exist").status_code in (401, 404)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert 'portivue_http_requests_total{method="GET",route="/health",status="200"}' in body
+    # templated path, not the raw id
+    assert 'route="/jobs/{job_id}"' in body
+    assert "portivue_http_requests_in_flight" in body
+
+
+def test_pool_stats_for_queue_pool():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+
+    from app.core.metrics import _pool_stats
+
+    eng = create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=1)
+    conns = [eng.connect() for _ in range(3)]
+    try:
+        stats = _pool_stats({"primary": eng})
+        assert stats[("primary", "size")] == 2
+        assert stats[("primary", "checkedout")] == 3
+        assert stats[("primary", "overflow")] == 1
+    finally:
+        for c in conns:
+            c.close()
+        eng.dispose()
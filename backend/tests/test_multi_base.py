@@ -0,0 +1,46 @@
+# tests/test_multi_base.py
+"""Tests for valuing positions in several base currencies in one replay."""
+from datetime import date, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.models.fx import FxRate
+from app.models.user import User
+from app.services.positions import compute_positions
+
+
+@pytest.fixture
+def user(session: Session, user_with_account) -> User:
+    book = user_with_account("bases@example.com", currencies=("USD", "EUR", "GBP"),
+                             instrument={"symbol": "MB", "name": "Multi Base", "latest_price": 15.0})
+    for i, (kind, qty, px) in enumerate([("Buy", 10, 10.0), ("Buy", 10, 12.0), ("Sell", 5, 14.0)]):
+        d = date(2025, 1, 1) + timedelta(days=i)
+        book.add(kind, d, qty, px, fee=1.0)
+        session.add(FxRate(base="USD", quote="EUR", as_of_date=d, rate=0.9 + i / 100))
+        session.add(FxRate(base="USD", quote="GBP", as_of_date=d, rate=0.8 - i / 100))
+    session.commit()
+    return book.user
+
+
+def test_one_replay_matches_per_base_runs(session: Session, user: User):
+    rows = compute_positions(session, base_ccy_override="USD", user=user, bases=["eur", "GBP", "USD"])
+    assert len(rows) == 1 and list(rows[0]["bases"]) == ["USD", "EUR", "GBP"]
+
+    for ccy in ("USD", "EUR", "GBP"):
+        single = compute_positions(session, base_ccy_override=ccy, user=user)[0]
+        assert "bases" not in single
+        got = rows[0]["bases"][ccy]
+        assert got["avg_cost"] == pytest.approx(single["avg_cost_base"])
+        assert got["market_value"] == pytest.approx(single["market_value_base"])
+        assert got["unrealized"] == pytest.approx(single["unrealized_base"])
+    assert rows[0]["market_value_base"] == rows[0]["bases"]["USD"]["market_value"] == 225.0
+
+
+def test_closing_route_accepts_bases(authed_client, user: User):
+    client = authed_client(user)
+    rows = client.get("/portfolio/closing", params=[("base", "EUR"), ("bases", "GBP,USD")]).json()
+    assert rows[0]["base_currency"] == "EUR" and set(rows[0]["bases"]) == {"EUR", "GBP", "USD"}
+
+    too_many = client.get("/portfolio/closing", params={"bases": ",".join(f"C{i:02d}" for i in range(11))})
+    assert too_many.status_code == 422
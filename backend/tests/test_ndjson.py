@@ -0,0 +1,55 @@
+# tests/test_ndjson.py
+"""Tests for opt-in NDJSON streaming on list / history endpoints."""
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.streaming import ndjson_chunks
+from app.models.account_movement import AccountMovement
+from app.models.broker import Broker
+from app.models.user import User
+
+
+@pytest.fixture
+def user(authed_client, session: Session, user_with_account) -> User:
+    book = user_with_account("ndjson@example.com", balance=10.0)
+    broker = Broker(name="Streamer", owner_user_id=book.user.id)
+    session.add(broker)
+    session.commit()
+    for i in range(25):
+        book.add("Interest", date(2025, 1, 1) + timedelta(days=i), 1, 100.0 + i, broker_id=broker.id)
+        session.add(AccountMovement(as_of_date=date(2025, 1, 1), type="set_balance", to_account_id=book.account.id,
+                                    amount_input=float(i), created_at=datetime(2025, 1, 1, 12, i, tzinfo=timezone.utc)))
+    session.commit()
+    authed_client(book.user)
+    return book.user
+
+
+def _lines(resp):
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_activities_stream_matches_json_list(client: TestClient, user: User):
+    listed = client.get("/activities").json()
+    streamed = _lines(client.get("/activities", headers={"Accept": "application/x-ndjson"}))
+    assert streamed == listed and len(streamed) == 25
+    assert streamed[0]["unit_price"] == 124.0  # newest first
+
+
+def test_stream_query_flag_on_movements_and_history(client: TestClient, user: User):
+    movements = _lines(client.get("/accounts/movements", params={"stream": "true", "limit": 10}))
+    assert [m["amount_input"] for m in movements] == [float(i) for i in range(24, 14, -1)]
+
+    history = _lines(client.get("/charts/portfolio_history", params={"period": "1M", "stream": "true"}))
+    assert history == client.get("/charts/portfolio_history", params={"period": "1M"}).json()
+
+
+def test_chunks_group_lines():
+    chunks = list(ndjson_chunks(({"i": i} for i in range(100)), chunk_bytes=64))
+    assert 1 < len(chunks) < 100
+    assert b"".join(chunks).count(b"\n") == 100
@@ -0,0 +1,77 @@
+# tests/test_position_snapshots.py
+"""Tests for point-in-time positions served from month-end snapshots."""
+from datetime import date, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.fx import FxRate
+from app.models.instrument import Instrument
+from app.models.position_snapshot import PositionSnapshot, clear_snapshots
+from app.models.price_history import PriceHistory
+from app.models.settings import AppSetting
+from app.models.user import User
+from app.services import position_snapshots
+from app.services.positions import compute_positions
+
+
+@pytest.fixture
+def user(session: Session, user_with_account) -> User:
+    book = user_with_account("asof@example.com", currencies=("USD", "EUR"),
+                             instrument={"symbol": "ASOF", "name": "As Of", "latest_price": 99.0})
+    session.add(AppSetting(owner_user_id=book.user.id, base_currency_code="EUR", cost_basis_method="fifo"))
+    session.commit()
+    day = date(2024, 1, 1)
+    for i in range(120):  # a trade every 3 days through Dec 2024
+        d = day + timedelta(days=3 * i)
+        kind = "Sell" if i % 4 == 3 else "Buy"
+        book.add(kind, d, 5 if kind == "Sell" else 4, 10.0 + i)
+        session.add(PriceHistory(instrument_id=book.instrument.id, price_date=d, close=10.5 + i))
+        session.add(FxRate(base="USD", quote="EUR", as_of_date=d, rate=0.9 + i / 1000))
+    session.commit()
+    return book.user
+
+
+def test_snapshots_give_the_same_positions_as_a_full_replay(session: Session, user: User):
+    as_of = date(2024, 8, 20)
+    full = compute_positions(session, user=user, as_of=as_of)
+
+    assert position_snapshots.write_snapshots(session, user, until=date(2024, 12, 31), min_activities=20) >= 4
+    snaps = session.exec(select(PositionSnapshot).order_by(PositionSnapshot.as_of)).all()
+    assert all(s.method == "fifo" and s.base_currency == "EUR" for s in snaps)
+    # ~10 trades a month: a snapshot every other month end
+    assert position_snapshots.latest(session, user.id, "fifo", "EUR", as_of).as_of == date(2024, 6, 30)
+
+    assert compute_positions(session, user=user, as_of=as_of) == pytest.approx(full)
+    row = full[0]
+    # valued at the last close / FX on or before the day, not at latest_price
+    assert row["last_ccy"] == 10.5 + 77  # trade 77 fell on 2024-08-19
+    assert row["last_base"] == pytest.approx(row["last_ccy"] * (0.9 + 77 / 1000))
+    assert compute_positions(session, user=user)[0]["last_ccy"] == 99.0
+
+
+def test_backdated_activity_drops_later_snapshots(session: Session, user: User):
+    position_snapshots.write_snapshots(session, user, until=date(2024, 12, 31), min_activities=1)
+    assert session.exec(select(PositionSnapshot)).all()
+
+    acc = session.exec(select(Account)).first()
+    inst = session.exec(select(Instrument)).first()
+    session.add(Activity(owner_user_id=user.id, account_id=acc.id, instrument_id=inst.id, type="Buy",
+                         quantity=100, unit_price=1.0, currency_code="USD", date=date(2024, 6, 10)))
+    session.commit()
+
+    kept = [s.as_of for s in session.exec(select(PositionSnapshot)).all()]
+    assert kept and max(kept) < date(2024, 6, 10)
+    with_snap = compute_positions(session, user=user, as_of=date(2024, 9, 30))
+    clear_snapshots(session.connection(), user.id)
+    assert with_snap == pytest.approx(compute_positions(session, user=user, as_of=date(2024, 9, 30)))
+
+
+def test_closing_route_as_of(authed_client, user: User):
+    client = authed_client(user)
+    rows = client.get("/portfolio/closing", params={"as_of": "2024-01-05"}).json()
+    assert [(r["qty"], r["last_ccy"]) for r in rows] == [(8.0, 11.5)]
+    future = (date.today() + timedelta(days=2)).isoformat()
+    assert client.get("/portfolio/closing", params={"as_of": future}).status_code == 422
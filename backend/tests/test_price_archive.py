@@ -0,0 +1,77 @@
+# tests/test_price_archive.py
+"""Tests for the memory-mapped price archive and the compaction command."""
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.instrument import Instrument
+from app.models.price_history import PriceHistory
+from app.services import price_archive
+from app.services.price_cache import PRICE_STORE, PriceSeries
+from app.tasks.compact_prices import compact
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_ARCHIVE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _ordinals(*days: date) -> np.ndarray:
+    return np.array([d.toordinal() for d in days])
+
+
+def test_merge_writes_memmapped_file(archive_dir):
+    price_archive.merge(7, [(date(2024, 1, 3), 3.0), (date(2024, 1, 1), 1.0)])
+    price_archive.merge(7, [(date(2024, 1, 3), 30.0), (date(2024, 1, 2), 2.0)])
+
+    dates, closes = price_archive.read(7)
+    assert isinstance(dates.base, np.memmap) and not closes.flags.writeable
+    assert dates.tolist() == _ordinals(date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)).tolist()
+    assert closes.tolist() == [1.0, 2.0, 30.0]
+    assert price_archive.last_date(7) == date(2024, 1, 3)
+    assert price_archive.read(8) is None
+
+
+def test_db_rows_win_over_archived_days(archive_dir):
+    price_archive.merge(1, [(date(2024, 1, 1), 1.0), (date(2024, 1, 2), 2.0)])
+    archived = PriceSeries(*price_archive.read(1))
+
+    stacked = PriceSeries.with_archive(archived, PriceSeries.from_rows([(date(2024, 1, 5), 5.0)]))
+    assert stacked.archived is archived and len(stacked) == 3
+    days = _ordinals(date(2023, 12, 31), date(2024, 1, 2), date(2024, 1, 4), date(2024, 1, 6))
+    got = stacked.asof(days)
+    assert np.isnan(got[0]) and got[1:].tolist() == [2.0, 2.0, 5.0]
+
+    # a DB row inside the archived range is overlaid, the archive is not copied
+    corrected = PriceSeries.with_archive(archived, PriceSeries.from_rows([(date(2024, 1, 2), 2.5)]))
+    assert corrected.archived is archived and corrected.nbytes == corrected.dates.nbytes + 8
+    got = corrected.asof(_ordinals(date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)))
+    assert got.tolist() == [1.0, 2.5, 2.5]
+    assert corrected.merged(date(2024, 1, 1).toordinal(), 1.5).asof(_ordinals(date(2024, 1, 1))).tolist() == [1.5]
+
+
+def test_compaction_moves_old_public_rows(archive_dir, engine, session: Session):
+    inst = Instrument(symbol="OLD", name="OLD", currency_code="USD")
+    session.add(inst)
+    session.commit()
+    iid = inst.id
+    for day in (1, 2, 3, 10):
+        session.add(PriceHistory(instrument_id=iid, price_date=date(2024, 1, day), close=float(day)))
+    session.add(PriceHistory(instrument_id=iid, price_date=date(2024, 1, 1), close=99.0, org_id=5, source="manual"))
+    session.commit()
+
+    assert compact(engine, date(2024, 1, 5), dry_run=True) == {"instruments": 1, "rows": 3}
+    assert compact(engine, date(2024, 1, 5)) == {"instruments": 1, "rows": 3}
+
+    left = session.exec(select(PriceHistory.price_date, PriceHistory.org_id)).all()
+    assert sorted(left) == [(date(2024, 1, 1), 5), (date(2024, 1, 10), None)]
+    assert price_archive.read(iid)[1].tolist() == [1.0, 2.0, 3.0]
+
+    # cache view: archive + DB, the tenant row on Jan 1 overriding the archived close
+    series = PRICE_STORE.get_many(session, [iid])[iid]
+    got = series.asof(_ordinals(date(2024, 1, 1), date(2024, 1, 3), date(2024, 1, 11)))
+    assert got.tolist() == [99.0, 3.0, 10.0]
@@ -0,0 +1,63 @@
+# tests/test_price_cache.py
+"""Tests for the in-process columnar price cache."""
+from datetime import date
+
+import numpy as np
+from sqlmodel import Session
+
+from app.models.instrument import Instrument
+from app.models.price_history import PriceHistory
+from app.services.price_cache import PRICE_STORE, PriceSeries, PriceStore
+
+
+def _instrument(session: Session, symbol: str) -> int:
+    inst = Instrument(symbol=symbol, name=symbol, currency_code="USD")
+    session.add(inst)
+    session.commit()
+    return inst.id
+
+
+def test_asof_carries_last_close_forward():
+    s = PriceSeries.from_rows([(date(2026, 1, 2), 10.0), (date(2026, 1, 2), 11.0), (date(2026, 1, 5), 12.0)])
+    assert s.dates.tolist() == [date(2026, 1, 2).toordinal(), date(2026, 1, 5).toordinal()]  # last row per day wins
+    days = np.arange(date(2026, 1, 1).toordinal(), date(2026, 1, 7).toordinal())
+    got = s.asof(days)
+    assert np.isnan(got[0]) and got[1:].tolist() == [11.0, 11.0, 11.0, 12.0, 12.0]
+    floored = s.asof(days, floor=date(2026, 1, 3).toordinal())
+    assert np.isnan(floored[:4]).all() and floored[4:].tolist() == [12.0, 12.0]
+
+
+def test_loads_once_and_evicts_by_bytes(session: Session, max_queries):
+    a, b = _instrument(session, "AAA"), _instrument(session, "BBB")
+    for iid in (a, b):
+        for d in range(1, 11):
+            session.add(PriceHistory(instrument_id=iid, price_date=date(2026, 1, d), close=float(d)))
+    session.commit()
+
+    store = PriceStore(max_bytes=10 * 12)  # room for one 10-day series (int32 + float64 per day)
+    with max_queries(1):
+        got = store.get_many(session, [a, b])
+    assert len(got[a]) == len(got[b]) == 10
+    assert store.nbytes <= store.max_bytes and len([i for i in (a, b) if i in store]) == 1
+
+    cached = a if a in store else b
+    with max_queries(0):
+        store.get_many(session, [cached])
+
+
+def test_committed_inserts_are_merged_and_rollbacks_ignored(session: Session, max_queries):
+    iid = _instrument(session, "CCC")
+    session.add(PriceHistory(instrument_id=iid, price_date=date(2026, 1, 5), close=10.0))
+    session.commit()
+    assert PRICE_STORE.get_many(session, [iid])[iid].closes.tolist() == [10.0]
+
+    session.add(PriceHistory(instrument_id=iid, price_date=date(2026, 1, 9), close=99.0))
+    session.flush()
+    session.rollback()
+    session.add(PriceHistory(instrument_id=iid, price_date=date(2026, 1, 6), close=11.0))
+    session.commit()
+
+    with max_queries(0):
+        s = PRICE_STORE.get_many(session, [iid])[iid]
+    assert s.closes.tolist() == [10.0, 11.0]
+    assert s.dates[-1] == date(2026, 1, 6).toordinal()
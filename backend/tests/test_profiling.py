@@ -0,0 +1,116 @@
+# tests/test_profiling.py
+"""Tests for the opt-in admin request profiler."""
+import time
+from datetime import datetime, timezone
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api import deps
+from app.app import create_app
+from app.core.config import settings
+from app.core.profiling import _PROFILED, StackSampler
+from app.core.db import get_session
+from app.core.session import create_session_cookie
+from app.models.user import User
+
+
+def _busy_helper():
+    end = time.perf_counter() + 0.15
+    while time.perf_counter() < end:
+        sum(range(200))
+
+
+def _slow_endpoint():
+    _busy_helper()
+    return {"ok": True}
+
+
+def _other_helper():
+    _busy_helper()
+
+
+def _shared_endpoint(helper):
+    helper()
+
+
+@pytest.fixture
+def profiling_client(session: Session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 2.0)
+    app = create_app()
+    app.add_api_route("/_test/slow", _slow_endpoint)
+
+    def override():
+        yield session
+
+    app.dependency_overrides[get_session] = override
+    app.dependency_overrides[deps.get_session] = override
+    with TestClient(app) as c:
+        yield c
+
+
+def _user(session: Session, email: str, admin: bool) -> User:
+    now = datetime.now(timezone.utc)
+    u = User(email=email, is_admin=admin, created_at=now, updated_at=now)
+    session.add(u)
+    session.commit()
+    session.refresh(u)
+    return u
+
+
+def test_admin_request_is_profiled(profiling_client: TestClient, session: Session):
+    admin = _user(session, "admin@example.com", True)
+    profiling_client.cookies.set("portivue_session", create_session_cookie(admin.id, twofa_ok=True))
+
+    resp = profiling_client.get("/_test/slow", headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+    pid = resp.headers["x-profile-id"]
+
+    prof = profiling_client.get(f"/_profiles/{pid}").json()
+    assert prof["path"] == "/_test/slow" and prof["samples"] > 0
+    names = [f["function"] for f in prof["functions"]]
+    assert "tests.test_profiling:_busy_helper" in names
+
+    folded = profiling_client.get(f"/_profiles/{pid}", params={"format": "collapsed"}).text
+    assert "tests.test_profiling:_slow_endpoint;tests.test_profiling:_busy_helper" in folded
+
+
+def test_non_admin_is_not_profiled(profiling_client: TestClient, session: Session):
+    user = _user(session, "user@example.com", False)
+    profiling_client.cookies.set("portivue_session", create_session_cookie(user.id, twofa_ok=True))
+
+    resp = profiling_client.get("/_test/slow?__profile=1")
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    assert profiling_client.get("/_profiles").status_code == 403
+
+
+def test_sampler_ignores_other_requests_to_the_same_endpoint():
+    own = StackSampler(0.002, _shared_endpoint.__code__, only_own=True)
+    every = StackSampler(0.002, _shared_endpoint.__code__)
+
+    async def call(helper, profiled):
+        if profiled:
+            _PROFILED.set(own)
+        await anyio.to_thread.run_sync(_shared_endpoint, helper)
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(call, _busy_helper, True)
+            tg.start_soon(call, _other_helper, False)
+
+    own.start()
+    every.start()
+    anyio.run(main)
+    own.stop()
+    every.stop()
+
+    def helpers(sampler):
+        return {stack[1][1] for stack in sampler.stacks if len(stack) > 1}
+
+    assert own.samples > 0 and helpers(own) == {"_busy_helper"}
+    assert "_other_helper" in helpers(every)
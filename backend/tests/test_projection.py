@@ -0,0 +1,45 @@
+# tests/test_projection.py
+"""Tests for the column-projection row layer used by valuation code."""
+from datetime import date
+
+import pytest
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.user import User
+from app.repositories import activity as activity_repo
+from app.services.account_balances import compute_account_balances
+from app.services.positions import compute_positions
+
+
+@pytest.fixture
+def ledger(session: Session, user_with_account) -> User:
+    book = user_with_account("rows@example.com", balance=250.0,
+                             instrument={"symbol": "ROW", "name": "Row Inc", "latest_price": 12.0})
+    for i, (kind, qty, px) in enumerate([("Buy", 10, 10.0), ("Buy", 5, 11.0), ("Sell", 3, 12.0)]):
+        book.add(kind, date(2025, 1, 1 + i), qty, px, fee=1.0)
+    session.commit()
+    user_id = book.user.id
+    session.expunge_all()
+    return session.get(User, user_id)
+
+
+def test_rows_are_not_orm_objects(session: Session, ledger: User):
+    acc_id = session.exec(Account.__table__.select()).first().id
+    rows = activity_repo.for_accounts(session, [acc_id])
+    assert [r.type for r in rows] == ["Buy", "Buy", "Sell"]
+    assert not isinstance(rows[0], Activity)
+    assert not any(isinstance(o, Activity) for o in session.identity_map.values())
+
+
+def test_projection_toggle_gives_identical_results(session: Session, ledger: User, monkeypatch):
+    monkeypatch.setattr(settings, "VALUATION_ROW_PROJECTION", True)
+    rows_positions = compute_positions(session, user=ledger)
+    rows_balances = compute_account_balances(session, user_id=ledger.id)
+
+    monkeypatch.setattr(settings, "VALUATION_ROW_PROJECTION", False)
+    assert compute_positions(session, user=ledger) == rows_positions
+    assert compute_account_balances(session, user_id=ledger.id) == rows_balances
+    assert rows_positions[0]["qty"] == 12 and rows_positions[0]["market_value_ccy"] == 144.0
@@ -0,0 +1,89 @@
+# tests/test_provider_health.py
+"""Tests for provider health stats, circuit breaker and auto-chain ordering."""
+from app.services import yf_client
+from app.services.provider_health import CLOSED, HALF_OPEN, OPEN, ProviderError, ProviderHealth
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_breaker_opens_then_probes_after_cooldown():
+    clock = FakeClock()
+    h = ProviderHealth(failure_threshold=3, cooldown_sec=60, clock=clock)
+
+    for _ in range(3):
+        assert h.allow("stooq")
+        h.record("stooq", False, 0.1, error="timeout")
+    assert h.stats()["stooq"]["breaker"] == OPEN
+    assert not h.allow("stooq")
+
+    clock.t = 61
+    assert h.allow("stooq")            # the single half-open probe
+    assert h.stats()["stooq"]["breaker"] == HALF_OPEN
+    assert not h.allow("stooq")        # no second probe while one is in flight
+
+    h.record("stooq", False, 0.1)      # probe failed -> open again
+    assert h.stats()["stooq"]["breaker"] == OPEN
+
+    clock.t = 122
+    assert h.allow("stooq")
+    h.record("stooq", True, 0.05)
+    assert h.stats()["stooq"]["breaker"] == CLOSED
+
+
+def test_order_prefers_healthy_providers():
+    h = ProviderHealth(failure_threshold=100)
+    names = ["alphavantage", "stooq", "yfinance"]
+    assert h.order(names) == names     # no samples yet: configured order
+
+    for _ in range(10):
+        h.record("alphavantage", False, 0.5)
+        h.record("stooq", True, 0.2)
+    assert h.order(names) == ["stooq", "yfinance", "alphavantage"]
+
+
+def test_auto_chain_skips_open_provider(monkeypatch):
+    h = ProviderHealth(failure_threshold=2, cooldown_sec=300)
+    monkeypatch.setattr(yf_client, "provider_health", h)
+    monkeypatch.setenv("ALPHA_VANTAGE_KEY", "demo")
+
+    calls = []
+
+    def av(sym):
+        calls.append("alphavantage")
+        raise ProviderError("alphavantage throttled")
+
+    def stooq(sym):
+        calls.append("stooq")
+        return {"symbol": sym, "latest_price": 1.0, "latest_price_at": None}
+
+    monkeypatch.setattr(yf_client, "_alpha_vantage_fetch", av)
+    monkeypatch.setattr(yf_client, "_stooq_fetch", stooq)
+
+    for _ in range(4):
+        assert yf_client.fetch_latest_price_by_provider("AAPL")["latest_price"] == 1.0
+
+    # Alpha Vantage tripped after two failures and was not called again
+    assert calls.count("alphavantage") == 2
+    assert calls.count("stooq") == 4
+    assert h.stats()["alphavantage"]["breaker"] == OPEN
+
+
+def test_probe_is_not_leaked_by_calls_that_record_nothing(monkeypatch):
+    clock = FakeClock()
+    h = ProviderHealth(failure_threshold=1, cooldown_sec=60, clock=clock)
+    monkeypatch.setattr(yf_client, "provider_health", h)
+    # a fetcher that bails out before _timed records an outcome
+    monkeypatch.setitem(yf_client._PRICE_PROVIDERS, "stooq", (lambda sym: None, lambda: True))
+
+    h.record("stooq", False, 0.1)
+    clock.t = 61
+    assert yf_client._call_provider("stooq", "  ") is None   # never claims the probe
+    assert yf_client._call_provider("stooq", "AAPL") is None  # claims it, hands it back
+    assert h.stats()["stooq"]["breaker"] == HALF_OPEN
+    assert h.allow("stooq")
@@ -0,0 +1,89 @@
+# tests/test_query_stats.py
+"""Tests for SQL statement counting and per-endpoint query budgets."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.query_stats import count_queries, fingerprint
+from app.core.session import create_session_cookie
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.broker import Broker
+from app.models.currency import Currency
+from app.models.fx import FxRate
+from app.models.user import User
+
+
+@pytest.fixture
+def seeded_user(session: Session):
+    """A user with two accounts and `n` activities spread over brokers, currencies and dates."""
+    def _seed(n: int) -> User:
+        now = datetime.now(timezone.utc)
+        user = User(email=f"q{n}@example.com", full_name="Query Budget", created_at=now, updated_at=now)
+        session.add(user)
+        for code in ("USD", "EUR", "GBP"):
+            if not session.get(Currency, code):
+                session.add(Currency(code=code, name=code))
+        session.commit()
+        session.refresh(user)
+
+        brokers = [Broker(name=f"B{i}", owner_user_id=user.id) for i in range(3)]
+        accounts = [
+            Account(name="USD acc", currency_code="USD", owner_user_id=user.id, balance=100.0),
+            Account(name="EUR acc", currency_code="EUR", owner_user_id=user.id, balance=50.0),
+        ]
+        session.add_all(brokers + accounts)
+        session.commit()
+
+        start = date(2025, 1, 1)
+        for d in range(30):
+            session.add(FxRate(base="EUR", quote="USD", as_of_date=start + timedelta(days=d), rate=1.1))
+        for i in range(n):
+            session.add(Activity(
+                owner_user_id=user.id, account_id=accounts[i % 2].id, broker_id=brokers[i % 3].id,
+                type="Fee", quantity=1.0, unit_price=2.0, currency_code=("USD", "EUR")[i % 2],
+                date=start + timedelta(days=i % 30),
+            ))
+        session.commit()
+        return user
+
+    return _seed
+
+
+def _login(client: TestClient, user: User) -> None:
+    client.cookies.set("portivue_session", create_session_cookie(user.id, twofa_ok=True))
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM broker\n WHERE broker.id IN (?, ?, ?) AND x = 5")
+    b = fingerprint("SELECT *  FROM broker WHERE broker.id IN (?) AND x = 17")
+    assert a == b == "SELECT * FROM broker WHERE broker.id IN (...) AND x = ?"
+
+
+def test_failed_statement_leaves_no_state_on_the_connection(engine):
+    with count_queries(engine) as stats, engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert not any(k.startswith("query_stats") for k in conn.info)
+        conn.exec_driver_sql("SELECT 1")
+    assert stats.count == 1
+
+
+def test_server_timing_header(client: TestClient, seeded_user):
+    _login(client, seeded_user(3))
+    resp = client.get("/activities")
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    assert timing.startswith("db;dur=") and "queries" in timing and "app;dur=" in timing
+
+
+@pytest.mark.parametrize("path", ["/activities", "/accounts/balances"])
+def test_query_budget_does_not_grow_with_rows(client: TestClient, seeded_user, max_queries, path):
+    _login(client, seeded_user(60))
+    # user + settings + rows + brokers + one FX lookup per distinct (currency, date)
+    with max_queries(25):
+        resp = client.get(path)
+    assert resp.status_code == 200
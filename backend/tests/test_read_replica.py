@@ -0,0 +1,78 @@
+# tests/test_read_replica.py
+"""Tests for read-replica routing with two local SQLite databases."""
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session
+
+from app.core import db
+from app.core.db import STICKY_COOKIE, ReadYourWritesMiddleware, get_read_session, make_engine
+from app.core.settings_svc import get_or_create_settings
+
+
+def _which(session) -> str:
+    return session.execute(text("SELECT name FROM whoami")).scalar()
+
+
+@pytest.fixture
+def two_dbs(tmp_path, monkeypatch):
+    engines = {}
+    for name in ("primary", "replica"):
+        eng = make_engine(f"sqlite:///{tmp_path / name}.db")
+        with eng.begin() as conn:
+            conn.execute(text("CREATE TABLE whoami (name TEXT)"))
+            conn.execute(text("INSERT INTO whoami VALUES (:n)"), {"n": name})
+        engines[name] = eng
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engines["primary"], class_=Session))
+    monkeypatch.setattr(db, "ReadSessionLocal", sessionmaker(bind=engines["replica"], class_=Session))
+    monkeypatch.setattr(db, "_replica_down_until", 0.0)
+    monkeypatch.setattr(db.settings, "SESSION_COOKIE_SECURE", False)  # TestClient is plain http
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/read")
+    def read(session: Session = Depends(get_read_session)):
+        return {"db": _which(session)}
+
+    @app.post("/write")
+    def write():
+        return {"ok": True}
+
+    yield app, engines
+    for eng in engines.values():
+        eng.dispose()
+
+
+def test_reads_go_to_replica_until_own_write(two_dbs):
+    app, _ = two_dbs
+    with TestClient(app) as c:
+        assert c.get("/read").json() == {"db": "replica"}
+        assert c.post("/write").status_code == 200
+        assert STICKY_COOKIE in c.cookies
+        assert c.get("/read").json() == {"db": "primary"}
+
+        c.cookies.set(STICKY_COOKIE, f"{time.time() - 1:.3f}")  # window over
+        assert c.get("/read").json() == {"db": "replica"}
+
+
+def test_falls_back_to_primary_when_replica_is_down(two_dbs, tmp_path, monkeypatch):
+    app, _ = two_dbs
+    broken = make_engine(f"sqlite:///{tmp_path / 'missing' / 'nope.db'}")
+    monkeypatch.setattr(db, "ReadSessionLocal", sessionmaker(bind=broken, class_=Session))
+    with TestClient(app) as c:
+        assert c.get("/read").json() == {"db": "primary"}
+    assert db._replica_down_until > time.monotonic()
+
+
+def test_read_session_refuses_writes(session: Session):
+    session.info["read_only"] = True
+    settings_row = get_or_create_settings(session)  # defaults, not persisted
+    assert settings_row.id is None and settings_row.base_currency_code == "USD"
+    session.add(settings_row)
+    with pytest.raises(RuntimeError, match="read-only"):
+        session.flush()
@@ -0,0 +1,82 @@
+# tests/test_realized.py
+"""Tests for the realized gains / income ledger and /portfolio/realized."""
+from datetime import date
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models.activities import Activity
+from app.models.fx import FxRate
+from app.models.realized import RealizedEntry, rebuild_realized
+from app.models.settings import AppSetting
+
+
+@pytest.fixture
+def ledger(session: Session, user_with_account):
+    book = user_with_account("realized@example.com", currencies=("USD", "EUR"),
+                             instrument={"symbol": "RLZ", "name": "Realize", "latest_price": 20.0})
+    session.add(FxRate(base="USD", quote="EUR", as_of_date=date(2024, 1, 1), rate=0.5))
+    buy = book.add("Buy", date(2024, 1, 5), 10, 10.0, fee=2.0)            # cost 102
+    book.add("Buy", date(2024, 3, 1), 10, 12.0)                            # cost 222 for 20
+    book.add("Sell", date(2024, 6, 1), 5, 15.0, fee=1.0, capital_gains_tax=3.0)
+    book.add("Dividend", date(2024, 7, 1), None, 8.0, withholding_tax=1.2)
+    book.add("Sell", date(2025, 2, 1), 15, 20.0)
+    session.commit()
+    return book.user, book.account, buy
+
+
+def _entries(session: Session):
+    return session.exec(select(RealizedEntry).order_by(RealizedEntry.date)).all()
+
+
+def test_ledger_follows_activity_writes(session: Session, ledger):
+    user, acc, buy = ledger
+    sell_2024, dividend, sell_2025 = _entries(session)
+    assert (sell_2024.kind, dividend.kind, sell_2025.kind) == ("sell", "dividend", "sell")
+    assert sell_2024.cost_ccy == pytest.approx(55.5)                 # 5 * 222/20
+    assert sell_2024.amount_ccy == pytest.approx(74.0 - 55.5)
+    assert sell_2025.amount_ccy == pytest.approx(300.0 - 166.5)
+    assert dividend.amount_ccy == 8.0 and dividend.tax_ccy == 1.2
+    assert sell_2024.base_currency == "USD" and sell_2024.amount_base == sell_2024.amount_ccy
+
+    # a back-dated correction replays the lot
+    buy.unit_price = 8.0
+    session.add(buy)
+    session.commit()
+    assert _entries(session)[0].cost_ccy == pytest.approx(5 * 202 / 20)
+
+    session.delete(session.get(Activity, sell_2024.activity_id))
+    session.commit()
+    assert [e.kind for e in _entries(session)] == ["dividend", "sell"]
+
+    before = [(e.activity_id, e.amount_ccy) for e in _entries(session)]
+    assert rebuild_realized(session.connection()) == 2
+    assert [(e.activity_id, e.amount_ccy) for e in _entries(session)] == before
+
+
+def test_base_currency_change_rewrites_base_amounts(session: Session, ledger):
+    user, _, _ = ledger
+    session.add(AppSetting(owner_user_id=user.id, base_currency_code="EUR"))
+    session.commit()
+    entries = _entries(session)
+    assert {e.base_currency for e in entries} == {"EUR"}
+    assert entries[1].amount_base == pytest.approx(4.0)
+
+
+def test_realized_route_groups_in_sql(authed_client, ledger):
+    user, acc, _ = ledger
+    client = authed_client(user)
+
+    by_year = client.get("/portfolio/realized").json()
+    assert [r["year"] for r in by_year] == [2024, 2025]
+    assert by_year[0]["realized_base"] == pytest.approx(18.5)
+    assert by_year[0]["income_base"] == 8.0 and by_year[0]["tax_base"] == pytest.approx(4.2)
+    assert by_year[0]["entries"] == 2 and by_year[0]["unconverted"] == 0
+
+    rows = client.get("/portfolio/realized", params={"group_by": "account,instrument", "start": "2025-01-01"}).json()
+    assert rows == [{
+        "account_id": acc.id, "account_name": "Main", "instrument_id": rows[0]["instrument_id"],
+        "symbol": "RLZ", "instrument_name": "Realize", "realized_base": pytest.approx(133.5),
+        "income_base": 0.0, "tax_base": 0.0, "entries": 1, "unconverted": 0, "base_currency": "USD",
+    }]
+    assert client.get("/portfolio/realized", params={"group_by": "month"}).status_code == 422
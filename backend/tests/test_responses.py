@@ -0,0 +1,86 @@
+# tests/test_responses.py
+"""Tests for the orjson default response class and response compression."""
+import asyncio
+import math
+import zlib
+from datetime import date
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
+
+
+def _app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/rows")
+    def rows(n: int):
+        return [{"i": i, "day": date(2025, 1, 1), "px": 1.5} for i in range(n)]
+
+    return app
+
+
+def test_fast_json_renders_dates_numpy_and_nan():
+    body = FastJSONResponse({"d": date(2025, 1, 2), "a": np.array([1.0, 2.0]), "x": math.nan, 1: "k"}).body
+    assert body == b'{"d":"2025-01-02","a":[1.0,2.0],"x":null,"1":"k"}'
+
+
+def test_gzip_only_above_threshold(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    client = TestClient(_app())
+
+    small = client.get("/rows", params={"n": 2}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    big = client.get("/rows", params={"n": 200}, headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert len(big.json()) == 200
+
+    raw = client.get("/rows", params={"n": 200}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+
+
+def test_gzip_stream_flushes_every_chunk(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    line = b'{"i":' + b"1" * 25_000 + b"}\n"
+    app = FastAPI()
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([line] * 3), media_type="application/x-ndjson")
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")], "root_path": "", "scheme": "http", "http_version": "1.1",
+        "server": ("test", 80), "client": ("test", 1),
+        "asgi": {"version": "3.0", "spec_version": "2.4"},  # stream without polling for a disconnect
+    }
+    asyncio.run(CompressionMiddleware(app, minimum_size=500)(scope, receive, send))
+
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"gzip"
+    bodies = [m["body"] for m in sent if m["type"] == "http.response.body"]
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(bodies[0]) == line  # a whole line before the stream ends
+    assert b"".join(decoder.decompress(b) for b in bodies[1:]) == line * 2
+
+
+def test_accept_encoding_parsing():
+    assert compression._accepts("gzip, deflate, br", "br")
+    assert compression._accepts("br;q=0.5, gzip", "br")
+    assert not compression._accepts("br;q=0, gzip", "br")
+    assert not compression._accepts("deflate", "gzip")
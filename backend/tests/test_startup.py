@@ -0,0 +1,38 @@
+# tests/test_startup.py
+"""Tests for cold-start work: lazy provider imports and the Alembic head check."""
+import os
+import subprocess
+import sys
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app.core.db import ALEMBIC_INI, alembic_at_head
+
+
+def test_app_import_does_not_load_yahooquery(tmp_path):
+    code = "import sys, app.app; print('yahooquery' in sys.modules, 'pandas' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"},
+        capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False False"
+
+
+def test_alembic_head_check(engine):
+    assert alembic_at_head(engine) is False  # no alembic_version table
+
+    heads = ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES ('0000deadbeef')"))
+    assert alembic_at_head(engine) is False
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM alembic_version"))
+        for h in heads:
+            conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": h})
+    assert alembic_at_head(engine) is True
@@ -0,0 +1,109 @@
+# tests/test_tax_report.py
+"""Tests for the tax-year report (average cost vs FIFO, taxes, caching)."""
+from datetime import date
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.activities import Activity
+from app.models.fx import FxRate
+from app.models.instrument import Instrument
+from app.models.settings import AppSetting
+from app.models.user import User
+from app.services import tax_report as tax_report_mod
+from app.services.tax_report import REPORT_CACHE, tax_report, tax_year_bounds
+
+
+@pytest.fixture
+def ledger(session: Session, user_with_account):
+    REPORT_CACHE.clear()
+    book = user_with_account("tax@example.com", currencies=("USD", "EUR"),
+                             instrument={"symbol": "TAX", "name": "Taxed", "country": "us"})
+    session.add_all([
+        AppSetting(owner_user_id=book.user.id, base_currency_code="EUR"),
+        FxRate(base="USD", quote="EUR", as_of_date=date(2023, 1, 1), rate=0.5),
+    ])
+    book.add("Buy", date(2023, 5, 1), 10, 10.0)
+    book.add("Buy", date(2024, 2, 1), 10, 20.0, stamp_duty=2.0)
+    book.add("Sell", date(2024, 6, 1), 10, 30.0, fee=4.0, capital_gains_tax=10.0)
+    book.add("Dividend", date(2024, 7, 1), None, 6.0, withholding_tax=2.0)
+    book.add("Interest", date(2024, 8, 1), None, 4.0, instrument=False)
+    session.commit()
+    return book.user
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """How many reports were computed rather than served from the cache."""
+    calls = []
+    real = tax_report_mod.compute_tax_report
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(tax_report_mod, "compute_tax_report", counting)
+    return calls
+
+
+def test_average_and_fifo_per_jurisdiction(session: Session, ledger: User):
+    report = tax_report(session, ledger, 2024)
+    assert report["base_currency"] == "EUR" and report["start"] == date(2024, 1, 1)
+    cash, us = report["jurisdictions"]
+    assert (cash["jurisdiction"], us["jurisdiction"]) == ("", "US")
+    assert cash["interest"] == 2.0
+
+    assert us["proceeds"] == pytest.approx(148.0)        # (300 - 4) * 0.5
+    assert us["gain_fifo"] == pytest.approx(148 - 50)    # oldest 10 @ 10
+    assert us["gain_average"] == pytest.approx(148 - 75) # avg 15
+    assert us["dividends"] == 3.0 and us["withholding_tax"] == 1.0
+    assert us["taxes_and_fees"] == pytest.approx(1.0 + 5.0 + 1.0 + 2.0)  # WHT, CGT, stamp duty, fee
+    assert report["totals"]["sells"] == 1
+
+    assert tax_report(session, ledger, 2023)["totals"]["proceeds"] == 0.0
+
+
+def test_cached_until_activities_change(session: Session, ledger: User, computed):
+    first = tax_report(session, ledger, 2024)
+    assert tax_report(session, ledger, 2024) == first and len(computed) == 1
+
+    session.add(Activity(owner_user_id=ledger.id, account_id=session.exec(select(Account.id)).first(), type="Interest",
+                         unit_price=10.0, currency_code="USD", date=date(2024, 9, 1)))
+    session.commit()
+    fresh = tax_report(session, ledger, 2024)
+    assert len(computed) == 2 and fresh["totals"]["interest"] == 7.0
+
+
+def test_cached_report_is_not_shared_between_callers(session: Session, ledger: User, computed):
+    first = tax_report(session, ledger, 2024)
+    first["jurisdictions"].clear()
+    first["totals"]["interest"] = -1.0
+    again = tax_report(session, ledger, 2024)
+    assert len(computed) == 1
+    assert len(again["jurisdictions"]) == 2 and again["totals"]["interest"] == 2.0
+
+
+def test_cached_until_an_fx_rate_is_corrected(session: Session, ledger: User, computed):
+    tax_report(session, ledger, 2024)
+    fx = session.exec(select(FxRate)).one()
+    fx.rate = 1.0  # a refresh rewriting an existing day keeps the row id
+    session.add(fx)
+    session.commit()
+    fresh = tax_report(session, ledger, 2024)
+    assert len(computed) == 2 and fresh["totals"]["proceeds"] == pytest.approx(296.0)
+
+
+def test_cached_until_an_instrument_moves_jurisdiction(session: Session, ledger: User, computed):
+    tax_report(session, ledger, 2024)
+    inst = session.exec(select(Instrument)).one()
+    inst.country = "IE"
+    session.add(inst)
+    session.commit()
+    fresh = tax_report(session, ledger, 2024)
+    assert len(computed) == 2 and [j["jurisdiction"] for j in fresh["jurisdictions"]] == ["", "IE"]
+
+
+def test_tax_year_bounds():
+    assert tax_year_bounds(2024, "04-06") == (date(2024, 4, 6), date(2025, 4, 5))
+    assert tax_year_bounds(2024, "01-01") == (date(2024, 1, 1), date(2024, 12, 31))
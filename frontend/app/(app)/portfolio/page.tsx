@@ -15,6 +15,7 @@ import {
 } from "lucide-react";
 
 import { apiClient, ApiError } from "@/lib/apiClient";
+import { waitForJob, type EnqueuedJob } from "@/lib/jobs";
 import { ErrorState } from "@/components/feedback/ErrorState";
 import { Button } from "@/components/ui/Button";
 
@@ -173,7 +174,9 @@ export default function PortfolioPage() {
     setRefreshing(true);
     setErr(null);
     try {
-      await apiClient.post("/instruments/refresh_all_prices", {});
+      const job = await apiClient.post<EnqueuedJob>("/instruments/refresh_all_prices", {});
+      const done = await waitForJob("/api", job.job_id);
+      if (done.status === "failed") throw new Error(done.error || "Price refresh failed");
       await load();
     } catch (e: any) {
       // If it's a timeout/connection error, the backend is likely still processing
@@ -5,6 +5,7 @@ import { Activity, Clock, RefreshCw, AlertCircle, CheckCircle, Loader2, Info, Da
 import { API_BASE } from "@/lib/api";
 import { Button } from "@/components/ui/Button";
 import { Card } from "@/components/ui/Card";
+import { waitForJob } from "@/lib/jobs";
 
 const API = API_BASE;
 const SCHED_API = (process.env.NEXT_PUBLIC_SCHEDULER_API || "").trim() || API;
@@ -19,9 +20,22 @@ type SchedulerStatus = {
   enabled: boolean;
   provider?: string;
   last_runs?: { prices: string | null; fx: string | null };
+  stats?: { prices?: RunStats; fx?: RunStats };
   jobs: JobInfo[];
 };
 
+type RunStats = {
+  window: number;
+  succeeded: number;
+  failed: number;
+  elapsed_sec: { p50: number | null; p90: number | null; p95: number | null; max: number | null };
+  symbols_per_sec_p50: number | null;
+};
+
+function secs(v?: number | null) {
+  return v == null ? "—" : `${v.toFixed(1)}s`;
+}
+
 function fmt(ts?: string | null) {
   if (!ts) return "—";
   try {
@@ -61,6 +75,7 @@ export default function RefreshStatusCard() {
         enabled: !!(body as any).enabled,
         provider: (body as any).provider ?? "auto",
         last_runs: (body as any).last_runs ?? { prices: null, fx: null },
+        stats: (body as any).stats ?? undefined,
         jobs: Array.isArray((body as any).jobs)
           ? (body as any).jobs.map((j: any) =>
             typeof j === "string"
@@ -111,11 +126,13 @@ export default function RefreshStatusCard() {
         const msg = typeof body === "string" ? body : (body as any)?.detail || r.statusText;
         throw new Error(msg);
       }
-      setKickMsg(
-        typeof body === "string"
-          ? body
-          : `Updated ${(body as any)?.updated ?? 0} / ${(body as any)?.processed ?? 0}`
-      );
+      const jobId = typeof body === "string" ? null : (body as any)?.job_id;
+      if (!jobId) throw new Error("Refresh was not queued");
+      const job = await waitForJob(API, jobId, {
+        onProgress: (j) => setKickMsg(`Updated ${j.progress.updated} / ${j.progress.processed} of ${j.progress.total}`),
+      });
+      if (job.status === "failed") throw new Error(job.error || "Price refresh failed");
+      setKickMsg(`Updated ${job.progress.updated} / ${job.progress.processed}`);
       setTimeout(load, 1000);
     } catch (e: any) {
       setErr(e.message || String(e));
@@ -158,7 +175,7 @@ export default function RefreshStatusCard() {
                   <h4 className="text-lg font-bold text-slate-900 dark:text-white">Market Prices</h4>
                 </div>
 
-                <div className="grid grid-cols-1 sm:grid-cols-3 gap-6">
+                <div className="grid grid-cols-1 sm:grid-cols-4 gap-6">
                   <div className="space-y-1">
                     <span className="text-[10px] font-bold text-slate-400 uppercase tracking-widest block">Provider</span>
                     <p className="text-sm font-black text-slate-900 dark:text-slate-200 uppercase">{data?.provider ?? "—"}</p>
@@ -171,6 +188,12 @@ export default function RefreshStatusCard() {
                     <span className="text-[10px] font-bold text-slate-400 uppercase tracking-widest block">Next Scheduled</span>
                     <p className="text-sm font-semibold text-emerald-500">{fmt(nextPrices)}</p>
                   </div>
+                  <div className="space-y-1">
+                    <span className="text-[10px] font-bold text-slate-400 uppercase tracking-widest block">Run Time p50 / p95</span>
+                    <p className="text-sm font-semibold text-slate-900 dark:text-slate-200">
+                      {secs(data?.stats?.prices?.elapsed_sec.p50)} / {secs(data?.stats?.prices?.elapsed_sec.p95)}
+                    </p>
+                  </div>
                 </div>
               </div>
 
@@ -0,0 +1,52 @@
+// lib/jobs.ts
+// Helpers for backend background jobs (POST returns 202 + job id; poll /jobs/{id}).
+
+export type JobProgress = {
+  total: number;
+  processed: number;
+  updated: number;
+  skipped: number;
+  errors: number;
+};
+
+export type BackgroundJob = {
+  id: string;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  progress: JobProgress;
+  result: any;
+  error: string | null;
+};
+
+export type EnqueuedJob = {
+  ok: boolean;
+  job_id: string;
+  status: string;
+  status_url: string;
+  events_url: string;
+};
+
+const TERMINAL = new Set(["succeeded", "failed"]);
+
+/**
+ * Poll `${base}/jobs/{jobId}` until the job finishes (or `timeoutMs` elapses).
+ * `onProgress` is called with every snapshot so callers can show counters.
+ */
+export async function waitForJob(
+  base: string,
+  jobId: string,
+  opts: { intervalMs?: number; timeoutMs?: number; onProgress?: (job: BackgroundJob) => void } = {}
+): Promise<BackgroundJob> {
+  const { intervalMs = 1500, timeoutMs = 300_000, onProgress } = opts;
+  const deadline = Date.now() + timeoutMs;
+
+  while (true) {
+    const r = await fetch(`${base}/jobs/${encodeURIComponent(jobId)}`, { credentials: "include" });
+    if (!r.ok) throw new Error(`Job ${jobId}: ${r.status} ${r.statusText}`);
+    const job = (await r.json()) as BackgroundJob;
+    onProgress?.(job);
+    if (TERMINAL.has(job.status)) return job;
+    if (Date.now() > deadline) return job;
+    await new Promise((res) => setTimeout(res, intervalMs));
+  }
+}